@@ -0,0 +1,209 @@
+"""
+This module contains the representation of the background knowledge which
+can be given to the PC algorithm : temporal tiers, forbidden and required
+edges, and variables which may not appear in separating sets.
+"""
+import numpy as np
+
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+
+
+class BackgroundKnowledge:
+    """
+    Background knowledge about the true causal graph.
+
+    Parameters
+    ----------
+    nb_var : int
+        The number of variables.
+    tiers : list, optional
+        A list of lists of variable indices, ordered in time : a variable in
+        tiers[i] cannot be a cause of a variable in tiers[j] for j < i.
+        Variables which are in no tier are unconstrained.
+    forbidden_edges : iterable, optional
+        Pairs (x, y) such that x -> y cannot be in the true causal graph.
+    required_edges : iterable, optional
+        Pairs (x, y) such that x -> y must be in the true causal graph.
+    forbidden_conditioning : iterable, optional
+        Indices of variables which must never be part of a conditioning set
+        (e.g. variables known to be colliders or to be measured with too
+        much noise).
+    """
+
+    def __init__(self, nb_var: int, tiers: list[list[int]] = None,
+                 forbidden_edges=(), required_edges=(),
+                 forbidden_conditioning=()):
+        self.nb_var = nb_var
+
+        self.tiers = np.full(nb_var, -1, dtype=int)
+        if tiers is not None:
+            for i, tier in enumerate(tiers):
+                for x in tier:
+                    if self.tiers[x] != -1:
+                        raise ValueError(f'Variable {x} is in several tiers !')
+                    self.tiers[x] = i
+
+        self.forbidden_edges = {(int(x), int(y)) for x, y in forbidden_edges}
+        self.required_edges = {(int(x), int(y)) for x, y in required_edges}
+
+        self.forbidden_conditioning = np.zeros(nb_var, dtype=bool)
+        self.forbidden_conditioning[list(forbidden_conditioning)] = True
+
+        for x, y in self.required_edges:
+            if self.is_forbidden(x, y):
+                raise ValueError(f'Edge {x} -> {y} is both required and '
+                                 f'forbidden !')
+
+    def to_dict(self) -> dict:
+        """
+        Converts the background knowledge into a dictionary of lists (which
+        can be serialised to JSON), the arguments of the constructor.
+        """
+        tiers = None
+        if (self.tiers != -1).any():
+            tiers = [np.flatnonzero(self.tiers == i).tolist()
+                     for i in range(self.tiers.max() + 1)]
+
+        return {
+            'nb_var': self.nb_var,
+            'tiers': tiers,
+            'forbidden_edges': sorted(map(list, self.forbidden_edges)),
+            'required_edges': sorted(map(list, self.required_edges)),
+            'forbidden_conditioning':
+                np.flatnonzero(self.forbidden_conditioning).tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, content: dict) -> 'BackgroundKnowledge':
+        """
+        Builds background knowledge from a dictionary returned by to_dict.
+        """
+        return cls(**content)
+
+    def _forbidden_by_tiers(self, x, y):
+        tier_x = self.tiers[x]
+        tier_y = self.tiers[y]
+
+        return (tier_x != -1) & (tier_y != -1) & (tier_x > tier_y)
+
+    def is_forbidden(self, x: int, y: int) -> bool:
+        """
+        Checks whether the edge x -> y is forbidden (explicitly or by the
+        tiers).
+        """
+        return bool(self._forbidden_by_tiers(x, y)) or \
+            (x, y) in self.forbidden_edges
+
+    def is_required(self, x: int, y: int) -> bool:
+        """
+        Checks whether the edge x -> y is required.
+        """
+        return (x, y) in self.required_edges
+
+    def forbids_adjacency(self, x: int, y: int) -> bool:
+        """
+        Checks whether x and y cannot be adjacent, i.e. both x -> y and
+        y -> x are forbidden.
+        """
+        return self.is_forbidden(x, y) and self.is_forbidden(y, x)
+
+    def requires_adjacency(self, x: int, y: int) -> bool:
+        """
+        Checks whether x and y must be adjacent.
+        """
+        return self.is_required(x, y) or self.is_required(y, x)
+
+    def forbidden_adjacencies(self) -> set[tuple]:
+        """
+        Returns the pairs (x, y), x < y, which cannot be adjacent.
+
+        As the tiers never forbid both directions of an edge, these pairs
+        are found among the explicitly forbidden edges.
+        """
+        return {
+            (min(x, y), max(x, y)) for x, y in self.forbidden_edges
+            if self.forbids_adjacency(x, y)
+        }
+
+    def allowed_in_separating_set(self, x: int, y: int) -> np.ndarray:
+        """
+        Returns the boolean mask of the variables allowed in a separating set
+        of x and y.
+
+        Forbidden conditioning variables are excluded, as well as the
+        variables in a later tier than both x and y : if x and y are not
+        adjacent, they are separated by the parents of x or by the parents of
+        y, which are in tiers no later than theirs.
+        """
+        allowed = ~self.forbidden_conditioning
+        tier_x = self.tiers[x]
+        tier_y = self.tiers[y]
+        if tier_x != -1 and tier_y != -1:
+            allowed = allowed & (self.tiers <= max(tier_x, tier_y))
+
+        return allowed
+
+    def forbidden_mask(self, rows: np.ndarray,
+                       columns: np.ndarray) -> np.ndarray:
+        """
+        Checks for all k at once whether the edge rows[k] -> columns[k] is
+        forbidden, including because columns[k] -> rows[k] is required.
+        """
+        rows = np.asarray(rows, dtype=int)
+        columns = np.asarray(columns, dtype=int)
+        forbidden = self._forbidden_by_tiers(rows, columns)
+        explicit = self.forbidden_edges | {(y, x) for x, y in
+                                           self.required_edges}
+        if len(explicit) > 0:
+            forbidden = forbidden | np.fromiter(
+                ((x, y) in explicit for x, y in zip(rows.tolist(),
+                                                    columns.tolist())),
+                dtype=bool,
+                count=len(rows)
+            )
+
+        return forbidden
+
+
+def orient_with_background_knowledge(
+        pdag: np.ndarray,
+        background_knowledge: BackgroundKnowledge) -> np.ndarray:
+    """
+    Orients the edges of a Partially Directed Acyclic Graph (PDAG) as
+    dictated by background knowledge, in place : an edge a - b becomes
+    a -> b if b -> a is forbidden (explicitly or by the tiers) or a -> b is
+    required.
+
+    Parameters
+    ----------
+    pdag : array_like or BitPackedGraph
+        The PDAG.
+    background_knowledge : BackgroundKnowledge
+        The background knowledge.
+
+    Returns
+    -------
+    array_like or BitPackedGraph
+        The PDAG (the same object as the input) after orientation.
+    """
+
+    if isinstance(pdag, BitPackedGraph):
+        rows, columns = pdag.nonzero()
+    else:
+        rows, columns = np.nonzero(np.asarray(pdag))
+
+    # Edges b -> a to remove, only when a -> b is in the PDAG and allowed, so
+    # that no adjacency is ever removed
+    nb_var = pdag.shape[0]
+    has_reverse = np.isin(columns * nb_var + rows, rows * nb_var + columns)
+    removable = has_reverse & \
+        background_knowledge.forbidden_mask(rows, columns) & \
+        ~background_knowledge.forbidden_mask(columns, rows)
+    rows, columns = rows[removable], columns[removable]
+
+    if isinstance(pdag, BitPackedGraph):
+        pdag.remove_edges(rows, columns)
+    else:
+        pdag[rows, columns] = 0
+
+    return pdag
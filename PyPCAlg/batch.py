@@ -0,0 +1,254 @@
+"""
+This module contains the batch entry points, which run the PC algorithm over
+many datasets (e.g. one per customer segment) in a pool of worker processes,
+and yield the results as they complete.
+
+Without user-provided tests, the linear tests are computed from the
+Gaussian sufficient statistics of each dataset (see
+PyPCAlg.utilities.sufficient_statistics) : the statistics of the groups of a
+DataFrame are computed in one pass over its rows, and only the statistics
+(whose size does not depend on the number of observations) are sent to the
+workers. The datasets are grouped into chunks, so that thousands of small
+datasets do not pay the cost of a round trip to a worker each.
+"""
+from collections.abc import Iterable, Mapping
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from PyPCAlg.pc_algorithm import run_pc_algorithm
+from PyPCAlg.utilities.dataset import Dataset
+from PyPCAlg.utilities.sufficient_statistics import \
+    GaussianSufficientStatistics
+
+field_error = 'Error'
+
+
+def grouped_sufficient_statistics(data: pd.DataFrame, by,
+                                  columns: list = None,
+                                  min_size: int = 3) -> dict:
+    """
+    Computes the Gaussian sufficient statistics of each group of rows of a
+    DataFrame, in one pass over the rows (sorted once by group).
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The observations, with the key(s) of the groups in one or several
+        columns.
+    by : str or list
+        The name(s) of the column(s) holding the key of the groups.
+    columns : list, optional
+        The variables (defaults to all the columns but the keys).
+    min_size : int, optional
+        The minimum number of observations of a group : the smaller groups,
+        on which no test can be performed, are left out (defaults to 3).
+
+    Returns
+    -------
+    dict
+        The sufficient statistics of the groups, by key (in sorted order).
+    """
+    keys_columns = [by] if isinstance(by, str) else list(by)
+    if columns is None:
+        columns = [column for column in data.columns
+                   if column not in keys_columns]
+
+    groups = data.groupby(by, sort=True)
+    sizes = groups.size()
+    codes = groups.ngroup().to_numpy()
+    # Rows with a missing key belong to no group
+    rows = np.flatnonzero(codes >= 0)
+    order = rows[np.argsort(codes[rows], kind='stable')]
+    values = data[columns].to_numpy(dtype=float)[order]
+    offsets = np.concatenate(([0], np.cumsum(sizes.to_numpy())))
+
+    statistics = dict()
+    for g, key in enumerate(sizes.index.tolist()):
+        if sizes.iloc[g] < min_size:
+            continue
+        statistics_group = GaussianSufficientStatistics(column_names=columns)
+        statistics_group.add_rows(values[offsets[g]:offsets[g + 1]])
+        statistics[key] = statistics_group
+
+    return statistics
+
+
+def _run_one(data, level: float, indep_test_func: callable,
+             cond_indep_test_func: callable, options: dict) -> dict:
+    """
+    Runs the PC algorithm on one dataset (observations or sufficient
+    statistics).
+    """
+    if indep_test_func is None:
+        if isinstance(data, GaussianSufficientStatistics):
+            statistics = data
+        else:
+            statistics = GaussianSufficientStatistics.from_data(data)
+        indep_test_func, cond_indep_test_func = statistics.tests()
+        # The tests read the statistics : only the shape and the column
+        # names of the data are used
+        data = Dataset(np.empty((0, statistics.nb_var)),
+                       column_names=statistics.columns)
+    elif isinstance(data, GaussianSufficientStatistics):
+        raise ValueError('User-provided tests require the observations, not '
+                         'their sufficient statistics !')
+
+    return run_pc_algorithm(
+        data=data,
+        indep_test_func=indep_test_func,
+        cond_indep_test_func=cond_indep_test_func,
+        level=level,
+        **options
+    )
+
+
+def _run_chunk(chunk: list[tuple], level: float, indep_test_func: callable,
+               cond_indep_test_func: callable,
+               options: dict) -> list[tuple]:
+    """
+    Runs the PC algorithm on a chunk of (key, dataset) pairs, the exception
+    raised by the run on a dataset being returned as its result.
+    """
+    res = []
+    for key, data in chunk:
+        try:
+            res.append((key, _run_one(data, level, indep_test_func,
+                                      cond_indep_test_func, options)))
+        except Exception as error:
+            res.append((key, {field_error: error}))
+
+    return res
+
+
+def _iter_chunks(datasets, chunk_size: int):
+    """
+    Groups the (key, dataset) pairs of a batch into chunks.
+    """
+    if isinstance(datasets, Mapping):
+        items = datasets.items()
+    else:
+        items = (
+            dataset if isinstance(dataset, tuple) and len(dataset) == 2
+            else (i, dataset)
+            for i, dataset in enumerate(datasets)
+        )
+
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_pc_batch(datasets: Iterable, level: float,
+                 indep_test_func: callable = None,
+                 cond_indep_test_func: callable = None,
+                 nb_workers: int = 1, chunk_size: int = 1, **options):
+    """
+    Runs the PC algorithm on many datasets, in a pool of worker processes.
+
+    Parameters
+    ----------
+    datasets : Mapping or Iterable
+        The datasets, as a mapping from keys to datasets, or an iterable of
+        (key, dataset) pairs or of datasets (whose keys are then their
+        positions). A dataset is any data accepted by run_pc_algorithm, or a
+        GaussianSufficientStatistics. The iterable is consumed lazily.
+    level : float
+        The level for the tests.
+    indep_test_func : callable, optional
+        A function to perform unconditional independence testing (which
+        must be picklable if nb_workers > 1). Defaults to the linear test
+        computed from the sufficient statistics of each dataset.
+    cond_indep_test_func : callable, optional
+        A function to perform conditional independence testing (likewise).
+    nb_workers : int, optional
+        The number of worker processes (defaults to 1, for a run in the
+        current process).
+    chunk_size : int, optional
+        The number of datasets sent to a worker at a time.
+    **options
+        The other arguments of run_pc_algorithm (e.g. output_format or
+        background_knowledge), for all the datasets.
+
+    Yields
+    ------
+    tuple
+        The key of a dataset and the dictionary returned by
+        run_pc_algorithm, in the order in which the runs complete. If the
+        run on a dataset fails, the dictionary only holds the exception
+        raised, under field_error, and the other datasets are processed as
+        usual.
+    """
+    if (indep_test_func is None) != (cond_indep_test_func is None):
+        raise ValueError('Provide both independence tests or none !')
+
+    chunks = _iter_chunks(datasets, chunk_size)
+    arguments = (level, indep_test_func, cond_indep_test_func, options)
+
+    if nb_workers <= 1:
+        for chunk in chunks:
+            yield from _run_chunk(chunk, *arguments)
+        return
+
+    with ProcessPoolExecutor(max_workers=nb_workers) as executor:
+        in_flight = set()
+        for chunk in chunks:
+            in_flight.add(executor.submit(_run_chunk, chunk, *arguments))
+            if len(in_flight) >= 4 * nb_workers:
+                done, in_flight = wait(in_flight,
+                                       return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def run_pc_grouped(data: pd.DataFrame, by, level: float,
+                   columns: list = None, min_size: int = 3,
+                   nb_workers: int = 1, chunk_size: int = 1, **options):
+    """
+    Runs the PC algorithm with linear tests on each group of rows of a
+    DataFrame, the sufficient statistics of all the groups being computed in
+    one pass (see grouped_sufficient_statistics).
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The observations, with the key(s) of the groups in one or several
+        columns.
+    by : str or list
+        The name(s) of the column(s) holding the key of the groups.
+    level : float
+        The level for the tests.
+    columns : list, optional
+        The variables (defaults to all the columns but the keys).
+    min_size : int, optional
+        The minimum number of observations of a group : the smaller groups
+        are left out (defaults to 3).
+    nb_workers : int, optional
+        The number of worker processes.
+    chunk_size : int, optional
+        The number of groups sent to a worker at a time.
+    **options
+        The other arguments of run_pc_algorithm.
+
+    Yields
+    ------
+    tuple
+        The key of a group and the dictionary returned by run_pc_algorithm
+        (or holding the exception raised under field_error, see
+        run_pc_batch), in the order in which the runs complete.
+    """
+    statistics = grouped_sufficient_statistics(data, by=by, columns=columns,
+                                               min_size=min_size)
+
+    yield from run_pc_batch(statistics, level=level, nb_workers=nb_workers,
+                            chunk_size=chunk_size, **options)
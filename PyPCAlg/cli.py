@@ -0,0 +1,439 @@
+"""
+Command-line entry point for batch causal discovery jobs, installed as the
+pypcalg console script :
+
+    pypcalg data.csv --test linear --level 0.01 0.05 --output-dir results
+
+The observations are read chunk by chunk into a single buffer (see
+PyPCAlg.utilities.dataset.read_dataset), the PC algorithm is run at each of
+the levels requested, and for each level the CPDAG (as a list of edges), the
+separation sets and the metrics of the run are written to the output
+directory.
+
+The p-values of the tests are cached (see PyPCAlg.utilities.pvalue_cache), so
+that each test is computed once for all the levels. The cache can be kept in
+a directory between jobs on the same data (--cache-dir), and saved regularly
+to a checkpoint directory (--checkpoint-dir) together with the levels already
+completed, so that an interrupted job resumes where it stopped.
+
+With several worker processes (--workers), the tests each depth of the PC
+algorithm may carry out are computed in parallel by the workers before the
+depth is run from the cache ; they include tests which the sequential run
+would skip, as the edges removed during a depth shrink the conditioning sets
+of the next pairs.
+
+Only the standard library is imported at module level, so that the script
+starts (and answers --help) quickly ; numpy, pandas and the package are
+imported once the arguments are parsed.
+"""
+from collections import deque
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+test_choices = ('linear', 'd-separation')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the parser of the command-line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog='pypcalg',
+        description='Runs the PC algorithm on observations stored in a '
+                    'CSV, Parquet or .npy file.'
+    )
+    parser.add_argument('input',
+                        help='the observations (.csv with a header line, '
+                             '.parquet or .npy), one column per variable')
+    parser.add_argument('--columns', nargs='+', default=None,
+                        help='the columns to use (names, or indices for a '
+                             '.npy file ; defaults to all of them, and cannot '
+                             'be given with --test d-separation)')
+    parser.add_argument('--test', choices=test_choices, default='linear',
+                        help='the (conditional) independence test : partial '
+                             'correlation for Gaussian data, or a '
+                             'd-separation oracle reading the true DAG from '
+                             '--dag (defaults to linear)')
+    parser.add_argument('--dag', default=None,
+                        help='a .npy file holding the adjacency matrix of '
+                             'the true DAG, for --test d-separation')
+    parser.add_argument('--level', nargs='+', type=float, default=[0.05],
+                        help='the level(s) of the tests (defaults to 0.05)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='the number of processes computing the tests in '
+                             'parallel (defaults to 1) ; the tests each depth '
+                             'of the PC algorithm may carry out are computed '
+                             'by the processes before the depth is run, and '
+                             'shared by all the levels')
+    parser.add_argument('--output-dir', default='.',
+                        help='the directory in which to write the results '
+                             '(defaults to the current directory)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='a directory in which to keep the p-values of '
+                             'the tests between jobs on the same data')
+    parser.add_argument('--checkpoint-dir', default=None,
+                        help='a directory in which to save the progress of '
+                             'the job, from which an interrupted job resumes')
+    parser.add_argument('--checkpoint-every', type=int, default=10000,
+                        help='the number of new tests between two saves of '
+                             'the p-values to the checkpoint directory '
+                             '(defaults to 10000)')
+    parser.add_argument('--chunk-size', type=int, default=100000,
+                        help='the number of rows read at a time (defaults to '
+                             '100000)')
+    parser.add_argument('--bit-packed', action='store_true',
+                        help='store the graphs with one bit per entry, for '
+                             'very wide datasets')
+
+    return parser
+
+
+def _format_level(level: float) -> str:
+    return f'{level:g}'
+
+
+def _columns(args: argparse.Namespace) -> list:
+    """
+    Returns the columns requested (as indices for a .npy file).
+    """
+    if args.columns is not None and args.input.endswith('.npy'):
+        return [int(column) for column in args.columns]
+
+    return args.columns
+
+
+def _file_fingerprint(filename: str) -> list:
+    status = os.stat(filename)
+
+    return [os.path.abspath(filename), status.st_size, status.st_mtime_ns]
+
+
+def _fingerprint(args: argparse.Namespace) -> str:
+    """
+    Returns the digest of the job, which depends on the content of the input
+    (through its size and modification time), on the columns used and on the
+    test (with the DAG of the d-separation oracle).
+    """
+    import hashlib
+
+    fingerprint = json.dumps([
+        _file_fingerprint(args.input), args.columns, args.test,
+        None if args.dag is None else _file_fingerprint(args.dag)
+    ])
+
+    return hashlib.sha1(fingerprint.encode()).hexdigest()[:16]
+
+
+def _cache_filename(args: argparse.Namespace) -> str:
+    """
+    Returns the path of the p-value cache of the job in the cache directory.
+    """
+    return os.path.join(args.cache_dir, f'pvalues_{_fingerprint(args)}.npz')
+
+
+def _checkpoint_filename(args: argparse.Namespace, level: float,
+                         suffix: str) -> str:
+    """
+    Returns the path of a checkpoint file of a level of the job, named after
+    the digest of the job so that the checkpoints of other jobs in the same
+    directory are ignored.
+    """
+    return os.path.join(
+        args.checkpoint_dir,
+        f'{_fingerprint(args)}_level_{_format_level(level)}{suffix}'
+    )
+
+
+def _load_cache(args: argparse.Namespace):
+    """
+    Loads the p-values of the job from the cache and checkpoint directories.
+    """
+    from PyPCAlg.utilities.pvalue_cache import PValueCache
+
+    cache = PValueCache()
+    filenames = []
+    if args.cache_dir is not None:
+        filenames.append(_cache_filename(args))
+    if args.checkpoint_dir is not None:
+        prefix = f'{_fingerprint(args)}_level_'
+        filenames.extend(
+            os.path.join(args.checkpoint_dir, filename)
+            for filename in sorted(os.listdir(args.checkpoint_dir))
+            if filename.startswith(prefix) and
+            filename.endswith('_pvalues.npz')
+        )
+    for filename in filenames:
+        if os.path.exists(filename):
+            cache.update(PValueCache.load(filename))
+
+    return cache
+
+
+def _pval_func(args: argparse.Namespace) -> callable:
+    """
+    Returns the function computing the p-value of a test, with signature
+    pval_func(data, x, y, z).
+    """
+    if args.test == 'linear':
+        from PyPCAlg.utilities.independence_relationships import \
+            do_test_linear_independence, \
+            do_test_linear_conditional_independence
+
+        def pval_func(data, x, y, z):
+            if len(z) == 0:
+                return do_test_linear_independence(data, x, y, level=None)
+            return do_test_linear_conditional_independence(data, x, y, z,
+                                                           level=None)
+    else:
+        import numpy as np
+
+        from PyPCAlg.utilities.d_separation import DSeparationOracle
+
+        oracle = DSeparationOracle(np.load(args.dag))
+
+        def pval_func(data, x, y, z):
+            return 1.0 if oracle.is_d_separated(x, y, z) else 0.0
+
+    return pval_func
+
+
+def _write_results(args: argparse.Namespace, level: float, cpdag,
+                   separation_sets, metrics: dict) -> None:
+    """
+    Writes the CPDAG (as a list of edges), the separation sets and the
+    metrics of the run at a level to the output directory.
+    """
+    import pandas as pd
+
+    names = cpdag.column_names
+    directed, undirected = cpdag.named_edges()
+    edges = pd.DataFrame(
+        [(x, y, '-->') for x, y in directed] +
+        [(x, y, '---') for x, y in undirected],
+        columns=['source', 'target', 'edge']
+    )
+    suffix = _format_level(level)
+    edges.to_csv(os.path.join(args.output_dir, f'cpdag_{suffix}.csv'),
+                 index=False)
+
+    sets = [
+        {'x': str(names[x]), 'y': str(names[y]),
+         'separating_sets': sorted([str(names[v]) for v in z]
+                                   for z in separation_sets[(x, y)])}
+        for x, y in sorted(separation_sets) if x < y
+    ]
+    with open(os.path.join(args.output_dir,
+                           f'separation_sets_{suffix}.json'), 'w') as file:
+        json.dump(sets, file, indent=1)
+
+    with open(os.path.join(args.output_dir, f'metrics_{suffix}.json'),
+              'w') as file:
+        json.dump(metrics, file, indent=1)
+
+
+# The state of the worker processes, set once per process by
+# _initialise_worker rather than sent with every batch of tests
+_worker_state = dict()
+
+# The number of tests sent to a worker process at a time
+_prefetch_chunk_size = 256
+
+
+def _initialise_worker(args: argparse.Namespace) -> None:
+    from PyPCAlg.utilities.dataset import read_dataset
+
+    start = time.perf_counter()
+    _worker_state['data'] = read_dataset(args.input, columns=_columns(args),
+                                         chunk_size=args.chunk_size)
+    _worker_state['load_time'] = time.perf_counter() - start
+    _worker_state['pval_func'] = _pval_func(args)
+
+
+def _compute_pvalues(tests: list) -> list:
+    """
+    Computes the p-values of a batch of tests (x, y, z) in a worker process.
+    """
+    data = _worker_state['data']
+    pval_func = _worker_state['pval_func']
+
+    return [pval_func(data, x, y, list(z)) for x, y, z in tests]
+
+
+def _prefetcher(args: argparse.Namespace, cache, executor,
+                new_pvalues: callable) -> callable:
+    """
+    Returns the function computing in the worker processes the p-values of
+    the tests of a depth missing from the cache, and adding them to it (see
+    run_pc_adjacency_phase).
+    """
+
+    def store(chunk, future):
+        for (x, y, z), pval in zip(chunk, future.result()):
+            cache.add(x, y, z, pval)
+        new_pvalues(len(chunk))
+
+    def prefetch(tests):
+        missing = cache.missing(tests)
+        in_flight = deque()
+        while True:
+            chunk = list(itertools.islice(missing, _prefetch_chunk_size))
+            if len(chunk) == 0:
+                break
+            in_flight.append((chunk, executor.submit(_compute_pvalues, chunk)))
+            # A bounded number of batches is pending at a time
+            if len(in_flight) > 2 * args.workers:
+                store(*in_flight.popleft())
+        while len(in_flight) > 0:
+            store(*in_flight.popleft())
+
+    return prefetch
+
+
+def _run_level(args: argparse.Namespace, level: float, cache,
+               executor=None) -> dict:
+    """
+    Runs the PC algorithm at a level, writes its results and returns its
+    metrics. With a pool of worker processes, the p-values of the tests of
+    each depth missing from the cache are computed in parallel by the
+    workers before the depth is run.
+    """
+    from PyPCAlg.pc_algorithm import run_pc_algorithm, field_pc_cpdag, \
+        field_separation_sets
+
+    data = _worker_state['data']
+    pval_func = _worker_state['pval_func']
+    nb_computed = cache.nb_computed
+    nb_hits = cache.nb_hits
+
+    nb_new = [0]
+
+    def new_pvalues(nb):
+        previous = nb_new[0]
+        nb_new[0] += nb
+        if args.checkpoint_dir is not None and \
+                nb_new[0] // args.checkpoint_every > \
+                previous // args.checkpoint_every:
+            cache.save(_checkpoint_filename(args, level, '_pvalues.npz'))
+
+    # Called on the tests missing from the cache only
+    def checkpointing(data, x, y, z):
+        new_pvalues(1)
+        return pval_func(data, x, y, z)
+
+    prefetch = None
+    if executor is not None:
+        prefetch = _prefetcher(args, cache, executor, new_pvalues)
+
+    indep_test, cond_indep_test = cache.tests(checkpointing)
+    start = time.perf_counter()
+    res = run_pc_algorithm(
+        data=data,
+        indep_test_func=indep_test,
+        cond_indep_test_func=cond_indep_test,
+        level=level,
+        bit_packed=args.bit_packed,
+        output_format='edge_list',
+        prefetch_tests_func=prefetch
+    )
+    cpdag = res[field_pc_cpdag]
+
+    metrics = {
+        'input': args.input,
+        'test': args.test,
+        'level': level,
+        'nb_obs': data.shape[0],
+        'nb_var': data.shape[1],
+        'nb_tests': cache.nb_computed - nb_computed,
+        'nb_cached_tests': cache.nb_hits - nb_hits,
+        'nb_directed_edges': len(cpdag.directed),
+        'nb_undirected_edges': len(cpdag.undirected),
+        'load_time': _worker_state['load_time'],
+        'wall_time': time.perf_counter() - start,
+    }
+    _write_results(args, level, cpdag, res[field_separation_sets], metrics)
+    if args.checkpoint_dir is not None:
+        cache.save(_checkpoint_filename(args, level, '_pvalues.npz'))
+        with open(_checkpoint_filename(args, level, '_done.json'),
+                  'w') as file:
+            json.dump(metrics, file)
+
+    return metrics
+
+
+def _print_metrics(metrics: dict) -> None:
+    print(f'Level {_format_level(metrics["level"])} : '
+          f'{metrics["nb_directed_edges"]} directed and '
+          f'{metrics["nb_undirected_edges"]} undirected edges, '
+          f'{metrics["nb_tests"]} tests ({metrics["nb_cached_tests"]} '
+          f'cached) in {metrics["wall_time"]:.3f} s', flush=True)
+
+
+def main(argv: list = None) -> int:
+    """
+    Runs the command-line entry point.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command-line arguments (defaults to sys.argv[1:]).
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.test == 'd-separation' and args.dag is None:
+        parser.error('--test d-separation requires --dag')
+    if args.test == 'd-separation' and args.columns is not None:
+        # The oracle would receive indices into the selected columns rather
+        # than into the variables of the DAG
+        parser.error('--columns cannot be used with --test d-separation')
+    if args.workers < 1:
+        parser.error('--workers must be positive')
+
+    for directory in (args.output_dir, args.cache_dir, args.checkpoint_dir):
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    levels = []
+    for level in dict.fromkeys(args.level):
+        done = None if args.checkpoint_dir is None else \
+            _checkpoint_filename(args, level, '_done.json')
+        if done is not None and os.path.exists(done):
+            print(f'Level {_format_level(level)} already completed, '
+                  f'skipping', flush=True)
+        else:
+            levels.append(level)
+
+    cache = _load_cache(args)
+    if len(levels) > 0:
+        # The data is not read if every level is checkpointed
+        _initialise_worker(args)
+    if args.workers == 1 or len(levels) == 0:
+        for level in levels:
+            _print_metrics(_run_level(args, level, cache))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+                max_workers=args.workers,
+                initializer=_initialise_worker, initargs=(args,)
+        ) as executor:
+            for level in levels:
+                _print_metrics(_run_level(args, level, cache, executor))
+
+    if args.cache_dir is not None:
+        cache.save(_cache_filename(args))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
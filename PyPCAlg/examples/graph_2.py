@@ -1,17 +1,18 @@
 """
 Corresponds to Directed Acyclic Graph X0 -> X1 -> X2.
 """
+import functools
 import os
 import numpy as np
 import pandas as pd
 
-from PyPCAlg.examples.oracle_tools import \
-    generate_oracle_independence_relationships, \
-    oracle_independence_test, oracle_conditional_independence_test
+from PyPCAlg.examples.oracle_tools import OracleStore, \
+    generate_oracle_independence_relationships
 from PyPCAlg.utilities.independence_relationships import \
     do_test_linear_independence, \
     do_test_linear_conditional_independence, \
-    produce_independence_relationships, render_independence_relationships
+    produce_independence_relationships, render_independence_relationships, \
+    save_independence_relationships
 
 
 def get_oracle_independence_relationships() -> dict:
@@ -26,38 +27,25 @@ def get_oracle_independence_relationships() -> dict:
     return oracle
 
 
-def oracle_indep_test() -> callable:
-
-    def res(data, x, y, level):
+@functools.lru_cache(maxsize=None)
+def get_oracle_store() -> OracleStore:
 
-        oracle = get_oracle_independence_relationships()
+    filename = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        'true_independence_relationships_graph_2.csv'
+    )
 
-        return oracle_independence_test(
-            oracle=oracle,
-            data=data,
-            x=x,
-            y=y,
-            level=level
-        )
+    return OracleStore.from_csv(filename)
 
-    return res
 
+def oracle_indep_test() -> callable:
 
-def oracle_cond_indep_test() -> callable:
+    return get_oracle_store().indep_test()
 
-    def res(data, x, y, z, level):
-        oracle = get_oracle_independence_relationships()
 
-        return oracle_conditional_independence_test(
-            oracle=oracle,
-            data=data,
-            x=x,
-            y=y,
-            z=z,
-            level=level
-        )
+def oracle_cond_indep_test() -> callable:
 
-    return res
+    return get_oracle_store().cond_indep_test()
 
 
 def get_graph_skeleton():
@@ -221,10 +209,9 @@ def run_example_with_linear_tests(sample_size: int, csv_filename: str):
         level=0.05
     )
 
-    df_independence_relationships.to_csv(
-        csv_filename,
-        sep=';',
-        index=False
+    save_independence_relationships(
+        df_independence_relationships,
+        csv_filename
     )
 
 
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas
 import pandas as pd
 
@@ -90,3 +91,202 @@ def oracle_conditional_independence_test(oracle: dict, data: pd.DataFrame,
         y=y,
         z=z
     )
+
+
+class OracleStore:
+    """
+    The (conditional) independence relationships of a true causal graph,
+    parsed once and indexed for fast lookup by the oracle tests.
+
+    The variables are numbered in the order of the columns of the data and a
+    relationship x _||_ y | z is stored under the integer key
+    ((x * nb_var + y) << nb_var) | mask(z), with x < y and mask(z) the bitmask
+    of the variables in z, so that a lookup takes no string manipulation.
+    The store can be saved to (and loaded from) a compact binary .npz file.
+
+    Parameters
+    ----------
+    variables : list
+        The names of the variables, in the order of the columns of the data.
+    keys : array_like
+        The integer keys of the relationships.
+    values : array_like
+        Whether each (conditional) independence relationship holds.
+    """
+
+    def __init__(self, variables: list[str], keys, values):
+        self.variables = list(variables)
+        self.nb_var = len(self.variables)
+        self._index = dict(zip((int(key) for key in keys),
+                               (bool(value) for value in values)))
+        # The last columns seen and their indices in the store, replaced as
+        # one tuple so that the threads sharing the store read a consistent
+        # pair
+        self._last_columns = (None, None)
+
+    @classmethod
+    def from_csv(cls, filename: str,
+                 variables: list[str] = None) -> 'OracleStore':
+        """
+        Parses a table of true independence relationships (in the format of
+        the true_independence_relationships_graph_*.csv files).
+
+        Parameters
+        ----------
+        filename : str
+            The path to the table.
+        variables : list, optional
+            The names of the variables, in the order of the columns of the
+            data (defaults to their order of first appearance in the table).
+
+        Returns
+        -------
+        OracleStore
+            The store.
+        """
+
+        df = _read_true_independence_relationships(filename)
+        xs = df['X'].astype(str).tolist()
+        ys = df['Y'].astype(str).tolist()
+        conditioning_sets = [
+            [elt.strip() for elt in cond_set[1:-1].split(',')
+             if elt.strip() != '']
+            for cond_set in df['Conditioning Set'].astype(str).tolist()
+        ]
+
+        if variables is None:
+            variables = list(dict.fromkeys(
+                name for pair in zip(xs, ys) for name in pair
+            ))
+        index = {name: i for i, name in enumerate(variables)}
+        nb_var = len(variables)
+
+        keys = []
+        for x, y, z in zip(xs, ys, conditioning_sets):
+            mask = 0
+            for name in z:
+                mask |= 1 << index[name]
+            i, j = sorted((index[x], index[y]))
+            keys.append(((i * nb_var + j) << nb_var) | mask)
+
+        return cls(
+            variables=variables,
+            keys=keys,
+            values=df['(Conditional) Independence Holds'].astype(bool)
+        )
+
+    def save(self, filename: str):
+        """
+        Saves the store to a NumPy .npz file.
+
+        Parameters
+        ----------
+        filename : str
+            The path to the file.
+        """
+
+        if 2 * self.nb_var.bit_length() + self.nb_var > 64:
+            raise ValueError(f'Too many variables ({self.nb_var}) to save '
+                             f'the keys as 64-bit integers !')
+
+        np.savez(
+            filename,
+            variables=np.asarray(self.variables, dtype=str),
+            keys=np.fromiter(self._index.keys(), dtype=np.uint64,
+                             count=len(self._index)),
+            values=np.fromiter(self._index.values(), dtype=bool,
+                               count=len(self._index))
+        )
+
+    @classmethod
+    def load(cls, filename: str) -> 'OracleStore':
+        """
+        Loads a store saved by OracleStore.save.
+
+        Parameters
+        ----------
+        filename : str
+            The path to the file.
+
+        Returns
+        -------
+        OracleStore
+            The store.
+        """
+
+        with np.load(filename) as archive:
+            return cls(
+                variables=archive['variables'].tolist(),
+                keys=archive['keys'].tolist(),
+                values=archive['values']
+            )
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def holds(self, x: int, y: int, z) -> bool:
+        """
+        Checks whether x _||_ y | z holds, the variables being given by their
+        indices in the store.
+        """
+
+        if x > y:
+            x, y = y, x
+        mask = 0
+        for i in z:
+            mask |= 1 << i
+
+        return self._index[((x * self.nb_var + y) << self.nb_var) | mask]
+
+    def _to_store_indices(self, data: pd.DataFrame):
+        """
+        Returns the indices in the store of the columns of the data, or None
+        if the columns are the variables of the store in the same order (or
+        if the data has no column names). The result is cached for the last
+        columns seen.
+        """
+
+        columns = getattr(data, 'columns', None)
+        if columns is None:
+            return None
+
+        last_columns, permutation = self._last_columns
+        if columns is not last_columns:
+            names = [str(name) for name in columns]
+            if names == self.variables:
+                permutation = None
+            else:
+                index = {name: i for i, name in enumerate(self.variables)}
+                permutation = [index[name] for name in names]
+            self._last_columns = (columns, permutation)
+
+        return permutation
+
+    def indep_test(self) -> callable:
+        """
+        Returns an unconditional independence test reading the store.
+        """
+
+        def res(data, x, y, level):
+            permutation = self._to_store_indices(data)
+            if permutation is not None:
+                x, y = permutation[x], permutation[y]
+
+            return self.holds(x, y, ())
+
+        return res
+
+    def cond_indep_test(self) -> callable:
+        """
+        Returns a conditional independence test reading the store.
+        """
+
+        def res(data, x, y, z, level):
+            permutation = self._to_store_indices(data)
+            if permutation is not None:
+                x, y = permutation[x], permutation[y]
+                z = [permutation[i] for i in z]
+
+            return self.holds(x, y, z)
+
+        return res
@@ -0,0 +1,267 @@
+"""
+This module contains a target-centric mode of the PC algorithm, which only
+discovers the causal neighbourhood of one variable (e.g. a KPI) instead of
+the whole graph.
+
+The Markov blanket of the target (its parents, its children and the other
+parents of its children, its spouses) is first estimated with the
+grow-shrink algorithm (see PyPCAlg.utilities.markov_blanket), with a number
+of tests linear in the number of variables. The parents and children of the
+target are then found among its blanket with the PC-simple algorithm
+(P. Bühlmann, M. Kalisch and M. H. Maathuis, 'Variable selection in
+high-dimensional linear models: partially faithful distributions and the
+PC-simple algorithm', Biometrika, 2010) : a candidate is removed as soon as
+it is independent of the target given a subset of the other candidates
+still adjacent to the target, the subsets growing in size. As the candidates
+which are descendants of the target may only be separated from it by
+non-candidates, the candidates are checked by symmetry (I. Tsamardinos,
+L. E. Brown and C. F. Aliferis, 'The max-min hill-climbing Bayesian network
+structure learning algorithm', Machine Learning, 2006) : v is kept only if
+the target is among the parents and children found for v.
+
+The neighbourhoods of the parents and children give the unshielded colliders
+into the target, and so its parents. The spouses are the variables of the
+blanket not adjacent to the target, and the common children of the target
+and a spouse are found with one test each, around the target : c is a common
+child if the spouse is dependent on the target given its separating set and
+c. More children are found with Meek's rule R1. Only the neighbourhoods of
+the target and of the variables adjacent to it are searched, so the number of
+tests grows with the number of variables times the size of these
+neighbourhoods, instead of with the size of the whole graph.
+"""
+from itertools import combinations
+
+import numpy as np
+
+from PyPCAlg.pc_algorithm import field_nb_tests
+from PyPCAlg.utilities.dataset import as_dataset
+from PyPCAlg.utilities.markov_blanket import grow_shrink
+
+field_target = 'Target'
+field_parents_and_children = 'ParentsAndChildren'
+field_parents = 'Parents'
+field_children = 'Children'
+field_markov_blanket = 'MarkovBlanket'
+field_target_separating_sets = 'TargetSeparatingSets'
+
+
+def find_parents_and_children(data, target: int, indep_test_func: callable,
+                              cond_indep_test_func: callable, level: float,
+                              candidates: list[int] = None,
+                              max_conditioning_size: int = None
+                              ) -> tuple[list[int], dict]:
+    """
+    Runs the PC-simple algorithm, which finds a superset of the parents and
+    children of a target variable.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame, Dataset, array_like or pyarrow.Table
+        The observations.
+    target : int
+        The index of the target variable.
+    indep_test_func : callable
+        A function to perform unconditional independence testing.
+    cond_indep_test_func : callable
+        A function to perform conditional independence testing.
+    level : float
+        The level for the tests.
+    candidates : list, optional
+        The indices of the candidate variables (defaults to all the variables
+        but the target).
+    max_conditioning_size : int, optional
+        The maximum size of the conditioning sets (defaults to no limit).
+
+    Returns
+    -------
+    tuple
+        The indices of the variables kept, in increasing order, and the
+        separating sets (as sorted tuples) of the variables removed, by
+        variable.
+    """
+    if candidates is None:
+        candidates = [v for v in range(data.shape[1]) if v != target]
+
+    separating_sets = dict()
+    active = []
+    for v in candidates:
+        if indep_test_func(data=data, x=target, y=v, level=level):
+            separating_sets[v] = tuple()
+        else:
+            active.append(v)
+
+    depth = 1
+    while len(active) - 1 >= depth and \
+            (max_conditioning_size is None or depth <= max_conditioning_size):
+        for v in list(active):
+            others = [u for u in active if u != v]
+            for z in combinations(others, depth):
+                if cond_indep_test_func(data=data, x=target, y=v, z=list(z),
+                                        level=level):
+                    active.remove(v)
+                    separating_sets[v] = tuple(sorted(z))
+                    break
+        depth += 1
+
+    return sorted(active), separating_sets
+
+
+def _counting(indep_test_func: callable, cond_indep_test_func: callable,
+              counts: dict) -> tuple[callable, callable]:
+    """
+    Wraps the tests so as to count them.
+    """
+    counts[field_nb_tests] = 0
+
+    def indep_test(data, x, y, level):
+        counts[field_nb_tests] += 1
+        return indep_test_func(data=data, x=x, y=y, level=level)
+
+    def cond_indep_test(data, x, y, z, level):
+        counts[field_nb_tests] += 1
+        return cond_indep_test_func(data=data, x=x, y=y, z=z, level=level)
+
+    return indep_test, cond_indep_test
+
+
+def run_local_discovery(data, target, indep_test_func: callable,
+                        cond_indep_test_func: callable, level: float,
+                        symmetry_correction: bool = True,
+                        orient: bool = True,
+                        markov_blanket: bool = False,
+                        max_conditioning_size: int = None) -> dict:
+    """
+    Discovers the causal neighbourhood of a target variable.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame, Dataset, array_like or pyarrow.Table
+        The observations.
+    target : int or str
+        The index (or the name) of the target variable.
+    indep_test_func : callable
+        A function to perform unconditional independence testing.
+    cond_indep_test_func : callable
+        A function to perform conditional independence testing.
+    level : float
+        The level for the tests.
+    symmetry_correction : bool, optional
+        Whether to keep a candidate only if the target is among its own
+        parents and children, which removes the false positives of
+        PC-simple (defaults to True).
+    orient : bool, optional
+        Whether to orient the edges around the target (defaults to True).
+    markov_blanket : bool, optional
+        Whether to find the spouses of the target and return its Markov
+        blanket (defaults to False).
+    max_conditioning_size : int, optional
+        The maximum size of the conditioning sets (defaults to no limit).
+
+    Returns
+    -------
+    dict
+        A dictionary containing the index of the target, the indices of its
+        parents and children, the sets separating the target from the other
+        variables (a dictionary keyed by variable, unlike the separation
+        sets of run_pc_algorithm) and the number of tests performed ;
+        with orient, the indices of the parents and of the children found
+        (the other neighbours being undirected) ; with markov_blanket, the
+        indices of the variables in the Markov blanket.
+    """
+    data = as_dataset(data)
+    if isinstance(target, (int, np.integer)):
+        target = int(target)
+    else:
+        target = list(data.columns).index(target)
+
+    res = dict()
+    indep_test, cond_indep_test = _counting(indep_test_func,
+                                            cond_indep_test_func, res)
+
+    # The parents and children, separating sets and Markov blankets of the
+    # variables, memoized
+    neighbourhoods = dict()
+
+    def neighbourhood(v):
+        if v not in neighbourhoods:
+            blanket, separating_sets_v = grow_shrink(
+                data=data, target=v, indep_test_func=indep_test,
+                cond_indep_test_func=cond_indep_test, level=level
+            )
+            # The variables adjacent to v are in its blanket
+            adjacent_v, separating_sets_blanket = find_parents_and_children(
+                data=data, target=v, indep_test_func=indep_test,
+                cond_indep_test_func=cond_indep_test, level=level,
+                candidates=blanket,
+                max_conditioning_size=max_conditioning_size
+            )
+            separating_sets_v.update(separating_sets_blanket)
+            neighbourhoods[v] = (adjacent_v, separating_sets_v, blanket)
+        return neighbourhoods[v]
+
+    adjacent, separating_sets, blanket = neighbourhood(target)
+    adjacent = list(adjacent)
+    separating_sets = dict(separating_sets)
+
+    if symmetry_correction:
+        for v in list(adjacent):
+            if target not in neighbourhood(v)[0]:
+                adjacent.remove(v)
+                # v was separated from the target, by a subset of the
+                # blanket of v
+                separating_sets[v] = neighbourhood(v)[1][target]
+
+    res[field_target] = target
+    res[field_parents_and_children] = adjacent
+    res[field_target_separating_sets] = separating_sets
+
+    if not (orient or markov_blanket):
+        return res
+
+    # Only the variables adjacent to the target (whose neighbourhoods were
+    # found for the symmetry correction) are checked for adjacency
+    def are_adjacent(u, v):
+        if symmetry_correction:
+            return v in neighbourhood(u)[0] and u in neighbourhood(v)[0]
+        return v in neighbourhood(u)[0] or u in neighbourhood(v)[0]
+
+    # Unshielded colliders a -> target <- b
+    parents = set()
+    for a, b in combinations(adjacent, 2):
+        if not are_adjacent(a, b):
+            separating_set = neighbourhood(a)[1].get(
+                b, neighbourhood(b)[1].get(a, ())
+            )
+            if target not in separating_set:
+                parents.update((a, b))
+
+    # Unshielded colliders target -> c <- v : the spouses v are the variables
+    # of the blanket not adjacent to the target, and c is a common child if
+    # conditioning on c makes v dependent on the target again
+    children = set()
+    spouses = {v for v in blanket if v not in adjacent}
+    for v in spouses:
+        for c in adjacent:
+            if c in separating_sets[v]:
+                continue
+            z = list(separating_sets[v]) + [c]
+            if not cond_indep_test(data=data, x=target, y=v, z=z,
+                                   level=level):
+                children.add(c)
+
+    # Meek's rule R1 : a -> target - c with a and c not adjacent
+    if orient:
+        for c in adjacent:
+            if c not in parents and \
+                    any(not are_adjacent(a, c) for a in parents):
+                children.add(c)
+
+        # Conflicting orientations are left undirected
+        conflicts = parents & children
+        res[field_parents] = sorted(parents - conflicts)
+        res[field_children] = sorted(children - conflicts)
+
+    if markov_blanket:
+        res[field_markov_blanket] = sorted(set(adjacent) | spouses)
+
+    return res
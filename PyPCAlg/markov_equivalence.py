@@ -0,0 +1,532 @@
+"""
+This module contains functions to count, enumerate and uniformly sample the
+Directed Acyclic Graphs (DAGs) in the Markov equivalence class represented by
+a Completed Partially Directed Acyclic Graph (CPDAG), such as the one returned
+by the PC algorithm.
+
+The undirected part of a CPDAG splits into chain components, which are
+undirected connected chordal graphs (UCCGs) and can be oriented independently
+of one another, so that the size of the Markov equivalence class is the
+product of the numbers of acyclic orientations without v-structures (AMOs) of
+the chain components. The AMOs of a UCCG are counted with the Clique-Picking
+algorithm of M. Wienöbst, M. Bannach and M. Liśkiewicz ('Polynomial-Time
+Algorithms for Counting and Sampling Markov Equivalent DAGs with
+Applications', JMLR 2023) : each AMO is counted once, for the first clique
+(in a traversal of a clique tree) that can start a topological ordering of
+it, and the remaining undirected components, obtained by orienting the edges
+out of that clique and applying Meek's rules, are counted recursively with
+memoization. The number of operations is polynomial in the number of nodes.
+"""
+import math
+
+from collections import deque
+
+import numpy as np
+
+from PyPCAlg.matrix_meeks_rules import split_pdag
+from PyPCAlg.meeks_rules import propagate_Meeks_rules
+from PyPCAlg.utilities.pc_algorithm import find_unshielded_triples_array
+
+
+def dag_to_cpdag(dag: np.ndarray) -> np.ndarray:
+    """
+    Returns the CPDAG of the Markov equivalence class of a DAG.
+
+    Parameters
+    ----------
+    dag : array_like
+        The adjacency matrix of the DAG.
+
+    Returns
+    -------
+    array_like
+        The CPDAG.
+    """
+
+    dag = np.asarray(dag) != 0
+    skeleton = dag | dag.T
+    cpdag = skeleton.astype(float)
+
+    triples = find_unshielded_triples_array(skeleton)
+    a, b, c = triples.T
+    is_v_structure = dag[a, b] & dag[c, b]
+    cpdag[b[is_v_structure], a[is_v_structure]] = 0
+    cpdag[b[is_v_structure], c[is_v_structure]] = 0
+
+    return propagate_Meeks_rules(pdag=cpdag, apply_R4=False)
+
+
+def find_chain_components(cpdag: np.ndarray) -> list[tuple]:
+    """
+    Finds the chain components of a CPDAG, i.e. the connected components of
+    its undirected part, with at least two nodes.
+
+    Parameters
+    ----------
+    cpdag : array_like
+        The CPDAG.
+
+    Returns
+    -------
+    list
+        The chain components, as sorted tuples of nodes.
+    """
+
+    edges = np.asarray(cpdag) != 0
+    undirected = edges & edges.T
+    np.fill_diagonal(undirected, False)
+
+    return _connected_components(undirected, range(undirected.shape[0]))
+
+
+def _connected_components(undirected: np.ndarray, nodes) -> list[tuple]:
+    """
+    Returns the connected components (with at least two nodes) of the
+    subgraph of an undirected graph induced by some nodes.
+    """
+
+    nodes = set(nodes)
+    components = []
+    while nodes:
+        start = nodes.pop()
+        component = [start]
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for neighbour in np.flatnonzero(undirected[node, :]).tolist():
+                if neighbour in nodes:
+                    nodes.remove(neighbour)
+                    component.append(neighbour)
+                    queue.append(neighbour)
+        if len(component) > 1:
+            components.append(tuple(sorted(component)))
+
+    return components
+
+
+def _clique_tree(undirected: np.ndarray,
+                 nodes: tuple) -> tuple[list[frozenset], list[int]]:
+    """
+    Computes the maximal cliques and a clique tree of a UCCG.
+
+    The maximal cliques are read off a maximum cardinality search ordering
+    and the clique tree is a maximum weight spanning tree of the clique
+    intersection graph.
+
+    Parameters
+    ----------
+    undirected : array_like
+        The boolean matrix of the undirected edges.
+    nodes : tuple
+        The nodes of the UCCG.
+
+    Returns
+    -------
+    tuple
+        The list of the maximal cliques as first element and, as second
+        element, the list of the parents of the cliques in the clique tree
+        rooted at the first clique (-1 for the root), the cliques being
+        listed in breadth-first order.
+    """
+
+    sub = undirected[np.ix_(nodes, nodes)]
+    m = len(nodes)
+
+    # Maximum cardinality search
+    weights = np.zeros(m, dtype=int)
+    numbered = np.zeros(m, dtype=bool)
+    candidates = []
+    for _ in range(m):
+        v = int(np.argmax(np.where(numbered, -1, weights)))
+        candidates.append(
+            frozenset([nodes[v]] +
+                      [nodes[u] for u in np.flatnonzero(sub[v] & numbered)])
+        )
+        numbered[v] = True
+        weights[sub[v] & ~numbered] += 1
+
+    cliques = []
+    for candidate in sorted(candidates, key=len, reverse=True):
+        if not any(candidate <= clique for clique in cliques):
+            cliques.append(candidate)
+
+    # Prim's algorithm for a maximum weight spanning tree
+    nb_cliques = len(cliques)
+    parents = [-1] * nb_cliques
+    best = [-1] * nb_cliques
+    in_tree = [False] * nb_cliques
+    order = []
+    best[0] = 0
+    for _ in range(nb_cliques):
+        i = max((k for k in range(nb_cliques) if not in_tree[k]),
+                key=lambda k: best[k])
+        in_tree[i] = True
+        order.append(i)
+        for k in range(nb_cliques):
+            if not in_tree[k]:
+                weight = len(cliques[i] & cliques[k])
+                if weight > best[k]:
+                    best[k] = weight
+                    parents[k] = i
+
+    # Breadth-first order from the root
+    children = [[] for _ in range(nb_cliques)]
+    for k in order[1:]:
+        children[parents[k]].append(k)
+    bfs = [order[0]]
+    for k in bfs:
+        bfs.extend(children[k])
+    position = {k: i for i, k in enumerate(bfs)}
+
+    return [cliques[k] for k in bfs], \
+        [-1 if parents[k] == -1 else position[parents[k]] for k in bfs]
+
+
+def _flower_paths(cliques: list[frozenset],
+                  parents: list[int]) -> list[list[frozenset]]:
+    """
+    Returns, for each clique, the separators on the path from the root of the
+    clique tree to the clique which are subsets of the clique.
+    """
+
+    paths = []
+    separators_to = [[]]
+    for k in range(1, len(cliques)):
+        parent = parents[k]
+        separators_to.append(separators_to[parent] +
+                             [cliques[parent] & cliques[k]])
+    for clique, separators in zip(cliques, separators_to):
+        paths.append(list({s for s in separators if s <= clique}))
+
+    return paths
+
+
+def _nb_prefix_free_orderings(prefix: frozenset, clique: frozenset,
+                              forbidden: list[frozenset]) -> int:
+    """
+    Counts the orderings of clique \\ prefix which, appended to prefix, never
+    form a prefix which is one of the forbidden sets.
+
+    The orderings which do form forbidden prefixes are classified by the
+    shortest such prefix.
+    """
+
+    above = sorted((s for s in forbidden if prefix < s), key=len)
+    nb_free = dict()
+    for s in above:
+        nb_free[s] = math.factorial(len(s) - len(prefix)) - sum(
+            nb_free[t] * math.factorial(len(s) - len(t))
+            for t in above if t < s
+        )
+
+    return math.factorial(len(clique) - len(prefix)) - sum(
+        nb_free[s] * math.factorial(len(clique) - len(s)) for s in above
+    )
+
+
+def _iter_prefix_free_orderings(prefix: tuple, clique: frozenset,
+                                forbidden: set[frozenset]):
+    """
+    Enumerates lazily the orderings of clique starting with prefix and
+    without any forbidden prefix.
+    """
+
+    if len(prefix) == len(clique):
+        yield prefix
+        return
+
+    for node in sorted(clique.difference(prefix)):
+        extended = prefix + (node,)
+        if frozenset(extended) not in forbidden:
+            yield from _iter_prefix_free_orderings(extended, clique,
+                                                   forbidden)
+
+
+def _random_below(total: int, rng: np.random.Generator) -> int:
+    """
+    Draws uniformly an integer in [0, total), total being a Python integer
+    of any size.
+    """
+
+    if total < 2 ** 63:
+        return int(rng.integers(total))
+
+    # Rejection sampling over the smallest number of bits covering total,
+    # which accepts a draw with probability above 1/2
+    nb_bits = (total - 1).bit_length()
+    nb_bytes = (nb_bits + 7) // 8
+    while True:
+        draw = int.from_bytes(rng.bytes(nb_bytes), 'little') >> \
+            (8 * nb_bytes - nb_bits)
+        if draw < total:
+            return draw
+
+
+def _sample_prefix_free_ordering(clique: frozenset, forbidden: list[frozenset],
+                                 rng: np.random.Generator) -> tuple:
+    """
+    Samples uniformly an ordering of clique without any forbidden prefix.
+    """
+
+    forbidden_sets = set(forbidden)
+    prefix = ()
+    while len(prefix) < len(clique):
+        nodes = sorted(clique.difference(prefix))
+        weights = []
+        for node in nodes:
+            extended = frozenset(prefix + (node,))
+            if extended in forbidden_sets:
+                weights.append(0)
+            else:
+                weights.append(
+                    _nb_prefix_free_orderings(extended, clique, forbidden)
+                )
+        total = sum(weights)
+        draw = _random_below(total, rng)
+        for node, weight in zip(nodes, weights):
+            if draw < weight:
+                prefix = prefix + (node,)
+                break
+            draw -= weight
+
+    return prefix
+
+
+class _UCCGCounter:
+    """
+    Counts, enumerates and samples the AMOs of the UCCGs of an undirected
+    graph, memoizing the counts by set of nodes.
+    """
+
+    def __init__(self, undirected: np.ndarray):
+        self.undirected = undirected
+        self.memo = dict()
+
+    def orient(self, nodes: tuple, ordering: tuple) -> tuple[list, list]:
+        """
+        Orients the edges of the UCCG out of a clique, the clique itself
+        following ordering, and applies Meek's rules.
+
+        Returns
+        -------
+        tuple
+            The directed edges (u, w) as first element and the undirected
+            components left as second element.
+        """
+
+        index = {node: i for i, node in enumerate(nodes)}
+        pdag = self.undirected[np.ix_(nodes, nodes)].astype(float)
+        # Only the edges from the earlier nodes of the ordering into a node
+        # of the clique are kept
+        placed = np.zeros(len(nodes), dtype=bool)
+        for node in ordering:
+            i = index[node]
+            pdag[~placed, i] = 0
+            placed[i] = True
+        pdag = propagate_Meeks_rules(pdag=pdag, apply_R4=True)
+
+        edges = pdag != 0
+        directed = edges & ~edges.T
+        rows, columns = np.nonzero(directed)
+        directed_edges = [(nodes[i], nodes[j])
+                          for i, j in zip(rows.tolist(), columns.tolist())]
+        undirected = edges & edges.T
+        components = [
+            tuple(nodes[i] for i in component)
+            for component in _connected_components(undirected,
+                                                   range(len(nodes)))
+        ]
+
+        return directed_edges, components
+
+    def count(self, nodes: tuple) -> int:
+        """
+        Counts the AMOs of the UCCG induced by nodes.
+        """
+
+        if len(nodes) <= 2:
+            return len(nodes)
+        if nodes not in self.memo:
+            self.memo[nodes] = self._decompose(nodes)
+
+        return sum(weight for (weight, _, _, _) in self.memo[nodes])
+
+    def _decompose(self, nodes: tuple) -> list[tuple]:
+        """
+        Returns, for each clique of a clique tree of the UCCG, the number of
+        AMOs counted for it, the clique, its forbidden prefixes and the
+        undirected components left once the clique has been picked.
+        """
+
+        cliques, parents = _clique_tree(self.undirected, nodes)
+        flower_paths = _flower_paths(cliques, parents)
+
+        decomposition = []
+        for clique, forbidden in zip(cliques, flower_paths):
+            nb_orderings = _nb_prefix_free_orderings(frozenset(), clique,
+                                                     forbidden)
+            if nb_orderings == 0:
+                continue
+            _, components = self.orient(nodes, tuple(sorted(clique)))
+            weight = nb_orderings
+            for component in components:
+                weight *= self.count(component)
+            decomposition.append((weight, clique, forbidden, components))
+
+        return decomposition
+
+    def iterate(self, nodes: tuple):
+        """
+        Enumerates lazily the AMOs of the UCCG induced by nodes, as lists of
+        directed edges.
+        """
+
+        if len(nodes) == 2:
+            yield [(nodes[0], nodes[1])]
+            yield [(nodes[1], nodes[0])]
+            return
+        self.count(nodes)
+
+        for (_, clique, forbidden, _) in self.memo[nodes]:
+            for ordering in _iter_prefix_free_orderings((), clique,
+                                                        set(forbidden)):
+                directed_edges, components = self.orient(nodes, ordering)
+                for orientations in _iter_product(
+                        [lambda c=c: self.iterate(c) for c in components]
+                ):
+                    yield directed_edges + orientations
+
+    def sample(self, nodes: tuple, rng: np.random.Generator) -> list:
+        """
+        Samples uniformly an AMO of the UCCG induced by nodes, as a list of
+        directed edges.
+        """
+
+        if len(nodes) == 2:
+            return [nodes if rng.random() < 0.5 else nodes[::-1]]
+        total = self.count(nodes)
+
+        draw = _random_below(total, rng)
+        for (weight, clique, forbidden, _) in self.memo[nodes]:
+            if draw < weight:
+                break
+            draw -= weight
+
+        ordering = _sample_prefix_free_ordering(clique, forbidden, rng)
+        directed_edges, components = self.orient(nodes, ordering)
+        for component in components:
+            directed_edges = directed_edges + self.sample(component, rng)
+
+        return directed_edges
+
+
+def _iter_product(factories: list[callable]):
+    """
+    Lazily enumerates the concatenations of one element of each of the
+    iterables returned by the factories (the iterables are recreated
+    instead of being stored).
+    """
+
+    if len(factories) == 0:
+        yield []
+        return
+
+    for first in factories[0]():
+        for rest in _iter_product(factories[1:]):
+            yield first + rest
+
+
+def count_markov_equivalent_dags(cpdag: np.ndarray) -> int:
+    """
+    Counts the DAGs in the Markov equivalence class represented by a CPDAG.
+
+    Parameters
+    ----------
+    cpdag : array_like
+        The CPDAG.
+
+    Returns
+    -------
+    int
+        The number of DAGs in the Markov equivalence class.
+    """
+
+    _, undirected = split_pdag(cpdag)
+    counter = _UCCGCounter(undirected)
+
+    nb_dags = 1
+    for component in find_chain_components(cpdag):
+        nb_dags *= counter.count(component)
+
+    return nb_dags
+
+
+def _to_dag(directed: np.ndarray, directed_edges: list) -> np.ndarray:
+
+    dag = directed.astype(float)
+    if len(directed_edges) > 0:
+        rows, columns = zip(*directed_edges)
+        dag[list(rows), list(columns)] = 1
+
+    return dag
+
+
+def iter_markov_equivalent_dags(cpdag: np.ndarray):
+    """
+    Enumerates lazily the DAGs in the Markov equivalence class represented by
+    a CPDAG, without materialising the whole class.
+
+    Parameters
+    ----------
+    cpdag : array_like
+        The CPDAG.
+
+    Yields
+    ------
+    array_like
+        The adjacency matrices of the DAGs in the Markov equivalence class.
+    """
+
+    directed, undirected = split_pdag(cpdag)
+    counter = _UCCGCounter(undirected)
+
+    components = find_chain_components(cpdag)
+    for directed_edges in _iter_product(
+            [lambda c=c: counter.iterate(c) for c in components]
+    ):
+        yield _to_dag(directed, directed_edges)
+
+
+def sample_markov_equivalent_dags(cpdag: np.ndarray, nb_samples: int,
+                                  rng: np.random.Generator = None):
+    """
+    Samples DAGs uniformly at random (with replacement) from the Markov
+    equivalence class represented by a CPDAG.
+
+    Parameters
+    ----------
+    cpdag : array_like
+        The CPDAG.
+    nb_samples : int
+        The number of DAGs to sample.
+    rng : numpy.random.Generator, optional
+        The random number generator.
+
+    Yields
+    ------
+    array_like
+        The adjacency matrices of the sampled DAGs.
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    directed, undirected = split_pdag(cpdag)
+    counter = _UCCGCounter(undirected)
+
+    components = find_chain_components(cpdag)
+    for _ in range(nb_samples):
+        directed_edges = []
+        for component in components:
+            directed_edges.extend(counter.sample(component, rng))
+        yield _to_dag(directed, directed_edges)
@@ -0,0 +1,359 @@
+"""
+This module contains an implementation of Meek's rules, as stated in Judea
+Pearl's 'Causality - Models, Reasoning, and Inference' (2009 ; 2nd edition) on
+page 51, in matrix form.
+
+The Partially Directed Acyclic Graph (PDAG) is split into a boolean matrix of
+the directed edges (directed[a, b] is True iff a -> b) and a symmetric boolean
+matrix of the undirected edges (undirected[a, b] is True iff a - b), and each
+rule is evaluated for all the candidate edges at once with matrix products
+and masks, instead of looping over the pairs of nodes as in module
+meeks_rules. The rules are applied simultaneously to all the edges they
+orient ; the resulting closure is the same as with module meeks_rules.
+"""
+import numpy as np
+
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+
+
+def split_pdag(pdag: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Splits a Partially Directed Acyclic Graph (PDAG) into its directed and
+    undirected edges.
+
+    Parameters
+    ----------
+    pdag : array_like
+        The PDAG.
+
+    Returns
+    -------
+    tuple
+        The boolean matrix of the directed edges as first element and the
+        boolean matrix of the undirected edges as second element.
+    """
+
+    edges = np.asarray(pdag) != 0
+    np.fill_diagonal(edges, False)
+
+    return edges & ~edges.T, edges & edges.T
+
+
+def merge_pdag(directed: np.ndarray, undirected: np.ndarray,
+               dtype=float) -> np.ndarray:
+    """
+    Merges the directed and undirected edges of a Partially Directed Acyclic
+    Graph (PDAG) back into its adjacency matrix.
+
+    Parameters
+    ----------
+    directed : array_like
+        The boolean matrix of the directed edges.
+    undirected : array_like
+        The boolean matrix of the undirected edges.
+    dtype : data-type, optional
+        The type of the entries of the matrix (defaults to float).
+
+    Returns
+    -------
+    array_like
+        The PDAG.
+    """
+
+    return (directed | undirected).astype(dtype)
+
+
+def _non_adjacent(directed: np.ndarray, undirected: np.ndarray) -> np.ndarray:
+    """
+    Returns the boolean matrix of the pairs of distinct nodes not connected
+    by any edge.
+    """
+
+    non_adjacent = ~(directed | directed.T | undirected)
+    np.fill_diagonal(non_adjacent, False)
+
+    return non_adjacent
+
+
+def _matmul(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Returns the boolean matrix product of two boolean matrices (computed in
+    floating point to benefit from BLAS).
+    """
+
+    return (left.astype(np.float32) @ right.astype(np.float32)) > 0
+
+
+def rule_R1(directed: np.ndarray, undirected: np.ndarray) -> np.ndarray:
+    """
+    Finds the edges oriented by Meek's rule R1.
+
+    In full : 'orient b - c into b -> c whenever there is an arrow a -> b such
+    that a and c are nonadjacent'.
+
+    Parameters
+    ----------
+    directed : array_like
+        The boolean matrix of the directed edges.
+    undirected : array_like
+        The boolean matrix of the undirected edges.
+
+    Returns
+    -------
+    array_like
+        The boolean matrix of the edges b -> c to orient.
+    """
+
+    non_adjacent = _non_adjacent(directed, undirected)
+
+    return undirected & _matmul(directed.T, non_adjacent)
+
+
+def rule_R2(directed: np.ndarray, undirected: np.ndarray) -> np.ndarray:
+    """
+    Finds the edges oriented by Meek's rule R2.
+
+    In full : 'orient a — b into a -> b whenever there is chain a -> c -> b'.
+
+    Parameters
+    ----------
+    directed : array_like
+        The boolean matrix of the directed edges.
+    undirected : array_like
+        The boolean matrix of the undirected edges.
+
+    Returns
+    -------
+    array_like
+        The boolean matrix of the edges a -> b to orient.
+    """
+
+    return undirected & _matmul(directed, directed)
+
+
+def rule_R3(directed: np.ndarray, undirected: np.ndarray) -> np.ndarray:
+    """
+    Finds the edges oriented by Meek's rule R3.
+
+    In full : 'orient a — b into a -> b whenever there are two chains
+    a — c -> b and a — d -> b such that c and d are nonadjacent'.
+
+    For each node b with at least two parents, the number of pairs of
+    nonadjacent parents c, d of b such that a - c and a - d is computed for
+    all the nodes a at once.
+
+    Parameters
+    ----------
+    directed : array_like
+        The boolean matrix of the directed edges.
+    undirected : array_like
+        The boolean matrix of the undirected edges.
+
+    Returns
+    -------
+    array_like
+        The boolean matrix of the edges a -> b to orient.
+    """
+
+    non_adjacent = _non_adjacent(directed, undirected).astype(np.float32)
+    oriented = np.zeros_like(undirected)
+
+    has_undirected_edge = undirected.any(axis=0)
+    candidates = np.flatnonzero(
+        (directed.sum(axis=0) >= 2) & has_undirected_edge
+    )
+    for b in candidates:
+        parents_b = np.flatnonzero(directed[:, b])
+        linked = undirected[:, parents_b].astype(np.float32)
+        nb_pairs = ((linked @ non_adjacent[np.ix_(parents_b, parents_b)]) *
+                    linked).sum(axis=1)
+        oriented[:, b] = undirected[:, b] & (nb_pairs > 0)
+
+    return oriented
+
+
+def rule_R4(directed: np.ndarray, undirected: np.ndarray) -> np.ndarray:
+    """
+    Finds the edges oriented by Meek's rule R4.
+
+    In full : 'orient a — b into a -> b whenever there are two chains
+    a — c -> d and c -> d -> b such that c and b are nonadjacent and a and d
+    are adjacent' (as in module meeks_rules, a - d is required).
+
+    For each node a with at least two undirected neighbours, the number of
+    pairs c, d of undirected neighbours of a such that c -> d -> b with c and
+    b nonadjacent is computed for all the nodes b at once.
+
+    Parameters
+    ----------
+    directed : array_like
+        The boolean matrix of the directed edges.
+    undirected : array_like
+        The boolean matrix of the undirected edges.
+
+    Returns
+    -------
+    array_like
+        The boolean matrix of the edges a -> b to orient.
+    """
+
+    non_adjacent = _non_adjacent(directed, undirected).astype(np.float32)
+    oriented = np.zeros_like(undirected)
+
+    candidates = np.flatnonzero(undirected.sum(axis=1) >= 2)
+    for a in candidates:
+        neighbours_a = np.flatnonzero(undirected[a, :])
+        # paths[d, b] : number of c's such that a - c, c -> d and c, b
+        # nonadjacent, for the undirected neighbours d of a
+        paths = directed[np.ix_(neighbours_a, neighbours_a)].T.astype(
+            np.float32
+        ) @ non_adjacent[neighbours_a, :]
+        nb_chains = (paths * directed[neighbours_a, :]).sum(axis=0)
+        oriented[a, :] = undirected[a, :] & (nb_chains > 0)
+
+    return oriented
+
+
+def _orient(directed: np.ndarray, undirected: np.ndarray,
+            oriented: np.ndarray) -> bool:
+    """
+    Orients the edges a - b into a -> b for which oriented[a, b] is True, in
+    place. Edges which would be oriented both ways (which cannot happen with
+    a consistent PDAG) are left undirected.
+
+    Returns
+    -------
+    bool
+        Whether at least one edge was oriented.
+    """
+
+    oriented = oriented & ~oriented.T
+    if not oriented.any():
+        return False
+
+    directed |= oriented
+    undirected &= ~(oriented | oriented.T)
+
+    return True
+
+
+def _apply_rule(rule: callable, pdag: np.ndarray) -> np.ndarray:
+
+    directed, undirected = split_pdag(pdag)
+    _orient(directed, undirected, rule(directed, undirected))
+
+    return merge_pdag(directed, undirected, dtype=np.asarray(pdag).dtype)
+
+
+def apply_rule_R1(pdag: np.ndarray) -> np.ndarray:
+    """
+    Applies Meek's rule R1 to a Partially Directed Acyclic Graph (PDAG).
+
+    Parameters
+    ----------
+    pdag : array_like
+        The PDAG.
+
+    Returns
+    -------
+    array_like
+        The PDAG after applying rule R1.
+    """
+
+    return _apply_rule(rule_R1, pdag)
+
+
+def apply_rule_R2(pdag: np.ndarray) -> np.ndarray:
+    """
+    Applies Meek's rule R2 to a Partially Directed Acyclic Graph (PDAG).
+
+    Parameters
+    ----------
+    pdag : array_like
+        The PDAG.
+
+    Returns
+    -------
+    array_like
+        The PDAG after applying rule R2.
+    """
+
+    return _apply_rule(rule_R2, pdag)
+
+
+def apply_rule_R3(pdag: np.ndarray) -> np.ndarray:
+    """
+    Applies Meek's rule R3 to a Partially Directed Acyclic Graph (PDAG).
+
+    Parameters
+    ----------
+    pdag : array_like
+        The PDAG.
+
+    Returns
+    -------
+    array_like
+        The PDAG after applying rule R3.
+    """
+
+    return _apply_rule(rule_R3, pdag)
+
+
+def apply_rule_R4(pdag: np.ndarray) -> np.ndarray:
+    """
+    Applies Meek's rule R4 to a Partially Directed Acyclic Graph (PDAG).
+
+    Parameters
+    ----------
+    pdag : array_like
+        The PDAG.
+
+    Returns
+    -------
+    array_like
+        The PDAG after applying rule R4.
+    """
+
+    return _apply_rule(rule_R4, pdag)
+
+
+def propagate_Meeks_rules(pdag: np.ndarray, apply_R4: bool) -> np.ndarray:
+    """
+    Applies Meek's rules to a Partially Directed Acyclic Graph (PDAG) until
+    no more edge can be oriented.
+
+    Parameters
+    ----------
+    pdag : array_like or BitPackedGraph
+        The PDAG.
+    apply_R4 : bool
+        Whether to apply Meek's rule R4 (not necessary for the PC algorithm).
+
+    Returns
+    -------
+    array_like or BitPackedGraph
+        The PDAG after applying Meek's rules, in the same format as the
+        input.
+    """
+
+    bit_packed = isinstance(pdag, BitPackedGraph)
+    if bit_packed:
+        pdag = pdag.to_adjacency_matrix(dtype=bool)
+
+    directed, undirected = split_pdag(pdag)
+
+    rules = [rule_R1, rule_R2, rule_R3]
+    if apply_R4:
+        rules.append(rule_R4)
+
+    while True:
+        oriented = np.zeros_like(undirected)
+        for rule in rules:
+            oriented |= rule(directed, undirected)
+        if not _orient(directed, undirected, oriented):
+            break
+
+    if bit_packed:
+        return BitPackedGraph.from_adjacency_matrix(directed | undirected)
+
+    return merge_pdag(directed, undirected, dtype=np.asarray(pdag).dtype)
@@ -5,11 +5,14 @@ page 51, to Partially Directed Acyclic Graphs (PDAGs).
 """
 import copy
 
+from collections import deque
+
 import numpy as np
 
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
 from PyPCAlg.utilities.pdag import find_children, find_parents, \
-    find_undirected_neighbours, find_undirected_adjacent_pairs, \
-    find_undirected_non_adjacent_pairs
+    find_undirected_neighbours, iter_undirected_adjacent_pairs, \
+    iter_undirected_non_adjacent_pairs
 
 
 def apply_rule_R1(pdag: np.ndarray) -> np.ndarray:
@@ -32,7 +35,8 @@ def apply_rule_R1(pdag: np.ndarray) -> np.ndarray:
 
     new_pdag = copy.deepcopy(pdag)
 
-    non_adjacent_vertices = find_undirected_non_adjacent_pairs(pdag=pdag)
+    # Read lazily from the input, which is not modified
+    non_adjacent_vertices = iter_undirected_non_adjacent_pairs(pdag=pdag)
 
     for a, c in non_adjacent_vertices:
 
@@ -68,7 +72,9 @@ def apply_rule_R2(pdag: np.ndarray) -> np.ndarray:
 
     new_pdag = copy.deepcopy(pdag)
 
-    adjacent_vertices = find_undirected_adjacent_pairs(new_pdag)
+    # The undirected edges of the copy before it is modified, read lazily
+    # from the input
+    adjacent_vertices = iter_undirected_adjacent_pairs(pdag)
 
     for a, b in adjacent_vertices:
 
@@ -106,7 +112,9 @@ def apply_rule_R3(pdag: np.ndarray) -> np.ndarray:
 
     new_pdag = copy.deepcopy(pdag)
 
-    adjacent_vertices = find_undirected_adjacent_pairs(new_pdag)
+    # The undirected edges of the copy before it is modified, read lazily
+    # from the input
+    adjacent_vertices = iter_undirected_adjacent_pairs(pdag)
 
     for a, b in adjacent_vertices:
 
@@ -160,7 +168,9 @@ def apply_rule_R4(pdag: np.ndarray) -> np.ndarray:
 
     new_pdag = copy.deepcopy(pdag)
 
-    adjacent_vertices = find_undirected_adjacent_pairs(new_pdag)
+    # The undirected edges of the copy before it is modified, read lazily
+    # from the input
+    adjacent_vertices = iter_undirected_adjacent_pairs(pdag)
 
     for a, b in adjacent_vertices:
 
@@ -217,3 +227,151 @@ def apply_Meeks_rules(pdag: np.ndarray, apply_R4: bool) -> np.ndarray:
         new_pdag = apply_rule_R4(pdag=new_pdag)
 
     return new_pdag
+
+
+def _edge_masks(pdag: np.ndarray, node: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the boolean masks of the nodes b such that node -> b (first
+    element) and such that b -> node (second element) are edges of the PDAG,
+    undirected edges counting in both directions.
+    """
+
+    if isinstance(pdag, BitPackedGraph):
+        return pdag.row(node), pdag.column(node)
+
+    return pdag[node, :] != 0, pdag[:, node] != 0
+
+
+def _induced_adjacency(pdag: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """
+    Returns the boolean matrix of the adjacencies (edges of any kind) between
+    some nodes of the PDAG.
+    """
+
+    if isinstance(pdag, BitPackedGraph):
+        edges = pdag.submatrix(nodes)
+    else:
+        edges = pdag[np.ix_(nodes, nodes)] != 0
+
+    return edges | edges.T
+
+
+def _is_orientable(pdag: np.ndarray, a: int, b: int, apply_R4: bool) -> bool:
+    """
+    Checks whether one of Meek's rules orients the undirected edge a - b of a
+    Partially Directed Acyclic Graph (PDAG) into a -> b.
+
+    Parameters
+    ----------
+    pdag : array_like or BitPackedGraph
+        The PDAG.
+    a : int
+        The first end of the edge.
+    b : int
+        The second end of the edge.
+    apply_R4 : bool
+        Whether to check Meek's rule R4.
+
+    Returns
+    -------
+    bool
+        Whether a - b can be oriented into a -> b.
+    """
+
+    out_a, in_a = _edge_masks(pdag, a)
+    out_b, in_b = _edge_masks(pdag, b)
+
+    # R1 : c -> a with c and b nonadjacent
+    parents_a = in_a & ~out_a
+    non_adjacent_b = ~(out_b | in_b)
+    non_adjacent_b[b] = False
+    if np.any(parents_a & non_adjacent_b):
+        return True
+
+    # R2 : a -> c -> b
+    parents_b = in_b & ~out_b
+    if np.any(out_a & ~in_a & parents_b):
+        return True
+
+    # R3 : a - c -> b and a - d -> b with c and d nonadjacent
+    undirected_neighbours_a = out_a & in_a
+    undirected_neighbours_a[b] = False
+    candidates = np.flatnonzero(undirected_neighbours_a & parents_b)
+    if len(candidates) >= 2:
+        adjacent = _induced_adjacency(pdag, candidates)
+        np.fill_diagonal(adjacent, True)
+        if not np.all(adjacent):
+            return True
+
+    # R4 : a - d -> b and a - c -> d with c and b nonadjacent
+    if apply_R4:
+        for d in candidates:
+            out_d, in_d = _edge_masks(pdag, d)
+            if np.any(in_d & ~out_d & undirected_neighbours_a &
+                      non_adjacent_b):
+                return True
+
+    return False
+
+
+def propagate_Meeks_rules(pdag: np.ndarray, apply_R4: bool) -> np.ndarray:
+    """
+    Applies Meek's rules to a Partially Directed Acyclic Graph (PDAG) until
+    no more edge can be oriented, modifying the PDAG in place.
+
+    The undirected edges to examine are kept in a worklist. Initially all
+    the undirected edges are examined ; afterwards, orienting a - b into
+    a -> b only puts back in the worklist the undirected edges incident to a
+    or b (and, when rule R4 is applied, those incident to the undirected
+    neighbours of a), which are the only ones a new orientation can make
+    orientable. The work is thus proportional to the neighbourhoods affected
+    by the orientations rather than to the number of pairs of nodes at each
+    pass over the graph.
+
+    Parameters
+    ----------
+    pdag : array_like or BitPackedGraph
+        The PDAG.
+    apply_R4 : bool
+        Whether to apply Meek's rule R4 (not necessary for the PC algorithm).
+
+    Returns
+    -------
+    array_like or BitPackedGraph
+        The PDAG (the same object as the input) after applying Meek's rules.
+    """
+
+    def undirected_edges_at(node):
+        out_node, in_node = _edge_masks(pdag, node)
+        for neighbour in np.flatnonzero(out_node & in_node).tolist():
+            if neighbour != node:
+                yield node, neighbour
+                yield neighbour, node
+
+    worklist = deque(iter_undirected_adjacent_pairs(pdag))
+    in_worklist = set(worklist)
+
+    while worklist:
+
+        a, b = worklist.popleft()
+        in_worklist.discard((a, b))
+
+        # The edge may have been oriented since it was put in the worklist
+        if pdag[a, b] == 0 or pdag[b, a] == 0:
+            continue
+
+        if not _is_orientable(pdag, a, b, apply_R4):
+            continue
+
+        pdag[b, a] = 0
+
+        touched = [a, b]
+        if apply_R4:
+            touched.extend(find_undirected_neighbours(pdag=pdag, node=a))
+        for node in touched:
+            for edge in undirected_edges_at(node):
+                if edge not in in_worklist:
+                    in_worklist.add(edge)
+                    worklist.append(edge)
+
+    return pdag
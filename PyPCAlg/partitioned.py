@@ -0,0 +1,357 @@
+"""
+This module contains a partitioned (divide-and-conquer) mode of the PC
+algorithm, for graphs with too many variables for a single adjacency phase.
+
+The pairs of variables are first tested for marginal independence (the depth
+0 of the adjacency phase), and the variables are partitioned into clusters of
+bounded size along the graph of the marginal dependences. The clusters are
+the units of work of a pool of worker processes : for each variable of a
+cluster, its Markov blanket is estimated with the grow-shrink algorithm among
+the variables marginally dependent on it, and the adjacency search of the PC
+algorithm is run from the variable, given the subsets of increasing size of
+the variables of its blanket still adjacent to it (the PC-simple algorithm,
+see PyPCAlg.local_discovery). The variables of a cluster being dependent on
+one another, their searches share many tests, which are cached per cluster.
+
+A pair removed from either of its variables is separated by the set found,
+so the removals hold for the whole graph. A pair kept from both its
+variables is adjacent : if it were not, the parents of one of them would
+separate it, and these parents are among the variables of its blanket still
+adjacent to it. The searches therefore need no reconciliation across the
+clusters, and a single orientation phase is run on the merged skeleton.
+
+With correct tests, the skeleton and the CPDAG are those of a single run of
+the PC algorithm ; the separating sets found may differ.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import stats
+
+from PyPCAlg.local_discovery import find_parents_and_children
+from PyPCAlg.pc_algorithm import run_pc_orientation_phase, field_pc_cpdag, \
+    field_separation_sets, field_nb_tests, output_formats
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+from PyPCAlg.utilities.dataset import as_dataset
+from PyPCAlg.utilities.edge_list import EdgeListCPDAG
+from PyPCAlg.utilities.markov_blanket import grow_shrink
+from PyPCAlg.utilities.pvalue_cache import PValueCache
+from PyPCAlg.utilities.separation_sets import SeparationSets
+from PyPCAlg.utilities.sufficient_statistics import \
+    GaussianSufficientStatistics
+
+field_clusters = 'Clusters'
+
+# The observations (or sufficient statistics) and the tests, set once per
+# worker process by _initialise_worker rather than sent with every cluster
+_worker_state = dict()
+
+
+def partition_variables(neighbours: list[set], max_cluster_size: int
+                        ) -> list[list[int]]:
+    """
+    Partitions the variables into clusters of bounded size along a graph :
+    the small connected components are packed together, and the large ones
+    are split into connected regions grown breadth-first from the vertices
+    of lowest degree.
+
+    Parameters
+    ----------
+    neighbours : list
+        The set of the neighbours of each variable in the graph.
+    max_cluster_size : int
+        The maximum number of variables in a cluster.
+
+    Returns
+    -------
+    list
+        The clusters, as sorted lists of variable indices.
+    """
+    if max_cluster_size < 1:
+        raise ValueError(f'The clusters must hold at least one variable, got '
+                         f'max_cluster_size = {max_cluster_size} !')
+
+    def grow(seed, allowed, size):
+        region = [seed]
+        seen = {seed}
+        queue = deque([seed])
+        while queue and len(region) < size:
+            for v in sorted(neighbours[queue.popleft()]):
+                if v in allowed and v not in seen:
+                    seen.add(v)
+                    region.append(v)
+                    queue.append(v)
+                    if len(region) == size:
+                        break
+        return region
+
+    nb_var = len(neighbours)
+    assigned = np.zeros(nb_var, dtype=bool)
+    clusters = []
+    packed = []
+    for x in range(nb_var):
+        if assigned[x]:
+            continue
+        component = grow(x, range(nb_var), nb_var)
+        assigned[component] = True
+
+        if len(component) <= max_cluster_size:
+            if len(packed) + len(component) > max_cluster_size:
+                clusters.append(sorted(packed))
+                packed = []
+            packed.extend(component)
+            continue
+
+        remaining = set(component)
+        while remaining:
+            seed = min(remaining,
+                       key=lambda v: (len(neighbours[v] & remaining), v))
+            region = grow(seed, remaining, max_cluster_size)
+            remaining.difference_update(region)
+            clusters.append(sorted(region))
+
+    if packed:
+        clusters.append(sorted(packed))
+
+    return clusters
+
+
+def _marginal_pvalues(correlation: np.ndarray, nb_obs: int) -> np.ndarray:
+    """
+    Computes the p-values of the correlations, as correlation_pval does for
+    one correlation.
+    """
+    dof = nb_obs - 2
+    if dof <= 0:
+        return np.full(correlation.shape, np.nan)
+    r = np.clip(correlation, -1.0, 1.0)
+    with np.errstate(divide='ignore'):
+        statistic = np.abs(r) * np.sqrt(dof / (1 - r * r))
+    pvals = 2 * stats.t.sf(statistic, dof)
+    pvals[np.abs(r) == 1.0] = 0.0
+
+    return pvals
+
+
+def _initialise_worker(data, indep_test_func: callable,
+                       cond_indep_test_func: callable, level: float) -> None:
+    _worker_state['data'] = data
+    _worker_state['indep_test_func'] = indep_test_func
+    _worker_state['cond_indep_test_func'] = cond_indep_test_func
+    _worker_state['level'] = level
+
+
+def _marginal_dependences(rows: list[int]) -> list[tuple[int, list[int]]]:
+    """
+    Tests the variables of rows for marginal independence from the variables
+    of higher index, in the current (worker) process.
+
+    Returns the variables of higher index marginally dependent on each
+    variable of rows.
+    """
+    data = _worker_state['data']
+    level = _worker_state['level']
+    indep_test_func = _worker_state['indep_test_func']
+
+    res = []
+    for x in rows:
+        if indep_test_func is None:
+            pvals = _marginal_pvalues(data.correlation()[x, x + 1:],
+                                      data.nb_obs)
+            # Missing p-values count as dependences, as in the tests
+            dependent = (x + 1 + np.flatnonzero(~(pvals >= level))).tolist()
+        else:
+            dependent = [
+                y for y in range(x + 1, data.shape[1])
+                if not indep_test_func(data=data, x=x, y=y, level=level)
+            ]
+        res.append((x, dependent))
+
+    return res
+
+
+def _run_cluster(cluster: list[int], candidates: list[list[int]]
+                 ) -> tuple[list[tuple], int]:
+    """
+    Estimates the Markov blankets of the variables of a cluster among their
+    candidates (the variables marginally dependent on them), and searches the
+    variables adjacent to each variable of the cluster among its blanket, in
+    the current (worker) process.
+
+    Returns the pairs of variables removed (as indices in the whole graph)
+    with their separating sets, and the number of tests performed.
+    """
+    data = _worker_state['data']
+    level = _worker_state['level']
+    indep_test_func = _worker_state['indep_test_func']
+    cond_indep_test_func = _worker_state['cond_indep_test_func']
+
+    counts = {'nb_tests': 0}
+    if indep_test_func is None:
+        # The tests of the blankets and of the adjacency search share a cache
+        cache = PValueCache()
+        indep_test, cond_indep_test = data.tests(cache=cache, counts=counts)
+    else:
+        def indep_test(data, x, y, level):
+            counts['nb_tests'] += 1
+            return indep_test_func(data=data, x=x, y=y, level=level)
+
+        def cond_indep_test(data, x, y, z, level):
+            counts['nb_tests'] += 1
+            return cond_indep_test_func(data=data, x=x, y=y, z=z,
+                                        level=level)
+
+    removed = []
+    for x, candidates_x in zip(cluster, candidates):
+        blanket, separating_sets = grow_shrink(
+            data=data, target=x, indep_test_func=indep_test,
+            cond_indep_test_func=cond_indep_test, level=level,
+            candidates=candidates_x
+        )
+        removed.extend((x, y, z) for y, z in separating_sets.items())
+        _, separating_sets = find_parents_and_children(
+            data=data, target=x, indep_test_func=indep_test,
+            cond_indep_test_func=cond_indep_test, level=level,
+            candidates=blanket
+        )
+        removed.extend((x, y, z) for y, z in separating_sets.items())
+
+    return removed, counts['nb_tests']
+
+
+def run_pc_partitioned(data, level: float, indep_test_func: callable = None,
+                       cond_indep_test_func: callable = None,
+                       max_cluster_size: int = 50, nb_workers: int = 1,
+                       bit_packed: bool = False,
+                       matrix_form_meeks_rules: bool = False,
+                       output_format: str = 'dense') -> dict:
+    """
+    Runs the adjacency search of the PC algorithm from each variable, given
+    its Markov blanket, on clusters of variables processed in a pool of
+    worker processes, and merges their results (see the module description).
+
+    Parameters
+    ----------
+    data : pandas.DataFrame, Dataset, array_like, pyarrow.Table or
+    GaussianSufficientStatistics
+        The observations, or their sufficient statistics for the linear
+        tests.
+    level : float
+        The level for the tests.
+    indep_test_func : callable, optional
+        A function to perform unconditional independence testing (which
+        must be picklable if nb_workers > 1). Defaults to the linear test,
+        computed from the sufficient statistics of the observations.
+    cond_indep_test_func : callable, optional
+        A function to perform conditional independence testing (likewise).
+    max_cluster_size : int, optional
+        The maximum number of variables of a cluster (defaults to 50).
+    nb_workers : int, optional
+        The number of worker processes, each of which holds a copy of the
+        observations or of the sufficient statistics (defaults to 1, for a
+        run in the current process).
+    bit_packed : bool, optional
+        Whether to store the skeleton and the CPDAG in bit-packed form (see
+        run_pc_algorithm).
+    matrix_form_meeks_rules : bool, optional
+        Whether to apply Meek's rules in matrix form.
+    output_format : str, optional
+        The format of the CPDAG returned (see run_pc_algorithm).
+
+    Returns
+    -------
+    dict
+        A dictionary containing the CPDAG, the separation sets, the number of
+        tests performed and the clusters.
+    """
+    if output_format not in output_formats:
+        raise ValueError(f'Unknown output format {output_format}, expected '
+                         f'one of {output_formats} !')
+    if (indep_test_func is None) != (cond_indep_test_func is None):
+        raise ValueError('Provide both independence tests or none !')
+
+    if indep_test_func is None:
+        if not isinstance(data, GaussianSufficientStatistics):
+            data = GaussianSufficientStatistics.from_data(data)
+        column_names = data.columns
+    elif isinstance(data, GaussianSufficientStatistics):
+        raise ValueError('User-provided tests require the observations, not '
+                         'their sufficient statistics !')
+    else:
+        data = as_dataset(data)
+        column_names = list(data.columns)
+    nb_var = len(column_names)
+    arguments = (data, indep_test_func, cond_indep_test_func, level)
+
+    # Interleaved rows, so that the blocks hold as many pairs each
+    nb_blocks = max(1, min(nb_var, 4 * nb_workers))
+    blocks = [list(range(k, nb_var, nb_blocks)) for k in range(nb_blocks)]
+
+    def run(executor_map):
+        neighbours = [set() for _ in range(nb_var)]
+        for block in executor_map(_marginal_dependences, blocks):
+            for x, dependent in block:
+                neighbours[x].update(dependent)
+                for y in dependent:
+                    neighbours[y].add(x)
+
+        clusters = partition_variables(neighbours, max_cluster_size)
+        candidates = [[sorted(neighbours[x]) for x in cluster]
+                      for cluster in clusters]
+
+        return neighbours, clusters, list(executor_map(
+            _run_cluster, clusters, candidates
+        ))
+
+    if nb_workers <= 1:
+        _initialise_worker(*arguments)
+        try:
+            neighbours, clusters, results = run(map)
+        finally:
+            _worker_state.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=nb_workers,
+                                 initializer=_initialise_worker,
+                                 initargs=arguments) as executor:
+            neighbours, clusters, results = run(executor.map)
+
+    separation_sets = SeparationSets(nb_var=nb_var)
+    nb_tests = nb_var * (nb_var - 1) // 2
+    for x in range(nb_var):
+        for y in range(x + 1, nb_var):
+            if y not in neighbours[x]:
+                separation_sets.add(x, y, tuple())
+
+    # A pair removed in any cluster is removed
+    adjacent = neighbours
+    for removed, nb_tests_cluster in results:
+        nb_tests += nb_tests_cluster
+        for x, y, z in removed:
+            adjacent[x].discard(y)
+            adjacent[y].discard(x)
+            separation_sets.add(x, y, z)
+
+    if bit_packed:
+        causal_skeleton = BitPackedGraph(nb_var)
+    else:
+        causal_skeleton = np.zeros((nb_var, nb_var))
+    for x in range(nb_var):
+        for y in adjacent[x]:
+            causal_skeleton[x, y] = 1
+
+    cpdag = run_pc_orientation_phase(
+        causal_skeleton=causal_skeleton,
+        separation_sets=separation_sets,
+        matrix_form_meeks_rules=matrix_form_meeks_rules
+    )
+
+    if output_format == 'edge_list':
+        cpdag = EdgeListCPDAG.from_pdag(cpdag, column_names=column_names)
+
+    return {
+        field_pc_cpdag: cpdag,
+        field_separation_sets: separation_sets,
+        field_nb_tests: nb_tests,
+        field_clusters: clusters
+    }
@@ -1,31 +1,57 @@
+from collections.abc import Mapping
 from itertools import combinations
 
 import copy
+import logging
 
 import numpy as np
 import pandas as pd
 
-from PyPCAlg.utilities.logs import create_logger
-from PyPCAlg.utilities.pc_algorithm import find_adjacent_vertices, \
-    find_adjacent_vertices_to, find_unshielded_triples
-from PyPCAlg.meeks_rules import apply_Meeks_rules
+from PyPCAlg.background_knowledge import BackgroundKnowledge, \
+    orient_with_background_knowledge
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+from PyPCAlg.utilities.dataset import as_dataset
+from PyPCAlg.utilities.edge_list import EdgeListCPDAG
+from PyPCAlg.utilities.logs import create_logger, flush_log_file
+from PyPCAlg.utilities.markov_blanket import estimate_markov_blankets
+from PyPCAlg.utilities.trace import DecisionTraceWriter, record_decisions, \
+    read_decision_trace, replay_indep_test, replay_cond_indep_test
+from PyPCAlg.utilities.separation_sets import SeparationSets
+from PyPCAlg.utilities.pc_algorithm import iter_adjacent_vertices, \
+    find_adjacent_vertices_to, find_unshielded_triples_array, \
+    find_unshielded_colliders
+from PyPCAlg.meeks_rules import propagate_Meeks_rules
+from PyPCAlg import matrix_meeks_rules
 
 field_pc_cpdag = 'CPDAG'
 field_separation_sets = 'SeparationSets'
+field_nb_tests = 'NbTests'
+
+output_formats = ('dense', 'edge_list')
 
 
 def run_pc_adjacency_phase(data: pd.DataFrame, indep_test_func: callable,
                            cond_indep_test_func: callable,
                            level: float,
-                           log_file: str = '') -> tuple[np.ndarray, dict]:
+                           log_file: str = '',
+                           log_level: int = logging.INFO,
+                           bit_packed: bool = False,
+                           background_knowledge: BackgroundKnowledge = None,
+                           markov_blanket_prefilter: bool = False,
+                           marginal_screening: bool = True,
+                           prefetch_tests_func: callable = None
+                           ) -> tuple[np.ndarray, SeparationSets]:
     """
     Runs the adjacency phase of the PC algorithm, producing the causal
     skeleton and the separation sets.
 
     Parameters
     ----------
-    data : pandas.DataFrame
-        The observations.
+    data : pandas.DataFrame, Dataset, array_like, numpy.memmap or
+    pyarrow.Table
+        The observations. A DataFrame is passed to the tests as is ; any
+        other input is wrapped once into a Dataset (a contiguous buffer of
+        floats with zero-copy column views and the column names).
     indep_test_func : callable
         A function to perform unconditional independence testing.
     cond_indep_test_func : callable
@@ -35,73 +61,183 @@ def run_pc_adjacency_phase(data: pd.DataFrame, indep_test_func: callable,
     log_file : str, optional
         The path to a file in which to store the log. No log will be generated
         if the empty string is provided.
+    log_level : int, optional
+        The logging level (defaults to logging.INFO). The individual tests
+        and the causal skeleton at each depth are only logged at level
+        logging.DEBUG.
+    bit_packed : bool, optional
+        Whether to store the causal skeleton as a BitPackedGraph (one bit per
+        entry) rather than as a dense matrix of floats, for very wide
+        datasets.
+    background_knowledge : BackgroundKnowledge, optional
+        Background knowledge on the true causal graph. Pairs of variables
+        which cannot be adjacent are removed from the skeleton without being
+        tested (and get no separation set), pairs which must be adjacent are
+        never tested, and the conditioning sets are only searched among the
+        variables allowed in a separating set of the pair tested.
+    markov_blanket_prefilter : bool, optional
+        Whether to first estimate the Markov blanket of each variable with
+        the grow-shrink algorithm (see module markov_blanket), and remove
+        from the skeleton the pairs of variables outside each other's
+        blanket, with the set separating them found on the way. The
+        conditioning sets of a variable are then searched among the
+        variables adjacent to it in its blanket, which contains its parents.
+    marginal_screening : bool, optional
+        With markov_blanket_prefilter, whether to test every pair of
+        variables for marginal independence first, and to only search the
+        blanket of a variable among the variables marginally dependent on it
+        (see estimate_markov_blankets). The quadratic number of marginal
+        tests makes the grow phase much cheaper on sparse graphs, and they
+        are the tests of depth 0 anyway (defaults to True).
+    prefetch_tests_func : callable, optional
+        A function called at the start of each depth with an iterator over
+        the (conditional) independence tests the depth may carry out, as
+        tuples (x, y, z) with z empty at depth 0, for instance to compute
+        their p-values in parallel into a cache read by the tests. The
+        conditioning candidates only shrink during a depth, so that the tests
+        carried out are among them.
 
     Returns
     -------
     tuple
-        A tuple containing the causal skeleton as first element, and a
-        dictionary of the separation sets as second element.
+        A tuple containing the causal skeleton as first element, and the
+        separation sets (which can be read like a dictionary) as second
+        element.
     """
 
     # To deal with matters of logging
     logging_active = False
+    debug_active = False
     if log_file != '':
         logging_active = True
         logger = create_logger(
             logger_name='pc_alg_adjacency_phase',
-            log_file=log_file
+            log_file=log_file,
+            level=log_level
         )
+        debug_active = logger.isEnabledFor(logging.DEBUG)
 
+    data = as_dataset(data)
     nb_obs, nb_var = data.shape
 
-    causal_skeleton = np.ones((nb_var, nb_var)) - np.identity(nb_var)
-    separation_sets = dict()
-    for x in range(nb_var):
-        for y in range(x + 1, nb_var):
-            separation_sets[(x, y)] = set()
-            separation_sets[(y, x)] = set()
+    if bit_packed:
+        causal_skeleton = BitPackedGraph.complete(nb_var)
+    else:
+        causal_skeleton = np.ones((nb_var, nb_var)) - np.identity(nb_var)
+    separation_sets = SeparationSets(nb_var=nb_var)
+
+    blankets = None
+
+    def conditioning_candidates(x, y):
+        adj_to_x = find_adjacent_vertices_to(x, causal_skeleton)
+        if blankets is not None:
+            adj_to_x = [elt for elt in adj_to_x if elt in blankets[x]]
+        if background_knowledge is None:
+            adj_to_x_excl_y = [elt for elt in adj_to_x if elt != y]
+        else:
+            allowed = background_knowledge.allowed_in_separating_set(x, y)
+            adj_to_x_excl_y = [elt for elt in adj_to_x
+                               if elt != y and allowed[elt]]
+
+        return adj_to_x, adj_to_x_excl_y
+
+    def pairs_to_test(skeleton):
+        for (x, y) in iter_adjacent_vertices(skeleton):
+            if background_knowledge is None or \
+                    not background_knowledge.requires_adjacency(x, y):
+                yield x, y
+
+    if background_knowledge is not None:
+        for (x, y) in background_knowledge.forbidden_adjacencies():
+            causal_skeleton[x, y] = 0
+            causal_skeleton[y, x] = 0
+
+            if logging_active:
+                logger.info('ADJACENCY FORBIDDEN : %d - %d', x, y)
+
+    if markov_blanket_prefilter:
+        blankets, blanket_separating_sets = estimate_markov_blankets(
+            data=data,
+            indep_test_func=indep_test_func,
+            cond_indep_test_func=cond_indep_test_func,
+            level=level,
+            marginal_screening=marginal_screening
+        )
+        blankets = [set(blanket) for blanket in blankets]
+        for x in range(nb_var):
+            for y in blanket_separating_sets[x]:
+                # The pairs in one of the blankets are kept
+                if y < x or x in blankets[y] or not causal_skeleton[x, y]:
+                    continue
+                z = blanket_separating_sets[x][y]
+                if background_knowledge is not None:
+                    if background_knowledge.requires_adjacency(x, y):
+                        continue
+                    allowed = background_knowledge.allowed_in_separating_set(
+                        x, y
+                    )
+                    if not all(allowed[v] for v in z):
+                        continue
+
+                causal_skeleton[x, y] = 0
+                causal_skeleton[y, x] = 0
+                separation_sets.add(x, y, z)
+
+                if logging_active:
+                    logger.info('OUTSIDE MARKOV BLANKETS : %d _||_ %d | %s',
+                                x, y, z)
 
     depth = 0
 
     while True:
 
-        adjacent_vertices = find_adjacent_vertices(causal_skeleton)
+        # The pairs adjacent at the start of the depth are read lazily, row
+        # by row, from a snapshot of the skeleton rather than materialised
+        skeleton_at_depth = causal_skeleton.copy() if bit_packed else \
+            causal_skeleton != 0
 
         if logging_active:
             logger.info('\n\n\n\n')  # just for greater readability of the log
-            logger.info(f'Depth == {depth}')
-            logger.info(f'Causal Skeleton :\n{causal_skeleton}')
-            logger.info(
-                f'Adjacent Vertices :\n{sorted(list(adjacent_vertices))}\n'
+            logger.info('Depth == %d', depth)
+            if debug_active:
+                # The records are formatted in the background, so the
+                # skeleton (which keeps changing) is logged as a snapshot.
+                logger.debug('Causal Skeleton :\n%s', causal_skeleton.copy())
+                logger.debug('Adjacent Vertices :\n%s\n',
+                             list(iter_adjacent_vertices(skeleton_at_depth)))
+
+        if prefetch_tests_func is not None:
+            prefetch_tests_func(
+                (x, y, z) for (x, y) in pairs_to_test(skeleton_at_depth)
+                for z in combinations(conditioning_candidates(x, y)[1], depth)
             )
 
         stop_condition = True
-        for (x, y) in adjacent_vertices:
-            adj_to_x = find_adjacent_vertices_to(x, causal_skeleton)
-            adj_to_x_excl_y = [elt for elt in adj_to_x if elt != y]
+        for (x, y) in pairs_to_test(skeleton_at_depth):
+            adj_to_x, adj_to_x_excl_y = conditioning_candidates(x, y)
             stop_condition = stop_condition and (len(adj_to_x_excl_y) < depth)
 
         if logging_active:
-            logger.info(f'Stop condition == {stop_condition}')
+            logger.info('Stop condition == %s', stop_condition)
 
-        for (x, y) in adjacent_vertices:
+        for (x, y) in pairs_to_test(skeleton_at_depth):
 
-            if logging_active:
-                logger.info(f'Pair considered == {(x,y)}')
+            if debug_active:
+                logger.debug('Pair considered == %s', (x, y))
 
-            adj_to_x = find_adjacent_vertices_to(x, causal_skeleton)
-            adj_to_x_excl_y = [elt for elt in adj_to_x if elt != y]
+            adj_to_x, adj_to_x_excl_y = conditioning_candidates(x, y)
 
-            if logging_active:
-                logger.info(f'Adjacent to {x} == {adj_to_x}')
-                logger.info(f'Adjacent to {x} except {y} == {adj_to_x_excl_y}')
+            if debug_active:
+                logger.debug('Adjacent to %d == %s', x, adj_to_x)
+                logger.debug('Adjacent to %d except %d == %s', x, y,
+                             adj_to_x_excl_y)
 
             if len(adj_to_x_excl_y) >= depth:
 
                 if depth == 0:
 
-                    if logging_active:
-                        logger.info('Conditioning set considered == []')
+                    if debug_active:
+                        logger.debug('Conditioning set considered == []')
 
                     x_indep_y = indep_test_func(
                         data=data,
@@ -113,19 +249,20 @@ def run_pc_adjacency_phase(data: pd.DataFrame, indep_test_func: callable,
                     if x_indep_y:
 
                         if logging_active:
-                            logger.info(f'INDEPENDENCE FOUND : {x} _||_ {y}')
+                            logger.info('INDEPENDENCE FOUND : %d _||_ %d',
+                                        x, y)
 
                         causal_skeleton[x, y] = 0
                         causal_skeleton[y, x] = 0
-                        separation_sets[(x, y)].add(tuple())
-                        separation_sets[(y, x)].add(tuple())
+                        separation_sets.add(x, y, tuple())
 
                 else:
 
                     for z in combinations(adj_to_x_excl_y, depth):
 
-                        if logging_active:
-                            logger.info(f'Conditioning set considered == {z}')
+                        if debug_active:
+                            logger.debug('Conditioning set considered == %s',
+                                         z)
 
                         x_indep_y_given_z = cond_indep_test_func(
                             data=data,
@@ -139,25 +276,32 @@ def run_pc_adjacency_phase(data: pd.DataFrame, indep_test_func: callable,
 
                             if logging_active:
                                 logger.info(
-                                    f'INDEPENDENCE FOUND == {x} _||_ {y} | {z}'
+                                    'INDEPENDENCE FOUND == %d _||_ %d | %s',
+                                    x, y, z
                                 )
 
                             causal_skeleton[x, y] = 0
                             causal_skeleton[y, x] = 0
-                            separation_sets[(x, y)].add(tuple(sorted(z)))
-                            separation_sets[(y, x)].add(tuple(sorted(z)))
+                            separation_sets.add(x, y, z)
 
         depth += 1
 
         if stop_condition:
             break
 
+    if logging_active:
+        flush_log_file(log_file)
+
     return causal_skeleton, separation_sets
 
 
 def run_pc_orientation_phase(causal_skeleton: np.ndarray,
-                             separation_sets: dict,
-                             log_file: str = '') -> np.ndarray:
+                             separation_sets: Mapping,
+                             log_file: str = '',
+                             log_level: int = logging.INFO,
+                             matrix_form_meeks_rules: bool = False,
+                             background_knowledge: BackgroundKnowledge = None
+                             ) -> np.ndarray:
     """
     Runs the adjacency phase of the PC algorithm, producing the Completed
     Partially Directed Acyclic Graph (CPDAG) of the true causal graph (i.e.
@@ -166,18 +310,30 @@ def run_pc_orientation_phase(causal_skeleton: np.ndarray,
 
     Parameters
     ----------
-    causal_skeleton : array_like
+    causal_skeleton : array_like or BitPackedGraph
         The causal skeleton of the true causal graph.
-    separation_sets : dict
-        The separation sets.
+    separation_sets : dict or SeparationSets
+        The separation sets, indexed by pairs of variables.
     log_file : str, optional
         The path to a file in which to store the log. No log will be generated
         if the empty string is provided.
+    log_level : int, optional
+        The logging level (defaults to logging.INFO).
+    matrix_form_meeks_rules : bool, optional
+        Whether to apply Meek's rules in matrix form (see module
+        matrix_meeks_rules), which is faster for dense CPDAGs, rather than
+        edge by edge.
+    background_knowledge : BackgroundKnowledge, optional
+        Background knowledge on the true causal graph. Unshielded triples
+        a - b - c are only oriented as colliders if the arrowheads into b are
+        allowed and a and c could have been adjacent (i.e. a separation set
+        was actually searched for), the edges are then oriented as dictated
+        by the knowledge, and Meek's rule R4 is applied along with R1-R3.
 
     Returns
     -------
-    array_like
-        The CPDAG.
+    array_like or BitPackedGraph
+        The CPDAG, in the same format as the causal skeleton.
     """
 
     # To deal with matters of logging
@@ -186,58 +342,98 @@ def run_pc_orientation_phase(causal_skeleton: np.ndarray,
         logging_active = True
         logger = create_logger(
             logger_name='pc_alg_orientation_phase',
-            log_file=log_file
+            log_file=log_file,
+            level=log_level
         )
 
     cpdag = copy.deepcopy(causal_skeleton)
 
     # Orient the unshielded triples if any
-    unshielded_triples = find_unshielded_triples(
+    unshielded_triples = find_unshielded_triples_array(
         adjacency_matrix=causal_skeleton
     )
 
     if logging_active:
-        logger.info(f'The unshielded triples are : {unshielded_triples}')
+        logger.info('The unshielded triples are : %s',
+                    set(map(tuple, unshielded_triples.tolist())))
 
-    for (a, b, c) in unshielded_triples:
-        not_in_sepset = all([b not in sep for sep in separation_sets[(a, c)]])
-        if not_in_sepset:
-            cpdag[b, a] = 0
-            cpdag[b, c] = 0
-
-            if logging_active:
-                logger.info(f'Unshielded triple {(a, b, c)}')
-                logger.info(f'{[b]} not in SepSet[{(a, c)}] = '
-                            f'{separation_sets[(a, c)]}')
-                logger.info(f'Removing {b} -> {a} and {b} -> {c} from graph')
-
-    # Apply Meek's rules repeatedly until the CPDAG no longer changes
-    current_cpdag = copy.deepcopy(cpdag)
-    while True:
+    is_collider = find_unshielded_colliders(
+        unshielded_triples=unshielded_triples,
+        separation_sets=separation_sets
+    )
+    if background_knowledge is not None:
+        a, b, c = unshielded_triples.T
+        is_collider &= \
+            ~background_knowledge.forbidden_mask(a, b) & \
+            ~background_knowledge.forbidden_mask(c, b) & \
+            ~np.fromiter(
+                (background_knowledge.forbids_adjacency(x, y)
+                 for x, y in zip(a.tolist(), c.tolist())),
+                dtype=bool,
+                count=len(a)
+            )
+    colliders = unshielded_triples[is_collider]
+    a, b, c = colliders[:, 0], colliders[:, 1], colliders[:, 2]
+    if isinstance(cpdag, BitPackedGraph):
+        cpdag.remove_edges(np.concatenate((b, b)), np.concatenate((a, c)))
+    else:
+        cpdag[b, a] = 0
+        cpdag[b, c] = 0
 
-        new_cpdag = apply_Meeks_rules(
-            pdag=current_cpdag,
-            apply_R4=False  # Rule R4 is not necessary for the PC algorithm
+    if logging_active:
+        for (a, b, c) in colliders.tolist():
+            logger.info('Unshielded triple %s', (a, b, c))
+            logger.info('%s not in SepSet[%s] = %s', [b], (a, c),
+                        separation_sets[(a, c)])
+            logger.info('Removing %d -> %d and %d -> %d from graph',
+                        b, a, b, c)
+
+    if background_knowledge is not None:
+        cpdag = orient_with_background_knowledge(
+            pdag=cpdag,
+            background_knowledge=background_knowledge
         )
 
-        if np.array_equal(new_cpdag, current_cpdag):
-            break
+    # Apply Meek's rules until no more edge can be oriented
+    if matrix_form_meeks_rules:
+        propagate = matrix_meeks_rules.propagate_Meeks_rules
+    else:
+        propagate = propagate_Meeks_rules
+    cpdag = propagate(
+        pdag=cpdag,
+        # Rule R4 is only necessary with background knowledge
+        apply_R4=background_knowledge is not None
+    )
 
-        current_cpdag = new_cpdag
+    if logging_active:
+        flush_log_file(log_file)
 
-    return new_cpdag
+    return cpdag
 
 
 def run_pc_algorithm(data: pd.DataFrame, indep_test_func: callable,
                      cond_indep_test_func: callable, level: float,
-                     log_file: str = '') -> dict:
+                     log_file: str = '',
+                     log_level: int = logging.INFO,
+                     trace_file: str = '',
+                     bit_packed: bool = False,
+                     matrix_form_meeks_rules: bool = False,
+                     background_knowledge: BackgroundKnowledge = None,
+                     output_format: str = 'dense',
+                     markov_blanket_prefilter: bool = False,
+                     marginal_screening: bool = True,
+                     prefetch_tests_func: callable = None
+                     ) -> dict:
     """
     Runs the original PC algorithm.
 
     Parameters
     ----------
-    data : pandas.DataFrame
-        The observations.
+    data : pandas.DataFrame, Dataset, array_like, numpy.memmap or
+    pyarrow.Table
+        The observations. A DataFrame is passed to the tests as is ; any
+        other input is wrapped once into a Dataset (a contiguous buffer of
+        floats with zero-copy column views and the column names).
     indep_test_func : callable
         A function to perform unconditional independence testing.
     cond_indep_test_func : callable
@@ -247,6 +443,49 @@ def run_pc_algorithm(data: pd.DataFrame, indep_test_func: callable,
     log_file : str, optional
         The path to a file in which to store the log. No log will be generated
         if the empty string is provided.
+    log_level : int, optional
+        The logging level (defaults to logging.INFO).
+    trace_file : str, optional
+        The path to a file in which to record every (conditional)
+        independence test in binary format, for later replay with
+        run_pc_algorithm_from_trace. No trace will be recorded if the empty
+        string is provided.
+    bit_packed : bool, optional
+        Whether to store the causal skeleton and the CPDAG as BitPackedGraph
+        objects (one bit per entry) rather than as dense matrices of floats,
+        for very wide datasets.
+    matrix_form_meeks_rules : bool, optional
+        Whether to apply Meek's rules in matrix form (see module
+        matrix_meeks_rules), which is faster for dense CPDAGs, rather than
+        edge by edge.
+    background_knowledge : BackgroundKnowledge, optional
+        Background knowledge on the true causal graph (temporal tiers,
+        forbidden and required edges, variables forbidden in conditioning
+        sets), used to skip (conditional) independence tests and to orient
+        edges.
+    output_format : str, optional
+        The format of the CPDAG returned : 'dense' (the default) for its
+        adjacency matrix (a BitPackedGraph if bit_packed is True), or
+        'edge_list' for an EdgeListCPDAG holding the directed and undirected
+        edges as integer arrays together with the column names of the data,
+        which can be converted to the dense format or to a scipy.sparse CSR
+        matrix on request. The edge list is converted from the CPDAG at the
+        end of the run : set bit_packed to True as well so that no dense
+        p x p matrix is built. In both cases the separation sets are
+        returned as a SeparationSets store (see its method to_dict for the
+        dense dictionary).
+    markov_blanket_prefilter : bool, optional
+        Whether to restrict the skeleton to the pairs of variables in each
+        other's Markov blanket, estimated before the adjacency phase, and the
+        conditioning sets to the blankets (see run_pc_adjacency_phase).
+    marginal_screening : bool, optional
+        With markov_blanket_prefilter, whether to search the blankets among
+        the variables marginally dependent on each variable only (see
+        run_pc_adjacency_phase, defaults to True).
+    prefetch_tests_func : callable, optional
+        A function called with the tests each depth of the adjacency phase
+        may carry out, before they are carried out (see
+        run_pc_adjacency_phase).
 
     Returns
     -------
@@ -255,22 +494,187 @@ def run_pc_algorithm(data: pd.DataFrame, indep_test_func: callable,
         as well as the separation sets determined on the way.
     """
 
-    causal_skeleton, separation_sets = run_pc_adjacency_phase(
-        data=data,
-        indep_test_func=indep_test_func,
-        cond_indep_test_func=cond_indep_test_func,
-        level=level,
-        log_file=log_file
-    )
+    if output_format not in output_formats:
+        raise ValueError(f'Unknown output format {output_format}, expected '
+                         f'one of {output_formats} !')
+
+    data = as_dataset(data)
+
+    trace_writer = None
+    if trace_file != '':
+        trace_writer = DecisionTraceWriter(
+            filename=trace_file,
+            nb_var=data.shape[1],
+            level=level,
+            options=_trace_options(
+                bit_packed=bit_packed,
+                matrix_form_meeks_rules=matrix_form_meeks_rules,
+                background_knowledge=background_knowledge,
+                markov_blanket_prefilter=markov_blanket_prefilter,
+                marginal_screening=marginal_screening
+            )
+        )
+        indep_test_func, cond_indep_test_func = record_decisions(
+            indep_test_func=indep_test_func,
+            cond_indep_test_func=cond_indep_test_func,
+            writer=trace_writer
+        )
+
+    try:
+        causal_skeleton, separation_sets = run_pc_adjacency_phase(
+            data=data,
+            indep_test_func=indep_test_func,
+            cond_indep_test_func=cond_indep_test_func,
+            level=level,
+            log_file=log_file,
+            log_level=log_level,
+            bit_packed=bit_packed,
+            background_knowledge=background_knowledge,
+            markov_blanket_prefilter=markov_blanket_prefilter,
+            marginal_screening=marginal_screening,
+            prefetch_tests_func=prefetch_tests_func
+        )
+    finally:
+        if trace_writer is not None:
+            trace_writer.close()
 
     cpdag = run_pc_orientation_phase(
         causal_skeleton=causal_skeleton,
         separation_sets=separation_sets,
-        log_file=log_file
+        log_file=log_file,
+        log_level=log_level,
+        matrix_form_meeks_rules=matrix_form_meeks_rules,
+        background_knowledge=background_knowledge
     )
 
+    if output_format == 'edge_list':
+        cpdag = EdgeListCPDAG.from_pdag(cpdag,
+                                        column_names=list(data.columns))
+
     res = dict()
     res[field_pc_cpdag] = cpdag
     res[field_separation_sets] = separation_sets
 
     return res
+
+
+def _trace_options(bit_packed: bool, matrix_form_meeks_rules: bool,
+                   background_knowledge: BackgroundKnowledge,
+                   markov_blanket_prefilter: bool,
+                   marginal_screening: bool) -> dict:
+    """
+    Returns the options of a run of the PC algorithm recorded in its trace.
+    """
+    return {
+        'bit_packed': bit_packed,
+        'matrix_form_meeks_rules': matrix_form_meeks_rules,
+        'background_knowledge': None if background_knowledge is None
+        else background_knowledge.to_dict(),
+        'markov_blanket_prefilter': markov_blanket_prefilter,
+        'marginal_screening': marginal_screening,
+    }
+
+
+# The options which change the tests carried out, and so the decisions which
+# must be in the trace
+_trace_decision_options = ('background_knowledge', 'markov_blanket_prefilter',
+                           'marginal_screening')
+
+
+def run_pc_algorithm_from_trace(trace_file: str, log_file: str = '',
+                                log_level: int = logging.INFO,
+                                output_format: str = 'dense',
+                                bit_packed: bool = None,
+                                matrix_form_meeks_rules: bool = None,
+                                background_knowledge:
+                                BackgroundKnowledge = None,
+                                markov_blanket_prefilter: bool = None,
+                                marginal_screening: bool = None
+                                ) -> dict:
+    """
+    Replays a run of the PC algorithm from the binary trace of its
+    (conditional) independence tests, without the data or the tests.
+
+    The options of the run are read from the trace, unless they are given :
+    bit_packed and matrix_form_meeks_rules can be changed freely, while a run
+    with other background knowledge or prefilter may need tests which are
+    not in the trace.
+
+    Parameters
+    ----------
+    trace_file : str
+        The path to a trace file recorded by run_pc_algorithm.
+    log_file : str, optional
+        The path to a file in which to store the log. No log will be generated
+        if the empty string is provided.
+    log_level : int, optional
+        The logging level (defaults to logging.INFO).
+    output_format : str, optional
+        The format of the CPDAG returned (see run_pc_algorithm).
+    bit_packed : bool, optional
+        See run_pc_algorithm (defaults to the option of the run recorded).
+    matrix_form_meeks_rules : bool, optional
+        See run_pc_algorithm (defaults to the option of the run recorded).
+    background_knowledge : BackgroundKnowledge, optional
+        See run_pc_algorithm (defaults to the background knowledge of the
+        run recorded).
+    markov_blanket_prefilter : bool, optional
+        See run_pc_algorithm (defaults to the option of the run recorded).
+    marginal_screening : bool, optional
+        See run_pc_algorithm (defaults to the option of the run recorded).
+
+    Returns
+    -------
+    dict
+        A dictionary containing the CPDAG obtained by running the PC algorithm
+        as well as the separation sets determined on the way.
+    """
+
+    trace = read_decision_trace(trace_file)
+
+    recorded = _trace_options(
+        bit_packed=False,
+        matrix_form_meeks_rules=False,
+        background_knowledge=None,
+        markov_blanket_prefilter=False,
+        marginal_screening=True
+    )
+    recorded.update(trace.options)
+    options = dict(recorded)
+    if bit_packed is not None:
+        options['bit_packed'] = bit_packed
+    if matrix_form_meeks_rules is not None:
+        options['matrix_form_meeks_rules'] = matrix_form_meeks_rules
+    if background_knowledge is not None:
+        options['background_knowledge'] = background_knowledge.to_dict()
+    if markov_blanket_prefilter is not None:
+        options['markov_blanket_prefilter'] = markov_blanket_prefilter
+    if marginal_screening is not None:
+        options['marginal_screening'] = marginal_screening
+    mismatches = [name for name in _trace_decision_options
+                  if options[name] != recorded[name]]
+    if options['background_knowledge'] is not None:
+        options['background_knowledge'] = BackgroundKnowledge.from_dict(
+            options['background_knowledge']
+        )
+
+    # Only the shape of the data is used when the tests are replayed
+    data = pd.DataFrame(np.empty((0, trace.nb_var)))
+
+    try:
+        return run_pc_algorithm(
+            data=data,
+            indep_test_func=replay_indep_test(trace),
+            cond_indep_test_func=replay_cond_indep_test(trace),
+            level=trace.level,
+            log_file=log_file,
+            log_level=log_level,
+            output_format=output_format,
+            **options
+        )
+    except KeyError as error:
+        if len(mismatches) == 0:
+            raise
+        raise ValueError(f'{error.args[0]} The options {mismatches} differ '
+                         f'from those of the run recorded in the trace !') \
+            from error
@@ -0,0 +1,285 @@
+"""
+This module contains a rolling-window mode of the PC algorithm with linear
+tests, for drift monitoring : a CPDAG is produced for each window of
+consecutive observations, the windows sliding over a stream.
+
+The Gaussian sufficient statistics of the window (see
+PyPCAlg.utilities.sufficient_statistics) are updated by adding the new rows
+and removing the expired ones, instead of being recomputed. The skeleton and
+the separation sets of the previous window are the starting point of the
+next one : a pair of variables is only retested when the correlations among
+the variables its decision depends on (the pair and its separating set, or
+the pair and the variables adjacent to it) moved by more than a tolerance
+since it was last tested. A removed pair whose correlations moved is first
+retested given its previous separating set, and only searched again from
+scratch if that test now rejects independence. The pairs which did not move
+keep their previous decision, through background knowledge given to the
+adjacency phase (required adjacencies for the edges kept, forbidden ones for
+the edges removed), and the CPDAG is then oriented from the merged
+separation sets.
+
+The result is an approximation of a full run on the window, which gets
+closer as the tolerance decreases ; a full run can be forced every few
+windows with refresh_every.
+"""
+from collections import deque
+
+import numpy as np
+
+from PyPCAlg.background_knowledge import BackgroundKnowledge
+from PyPCAlg.pc_algorithm import run_pc_adjacency_phase, \
+    run_pc_orientation_phase, field_pc_cpdag, field_separation_sets, \
+    field_nb_tests
+from PyPCAlg.utilities.dataset import Dataset
+from PyPCAlg.utilities.sufficient_statistics import \
+    GaussianSufficientStatistics
+
+field_nb_retested_pairs = 'NbRetestedPairs'
+
+
+class RollingPC:
+    """
+    The PC algorithm with linear tests over a sliding window of
+    observations.
+
+    Parameters
+    ----------
+    column_names : list
+        The names of the variables.
+    window_size : int
+        The number of observations in a window.
+    level : float
+        The level for the tests.
+    tolerance : float, optional
+        The largest change of a correlation (since a pair was last tested)
+        below which the decision on the pair is kept without a test (defaults
+        to 0.01).
+    refresh_every : int, optional
+        Runs the full PC algorithm (and recomputes the sufficient statistics
+        from the rows of the window) every refresh_every windows (defaults
+        to never, after the first window).
+    matrix_form_meeks_rules : bool, optional
+        Whether to apply Meek's rules in matrix form.
+    """
+
+    def __init__(self, column_names: list, window_size: int, level: float,
+                 tolerance: float = 0.01, refresh_every: int = None,
+                 matrix_form_meeks_rules: bool = False):
+        self.columns = list(column_names)
+        self.window_size = window_size
+        self.level = level
+        self.tolerance = tolerance
+        self.refresh_every = refresh_every
+        self.matrix_form_meeks_rules = matrix_form_meeks_rules
+
+        self.statistics = GaussianSufficientStatistics(self.columns)
+        self._blocks = deque()
+        self._nb_rows = 0
+
+        self.nb_windows = 0
+        self.skeleton = None
+        self.separation_sets = None
+        # The window at which each pair was last tested, and the correlation
+        # matrices of these windows
+        self._reference = None
+        self._snapshots = dict()
+
+    @property
+    def nb_var(self) -> int:
+        return len(self.columns)
+
+    def update(self, rows: np.ndarray) -> dict:
+        """
+        Adds observations to the window (removing the expired ones), and runs
+        the PC algorithm on the window once it is full.
+
+        Parameters
+        ----------
+        rows : array_like
+            The new observations, one row per observation.
+
+        Returns
+        -------
+        dict or None
+            None if the window is not full yet, otherwise a dictionary
+            containing the CPDAG, the separation sets, the number of tests
+            performed and the number of pairs of variables retested (given
+            their previous separating set, or searched again).
+        """
+        rows = np.asarray(rows, dtype=float)
+        self.statistics.add_rows(rows)
+        self._blocks.append(rows)
+        self._nb_rows += len(rows)
+
+        excess = self._nb_rows - self.window_size
+        while excess > 0:
+            block = self._blocks[0]
+            if len(block) <= excess:
+                self._blocks.popleft()
+                expired = block
+            else:
+                self._blocks[0] = block[excess:]
+                expired = block[:excess]
+            self.statistics.remove_rows(expired)
+            self._nb_rows -= len(expired)
+            excess -= len(expired)
+
+        if self._nb_rows < self.window_size:
+            return None
+
+        refresh = self.skeleton is None or (
+            self.refresh_every is not None and
+            self.nb_windows % self.refresh_every == 0
+        )
+        if refresh and self.skeleton is not None:
+            # Gets rid of the rounding errors accumulated by the updates
+            self.statistics = GaussianSufficientStatistics(self.columns)
+            self.statistics.add_rows(np.concatenate(self._blocks))
+
+        res = self._discover(refresh)
+        self.nb_windows += 1
+
+        return res
+
+    def _moved(self, correlation: np.ndarray, x: int, y: int,
+               variables: set) -> bool:
+        """
+        Checks whether the correlations among x, y and variables moved by
+        more than the tolerance since the pair was last tested.
+        """
+        reference = self._snapshots[self._reference[x, y]]
+        indices = sorted({x, y} | variables)
+        change = np.abs(correlation[np.ix_(indices, indices)] -
+                        reference[np.ix_(indices, indices)])
+
+        return change.max() > self.tolerance
+
+    def _discover(self, refresh: bool) -> dict:
+        """
+        Runs the PC algorithm on the current window, warm-started from the
+        previous one unless refresh is True.
+        """
+        nb_var = self.nb_var
+        window = self.nb_windows
+        correlation = self.statistics.correlation()
+        counts = dict()
+        indep_test, cond_indep_test = self.statistics.tests(counts=counts)
+
+        kept_edges = []
+        kept_separations = []
+        nb_confirmed = 0
+        if not refresh:
+            adjacent = [set(np.flatnonzero(self.skeleton[x]).tolist())
+                        for x in range(nb_var)]
+            for x in range(nb_var):
+                for y in range(x + 1, nb_var):
+                    if self.skeleton[x, y]:
+                        if not self._moved(correlation, x, y,
+                                           adjacent[x] | adjacent[y]):
+                            kept_edges.append((x, y))
+                        continue
+                    z = min(self.separation_sets[(x, y)])
+                    if not self._moved(correlation, x, y, set(z)):
+                        kept_separations.append((x, y, z))
+                        continue
+                    if len(z) == 0:
+                        still_separated = indep_test(None, x, y, self.level)
+                    else:
+                        still_separated = cond_indep_test(None, x, y, list(z),
+                                                          self.level)
+                    if still_separated:
+                        self._reference[x, y] = window
+                        kept_separations.append((x, y, z))
+                        nb_confirmed += 1
+
+        nb_pairs = nb_var * (nb_var - 1) // 2
+        background_knowledge = None
+        if not refresh:
+            background_knowledge = BackgroundKnowledge(
+                nb_var=nb_var,
+                forbidden_edges=[edge for x, y, _ in kept_separations
+                                 for edge in ((x, y), (y, x))],
+                required_edges=kept_edges
+            )
+
+        skeleton, separation_sets = run_pc_adjacency_phase(
+            data=Dataset(np.empty((0, nb_var)), column_names=self.columns),
+            indep_test_func=indep_test,
+            cond_indep_test_func=cond_indep_test,
+            level=self.level,
+            background_knowledge=background_knowledge
+        )
+        for x, y, z in kept_separations:
+            separation_sets.add(x, y, z)
+
+        # The pairs searched again were tested on this window
+        if refresh:
+            self._reference = np.full((nb_var, nb_var), window, dtype=int)
+        else:
+            kept = np.zeros((nb_var, nb_var), dtype=bool)
+            for x, y in kept_edges:
+                kept[x, y] = kept[y, x] = True
+            for x, y, _ in kept_separations:
+                kept[x, y] = kept[y, x] = True
+            self._reference[~kept] = window
+        self._snapshots[window] = correlation
+        referenced = set(np.unique(self._reference).tolist())
+        self._snapshots = {w: snapshot for w, snapshot in
+                           self._snapshots.items() if w in referenced}
+
+        cpdag = run_pc_orientation_phase(
+            causal_skeleton=skeleton,
+            separation_sets=separation_sets,
+            matrix_form_meeks_rules=self.matrix_form_meeks_rules
+        )
+        self.skeleton = skeleton
+        self.separation_sets = separation_sets
+
+        return {
+            field_pc_cpdag: cpdag,
+            field_separation_sets: separation_sets,
+            field_nb_tests: counts['nb_tests'],
+            field_nb_retested_pairs: nb_pairs - len(kept_edges) -
+            len(kept_separations) + nb_confirmed
+        }
+
+
+def run_pc_rolling(data, window_size: int, step: int, level: float,
+                   **kwargs):
+    """
+    Runs the PC algorithm with linear tests on the windows
+    data[start:start + window_size] for start = 0, step, 2 * step, ...
+    (see RollingPC).
+
+    Parameters
+    ----------
+    data : pandas.DataFrame, Dataset, array_like or pyarrow.Table
+        The observations, in time order.
+    window_size : int
+        The number of observations in a window.
+    step : int
+        The number of observations by which the window slides.
+    level : float
+        The level for the tests.
+    **kwargs
+        The other arguments of RollingPC.
+
+    Yields
+    ------
+    tuple
+        The index of the first observation of a window, and the dictionary
+        returned by RollingPC.update for the window.
+    """
+    data = Dataset(data)
+    rolling = RollingPC(column_names=data.columns, window_size=window_size,
+                        level=level, **kwargs)
+    values = data.values
+
+    res = rolling.update(values[:window_size])
+    if res is None:
+        return
+    yield 0, res
+    for start in range(step, data.shape[0] - window_size + 1, step):
+        yield start, rolling.update(
+            values[start + window_size - step:start + window_size]
+        )
@@ -0,0 +1,419 @@
+"""
+A long-running local discovery service. Datasets are loaded once and reduced
+to their Gaussian sufficient statistics (see
+PyPCAlg.utilities.sufficient_statistics), which are kept in memory together
+with a cache of the p-values of the tests, so that repeated runs of the PC
+algorithm on subsets of the variables, at different levels or with
+different background knowledge only compute the tests not seen before, from
+the covariance matrix.
+
+The service answers JSON requests over HTTP, on the loopback interface by
+default :
+
+    GET  /datasets   the datasets loaded
+    POST /datasets   {"name": ..., "path": ..., "columns": [...]} loads a
+                     dataset from a CSV, Parquet or .npy file of the data
+                     directory
+    POST /pc         {"dataset": ..., "variables": [...], "level": ...,
+                     "background_knowledge": {...}} runs the PC algorithm
+
+The requests are handled by a bounded pool of worker threads ; the requests
+which arrive while all the workers are busy wait in a bounded queue, and are
+rejected with status 503 when the queue is full.
+
+The datasets can only be loaded over HTTP from the data directory given with
+--data-dir (the paths of the requests being relative to it) ; without a data
+directory, the datasets are the ones given at start-up.
+
+    python -m PyPCAlg.server --dataset sales=sales.parquet --port 8000
+"""
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from PyPCAlg.background_knowledge import BackgroundKnowledge
+from PyPCAlg.pc_algorithm import run_pc_algorithm, field_pc_cpdag, \
+    field_separation_sets
+from PyPCAlg.utilities.dataset import Dataset, read_dataset
+from PyPCAlg.utilities.pvalue_cache import PValueCache
+from PyPCAlg.utilities.sufficient_statistics import \
+    GaussianSufficientStatistics
+
+
+class DiscoveryService:
+    """
+    The datasets loaded by the service, as sufficient statistics with a
+    cache of p-values each, and the runs of the PC algorithm on them.
+
+    Parameters
+    ----------
+    data_dir : str, optional
+        The directory the datasets of the requests are loaded from (see
+        load_request). Loading datasets from requests is disabled if it is
+        None.
+    """
+
+    def __init__(self, data_dir: str = None):
+        self._datasets = dict()
+        self._lock = threading.Lock()
+        self.data_dir = None if data_dir is None else \
+            os.path.realpath(data_dir)
+
+    def add(self, name: str,
+            statistics: GaussianSufficientStatistics) -> dict:
+        """
+        Adds (or replaces) a dataset given by its sufficient statistics, and
+        returns its summary.
+        """
+        with self._lock:
+            self._datasets[name] = (statistics, PValueCache())
+
+        return self._summary(name)
+
+    def load(self, name: str, path: str, columns: list = None) -> dict:
+        """
+        Loads (or reloads) a dataset from a file (see read_dataset), and
+        returns its summary.
+        """
+        data = read_dataset(path, columns=columns)
+
+        return self.add(name, GaussianSufficientStatistics.from_data(data))
+
+    def load_request(self, request: dict) -> dict:
+        """
+        Loads (or reloads) a dataset from a file of the data directory, and
+        returns its summary.
+
+        Parameters
+        ----------
+        request : dict
+            The request, with keys 'name', 'path' (relative to the data
+            directory) and 'columns' (optional, the columns to read).
+
+        Returns
+        -------
+        dict
+            The summary of the dataset.
+
+        Raises
+        ------
+        PermissionError
+            If the service has no data directory, or the path is outside of
+            it.
+        """
+        if self.data_dir is None:
+            raise PermissionError('Loading datasets is disabled, start the '
+                                  'service with a data directory !')
+        path = os.path.realpath(os.path.join(self.data_dir,
+                                             str(request['path'])))
+        if os.path.commonpath([self.data_dir, path]) != self.data_dir:
+            raise PermissionError(f'The path {request["path"]} is outside '
+                                  f'of the data directory !')
+
+        return self.load(request['name'], path,
+                         columns=request.get('columns'))
+
+    def _get(self, name: str) -> tuple:
+        with self._lock:
+            if name not in self._datasets:
+                raise KeyError(f'Unknown dataset {name} !')
+            return self._datasets[name]
+
+    def _summary(self, name: str) -> dict:
+        statistics, cache = self._get(name)
+
+        return {'name': name, 'nb_obs': statistics.nb_obs,
+                'nb_var': statistics.nb_var, 'columns': statistics.columns,
+                'nb_cached_pvalues': len(cache)}
+
+    def summary(self) -> list[dict]:
+        """
+        Returns the summaries of the datasets loaded.
+        """
+        with self._lock:
+            names = sorted(self._datasets)
+
+        return [self._summary(name) for name in names]
+
+    def run_pc(self, request: dict) -> dict:
+        """
+        Runs the PC algorithm on a dataset loaded.
+
+        Parameters
+        ----------
+        request : dict
+            The request, with keys 'dataset' (the name of the dataset),
+            'variables' (optional, the names or indices of the variables to
+            use, defaulting to all of them), 'level' (optional, defaults to
+            0.05) and 'background_knowledge' (optional, a dictionary with the
+            optional keys 'tiers', 'forbidden_edges', 'required_edges' and
+            'forbidden_conditioning' of BackgroundKnowledge, with variable
+            names instead of indices).
+
+        Returns
+        -------
+        dict
+            The directed and undirected edges of the CPDAG and the separation
+            sets (as variable names), with the number of tests performed and
+            computed (rather than read from the cache) and the wall time.
+        """
+        statistics, cache = self._get(request['dataset'])
+        variables = request.get('variables')
+        if variables is None:
+            variables = statistics.columns
+        for v in variables:
+            if isinstance(v, int) and not 0 <= v < statistics.nb_var:
+                raise ValueError(f'Variable index {v} out of range for '
+                                 f'{statistics.nb_var} variables !')
+        variables = [statistics.columns[statistics.column_index(v)]
+                     for v in variables]
+        if len(set(variables)) != len(variables):
+            raise ValueError(f'Duplicate variables in {variables} !')
+        level = float(request.get('level', 0.05))
+
+        counts = dict()
+        indep_test, cond_indep_test = statistics.tests(
+            variables=variables, cache=cache, counts=counts
+        )
+        background_knowledge = None
+        if request.get('background_knowledge') is not None:
+            background_knowledge = _background_knowledge(
+                request['background_knowledge'], variables
+            )
+
+        start = time.perf_counter()
+        res = run_pc_algorithm(
+            # The tests read the statistics : only the shape and the column
+            # names of the data are used
+            data=Dataset(np.empty((0, len(variables))),
+                         column_names=variables),
+            indep_test_func=indep_test,
+            cond_indep_test_func=cond_indep_test,
+            level=level,
+            background_knowledge=background_knowledge,
+            output_format='edge_list'
+        )
+        wall_time = time.perf_counter() - start
+
+        directed, undirected = res[field_pc_cpdag].named_edges()
+        separation_sets = res[field_separation_sets]
+
+        return {
+            'dataset': request['dataset'],
+            'variables': variables,
+            'level': level,
+            'directed': directed,
+            'undirected': undirected,
+            'separation_sets': [
+                [variables[x], variables[y],
+                 sorted([variables[v] for v in z]
+                        for z in separation_sets[(x, y)])]
+                for x, y in sorted(separation_sets) if x < y
+            ],
+            'nb_tests': counts['nb_tests'],
+            'nb_computed_tests': counts['nb_computed'],
+            'wall_time': wall_time
+        }
+
+
+def _background_knowledge(content: dict,
+                          variables: list) -> BackgroundKnowledge:
+    """
+    Builds the background knowledge of a request, given with variable names.
+    """
+    index = {name: i for i, name in enumerate(variables)}
+
+    def indices(names):
+        return [index[name] for name in names]
+
+    tiers = content.get('tiers')
+
+    return BackgroundKnowledge(
+        nb_var=len(variables),
+        tiers=None if tiers is None else [indices(tier) for tier in tiers],
+        forbidden_edges=[indices(edge)
+                         for edge in content.get('forbidden_edges', ())],
+        required_edges=[indices(edge)
+                        for edge in content.get('required_edges', ())],
+        forbidden_conditioning=indices(
+            content.get('forbidden_conditioning', ())
+        )
+    )
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = 'PyPCAlg'
+
+    def _send_json(self, status: int, content) -> None:
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _answer(self, action: callable) -> None:
+        try:
+            self._send_json(200, action())
+        except PermissionError as error:
+            self._send_json(403, {'error': str(error)})
+        except (KeyError, ValueError, TypeError, OSError) as error:
+            message = error.args[0] if isinstance(error, KeyError) and \
+                error.args else str(error)
+            self._send_json(400, {'error': str(message)})
+        except Exception as error:
+            self.log_error('Error handling %s : %r', self.path, error)
+            self._send_json(500, {'error': f'Internal error : {error!r} !'})
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/datasets':
+            self._answer(service.summary)
+        else:
+            self._send_json(404, {'error': f'Unknown path {self.path} !'})
+
+    def do_POST(self):
+        service = self.server.service
+        if self.path == '/datasets':
+            self._answer(lambda: service.load_request(self._read_json()))
+        elif self.path == '/pc':
+            self._answer(lambda: service.run_pc(self._read_json()))
+        else:
+            self._send_json(404, {'error': f'Unknown path {self.path} !'})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class DiscoveryServer(HTTPServer):
+    """
+    An HTTP server for a DiscoveryService, which handles the requests in a
+    bounded pool of worker threads.
+
+    Parameters
+    ----------
+    address : tuple
+        The host and port to listen on (port 0 for any free port).
+    service : DiscoveryService
+        The service.
+    nb_workers : int, optional
+        The number of worker threads.
+    max_pending : int, optional
+        The maximum number of requests waiting for a worker, beyond which
+        the requests are rejected with status 503.
+    verbose : bool, optional
+        Whether to log the requests to stderr.
+    """
+
+    def __init__(self, address: tuple, service: DiscoveryService,
+                 nb_workers: int = 4, max_pending: int = 64,
+                 verbose: bool = False):
+        super().__init__(address, _RequestHandler)
+        self.service = service
+        self.verbose = verbose
+        self._executor = ThreadPoolExecutor(max_workers=nb_workers)
+        self._slots = threading.BoundedSemaphore(nb_workers + max_pending)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            request.sendall(b'HTTP/1.1 503 Service Unavailable\r\n'
+                            b'Content-Length: 0\r\nConnection: close\r\n\r\n')
+            self.shutdown_request(request)
+            return
+        self._executor.submit(self._process_request_in_worker, request,
+                              client_address)
+
+    def _process_request_in_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+def main(argv: list = None) -> int:
+    """
+    Runs the discovery service until interrupted.
+
+    Parameters
+    ----------
+    argv : list, optional
+        The command-line arguments (defaults to sys.argv[1:]).
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog='pypcalg-server',
+        description='Runs a local service answering PC algorithm requests '
+                    'on datasets held in memory.'
+    )
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='the address to listen on (defaults to '
+                             '127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='the port to listen on (defaults to 8000)')
+    parser.add_argument('--dataset', action='append', default=[],
+                        metavar='NAME=PATH',
+                        help='a dataset to load at start-up (repeatable)')
+    parser.add_argument('--data-dir', default=None,
+                        help='the directory the datasets of the requests are '
+                             'loaded from (loading datasets from requests is '
+                             'disabled without it)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='the number of worker threads (defaults to 4)')
+    parser.add_argument('--max-pending', type=int, default=64,
+                        help='the maximum number of requests waiting for a '
+                             'worker (defaults to 64)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='log the requests to stderr')
+    args = parser.parse_args(argv)
+
+    service = DiscoveryService(data_dir=args.data_dir)
+    for dataset in args.dataset:
+        name, separator, path = dataset.partition('=')
+        if separator == '':
+            parser.error(f'Expected NAME=PATH, got {dataset}')
+        summary = service.load(name, path)
+        print(f'Loaded {name} : {summary["nb_obs"]} observations of '
+              f'{summary["nb_var"]} variables', flush=True)
+
+    server = DiscoveryServer((args.host, args.port), service,
+                             nb_workers=args.workers,
+                             max_pending=args.max_pending,
+                             verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f'Listening on http://{host}:{port}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
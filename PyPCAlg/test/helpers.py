@@ -0,0 +1,12 @@
+"""
+Helpers shared by the test modules.
+"""
+import numpy as np
+
+
+def random_dag(nb_var, density, seed):
+    rng = np.random.default_rng(seed)
+    dag = np.triu(rng.random((nb_var, nb_var)) < density, k=1)
+    permutation = rng.permutation(nb_var)
+
+    return dag[np.ix_(permutation, permutation)].astype(float)
@@ -0,0 +1,209 @@
+import numpy as np
+import pytest
+
+from PyPCAlg.background_knowledge import BackgroundKnowledge, \
+    orient_with_background_knowledge
+from PyPCAlg.pc_algorithm import run_pc_adjacency_phase, run_pc_algorithm, \
+    field_pc_cpdag
+
+from PyPCAlg.examples.graph_2 import generate_data as generate_data_example_2
+from PyPCAlg.examples.graph_2 import oracle_indep_test as \
+    oracle_indep_test_example_2
+from PyPCAlg.examples.graph_2 import oracle_cond_indep_test as \
+    oracle_cond_indep_test_example_2
+from PyPCAlg.examples.graph_2 import get_adjacency_matrix as \
+    adjacency_matrix_example_2
+
+from PyPCAlg.examples.graph_3 import generate_data as generate_data_example_3
+from PyPCAlg.examples.graph_3 import get_graph_skeleton as skeleton_example_3
+from PyPCAlg.examples.graph_3 import oracle_indep_test as \
+    oracle_indep_test_example_3
+from PyPCAlg.examples.graph_3 import oracle_cond_indep_test as \
+    oracle_cond_indep_test_example_3
+from PyPCAlg.examples.graph_3 import get_adjacency_matrix as \
+    adjacency_matrix_example_3
+
+from PyPCAlg.examples.graph_4 import generate_data as generate_data_example_4
+from PyPCAlg.examples.graph_4 import oracle_indep_test as \
+    oracle_indep_test_example_4
+from PyPCAlg.examples.graph_4 import oracle_cond_indep_test as \
+    oracle_cond_indep_test_example_4
+from PyPCAlg.examples.graph_4 import get_cpdag as cpdag_example_4
+
+
+def counting_tests(indep_test_func, cond_indep_test_func):
+    tests = []
+
+    def counted_indep_test(data, x, y, level):
+        tests.append((x, y, ()))
+        return indep_test_func(data=data, x=x, y=y, level=level)
+
+    def counted_cond_indep_test(data, x, y, z, level):
+        tests.append((x, y, tuple(z)))
+        return cond_indep_test_func(data=data, x=x, y=y, z=z, level=level)
+
+    return counted_indep_test, counted_cond_indep_test, tests
+
+
+def test_background_knowledge_queries():
+    background_knowledge = BackgroundKnowledge(
+        nb_var=5,
+        tiers=[[0], [1, 2], [3]],
+        forbidden_edges=[(0, 4), (4, 0), (2, 4)],
+        required_edges=[(1, 2)],
+        forbidden_conditioning=[2]
+    )
+
+    assert background_knowledge.is_forbidden(3, 0)
+    assert not background_knowledge.is_forbidden(0, 3)
+    assert background_knowledge.is_forbidden(2, 4)
+    assert not background_knowledge.is_forbidden(4, 2)
+    assert background_knowledge.is_required(1, 2)
+    assert background_knowledge.requires_adjacency(2, 1)
+    assert background_knowledge.forbids_adjacency(4, 0)
+    assert background_knowledge.forbidden_adjacencies() == {(0, 4)}
+    assert list(background_knowledge.allowed_in_separating_set(0, 1)) == \
+        [True, True, False, False, True]
+    assert list(background_knowledge.allowed_in_separating_set(0, 4)) == \
+        [True, True, False, True, True]
+    assert list(background_knowledge.forbidden_mask([3, 2, 0], [0, 1, 1])) \
+        == [True, True, False]
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    [
+        dict(tiers=[[0], [0, 1]]),
+        dict(tiers=[[0], [1]], required_edges=[(1, 0)]),
+        dict(forbidden_edges=[(0, 1)], required_edges=[(0, 1)]),
+    ]
+)
+def test_inconsistent_background_knowledge(kwargs):
+
+    with pytest.raises(ValueError):
+        BackgroundKnowledge(nb_var=3, **kwargs)
+
+
+def test_orient_with_background_knowledge():
+    pdag = np.asarray([
+        [0, 1, 1],
+        [1, 0, 1],
+        [0, 1, 0]
+    ])
+    background_knowledge = BackgroundKnowledge(
+        nb_var=3,
+        forbidden_edges=[(2, 1), (2, 0)],
+        required_edges=[(1, 0)]
+    )
+
+    actual = orient_with_background_knowledge(pdag, background_knowledge)
+
+    assert np.array_equal(actual, [
+        [0, 0, 1],
+        [1, 0, 1],
+        [0, 0, 0]
+    ])
+
+
+def test_tiers_prune_tests_and_orient_edges():
+    data = generate_data_example_3(10)
+    background_knowledge = BackgroundKnowledge(
+        nb_var=5,
+        tiers=[[0], [1], [2, 3], [4]]
+    )
+
+    indep_test, cond_indep_test, tests = counting_tests(
+        oracle_indep_test_example_3(), oracle_cond_indep_test_example_3()
+    )
+    run_pc_adjacency_phase(
+        data=data,
+        indep_test_func=indep_test,
+        cond_indep_test_func=cond_indep_test,
+        level=0.05
+    )
+    nb_tests_without_knowledge = len(tests)
+
+    indep_test, cond_indep_test, tests = counting_tests(
+        oracle_indep_test_example_3(), oracle_cond_indep_test_example_3()
+    )
+    skeleton, _ = run_pc_adjacency_phase(
+        data=data,
+        indep_test_func=indep_test,
+        cond_indep_test_func=cond_indep_test,
+        level=0.05,
+        background_knowledge=background_knowledge
+    )
+
+    assert np.array_equal(skeleton, skeleton_example_3())
+    assert len(tests) < nb_tests_without_knowledge
+
+    cpdag = run_pc_algorithm(
+        data=data,
+        indep_test_func=oracle_indep_test_example_3(),
+        cond_indep_test_func=oracle_cond_indep_test_example_3(),
+        level=0.05,
+        background_knowledge=background_knowledge
+    )[field_pc_cpdag]
+
+    assert np.array_equal(cpdag, adjacency_matrix_example_3())
+
+
+def test_forbidden_adjacency_is_never_tested():
+    background_knowledge = BackgroundKnowledge(
+        nb_var=5,
+        forbidden_edges=[(0, 4), (4, 0)]
+    )
+    indep_test, cond_indep_test, tests = counting_tests(
+        oracle_indep_test_example_4(), oracle_cond_indep_test_example_4()
+    )
+
+    cpdag = run_pc_algorithm(
+        data=generate_data_example_4(10),
+        indep_test_func=indep_test,
+        cond_indep_test_func=cond_indep_test,
+        level=0.05,
+        background_knowledge=background_knowledge
+    )[field_pc_cpdag]
+
+    assert all({x, y} != {0, 4} for (x, y, z) in tests)
+    assert np.array_equal(cpdag, cpdag_example_4())
+
+
+def test_required_edge_is_never_tested_and_oriented():
+    background_knowledge = BackgroundKnowledge(
+        nb_var=3,
+        required_edges=[(0, 1)]
+    )
+    indep_test, cond_indep_test, tests = counting_tests(
+        oracle_indep_test_example_2(), oracle_cond_indep_test_example_2()
+    )
+
+    cpdag = run_pc_algorithm(
+        data=generate_data_example_2(10),
+        indep_test_func=indep_test,
+        cond_indep_test_func=cond_indep_test,
+        level=0.05,
+        background_knowledge=background_knowledge
+    )[field_pc_cpdag]
+
+    assert all({x, y} != {0, 1} for (x, y, z) in tests)
+    assert np.array_equal(cpdag, adjacency_matrix_example_2())
+
+
+def test_forbidden_conditioning_variable():
+    background_knowledge = BackgroundKnowledge(
+        nb_var=3,
+        forbidden_conditioning=[1]
+    )
+
+    skeleton, separation_sets = run_pc_adjacency_phase(
+        data=generate_data_example_2(10),
+        indep_test_func=oracle_indep_test_example_2(),
+        cond_indep_test_func=oracle_cond_indep_test_example_2(),
+        level=0.05,
+        background_knowledge=background_knowledge
+    )
+
+    # X0 and X2 are only separated by X1
+    assert np.array_equal(skeleton, np.ones((3, 3)) - np.identity(3))
+    assert len(separation_sets) == 0
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from PyPCAlg.batch import grouped_sufficient_statistics, run_pc_batch, \
+    run_pc_grouped, field_error
+from PyPCAlg.pc_algorithm import run_pc_algorithm, field_pc_cpdag, \
+    field_separation_sets
+from PyPCAlg.utilities.dataset import Dataset
+from PyPCAlg.utilities.independence_relationships import \
+    linear_indep_test, linear_cond_indep_test
+from PyPCAlg.utilities.sufficient_statistics import \
+    GaussianSufficientStatistics
+
+from PyPCAlg.examples.graph_4 import generate_data as generate_data_example_4
+
+
+def _segments(nb_segments=6, sample_size=100):
+    segments = []
+    for i in range(nb_segments):
+        segment = generate_data_example_4(sample_size=sample_size)
+        segment['segment'] = f's{i}'
+        segments.append(segment)
+
+    return pd.concat(segments, ignore_index=True).sample(frac=1,
+                                                         random_state=0)
+
+
+def _expected(data):
+    return run_pc_algorithm(
+        data=Dataset(data),
+        indep_test_func=linear_indep_test,
+        cond_indep_test_func=linear_cond_indep_test,
+        level=0.05
+    )
+
+
+def test_grouped_sufficient_statistics():
+    data = _segments()
+    data.loc[data.index[:3], 'segment'] = np.nan
+
+    statistics = grouped_sufficient_statistics(data, by='segment')
+
+    assert list(statistics) == [f's{i}' for i in range(6)]
+    for key, statistics_group in statistics.items():
+        group = data[data['segment'] == key].drop(columns='segment')
+        assert statistics_group.columns == list(group.columns)
+        assert statistics_group.nb_obs == len(group)
+        assert np.allclose(statistics_group.covariance(),
+                           np.cov(group.to_numpy(), rowvar=False))
+
+
+@pytest.mark.parametrize('nb_workers,chunk_size', [(1, 1), (2, 1), (2, 4)])
+def test_run_pc_batch(nb_workers, chunk_size):
+    datasets = {f'd{i}': generate_data_example_4(sample_size=200)
+                for i in range(5)}
+
+    results = dict(run_pc_batch(datasets, level=0.05, nb_workers=nb_workers,
+                                chunk_size=chunk_size))
+
+    assert set(results) == set(datasets)
+    for key, data in datasets.items():
+        expected = _expected(data)
+        assert np.array_equal(results[key][field_pc_cpdag],
+                              expected[field_pc_cpdag])
+        assert results[key][field_separation_sets] == \
+            expected[field_separation_sets]
+
+
+@pytest.mark.parametrize('nb_workers', [1, 2])
+def test_run_pc_batch_user_tests(nb_workers):
+    datasets = [Dataset(generate_data_example_4(sample_size=200))
+                for _ in range(3)]
+
+    results = dict(run_pc_batch(
+        datasets, level=0.05, indep_test_func=linear_indep_test,
+        cond_indep_test_func=linear_cond_indep_test, nb_workers=nb_workers
+    ))
+
+    assert sorted(results) == [0, 1, 2]
+    for i, data in enumerate(datasets):
+        assert np.array_equal(results[i][field_pc_cpdag],
+                              _expected(data)[field_pc_cpdag])
+
+
+def test_run_pc_batch_wrong_tests():
+    statistics = GaussianSufficientStatistics.from_data(
+        generate_data_example_4(sample_size=50)
+    )
+
+    # User-provided tests cannot run on the statistics of a dataset
+    [(key, res)] = run_pc_batch([statistics], level=0.05,
+                                indep_test_func=linear_indep_test,
+                                cond_indep_test_func=linear_cond_indep_test)
+    assert key == 0
+    assert isinstance(res[field_error], ValueError)
+
+    with pytest.raises(ValueError):
+        list(run_pc_batch([statistics], level=0.05,
+                          indep_test_func=linear_indep_test))
+
+
+@pytest.mark.parametrize('nb_workers', [1, 2])
+def test_run_pc_batch_failing_dataset(nb_workers):
+    datasets = {f'd{i}': generate_data_example_4(sample_size=200)
+                for i in range(4)}
+    # A single observation : no covariance can be computed
+    datasets['d2'] = datasets['d2'].iloc[:1]
+
+    results = dict(run_pc_batch(datasets, level=0.05, nb_workers=nb_workers,
+                                chunk_size=2))
+
+    assert set(results) == set(datasets)
+    assert set(results['d2']) == {field_error}
+    assert isinstance(results['d2'][field_error], ValueError)
+    for key in ['d0', 'd1', 'd3']:
+        assert np.array_equal(results[key][field_pc_cpdag],
+                              _expected(datasets[key])[field_pc_cpdag])
+
+
+def test_run_pc_grouped():
+    data = _segments()
+
+    results = dict(run_pc_grouped(data, by='segment', level=0.05,
+                                  nb_workers=2, chunk_size=2,
+                                  output_format='edge_list'))
+
+    assert sorted(results) == [f's{i}' for i in range(6)]
+    for key, res in results.items():
+        group = data[data['segment'] == key].drop(columns='segment')
+        assert np.array_equal(res[field_pc_cpdag].to_dense(),
+                              _expected(group)[field_pc_cpdag])
+        assert res[field_pc_cpdag].column_names == list(group.columns)
@@ -0,0 +1,173 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from PyPCAlg.cli import main
+from PyPCAlg.utilities import dataset
+from PyPCAlg.utilities.edge_list import EdgeListCPDAG
+
+from PyPCAlg.examples.graph_4 import generate_data as generate_data_example_4
+from PyPCAlg.examples.graph_4 import get_adjacency_matrix as \
+    dag_example_4
+from PyPCAlg.examples.graph_4 import get_cpdag as cpdag_example_4
+
+
+@pytest.fixture
+def example_4_files(tmp_path):
+    data_file = str(tmp_path / 'data.csv')
+    dag_file = str(tmp_path / 'dag.npy')
+    generate_data_example_4(sample_size=20).to_csv(data_file, index=False)
+    np.save(dag_file, dag_example_4())
+
+    return data_file, dag_file
+
+
+def _read_cpdag(output_dir, level):
+    edges = pd.read_csv(os.path.join(output_dir, f'cpdag_{level}.csv'))
+    names = list(generate_data_example_4(sample_size=1).columns)
+    directed = [(names.index(x), names.index(y)) for x, y, edge in
+                edges.itertuples(index=False) if edge == '-->']
+    undirected = [(names.index(x), names.index(y)) for x, y, edge in
+                  edges.itertuples(index=False) if edge == '---']
+
+    return EdgeListCPDAG(len(names), directed, undirected).to_dense()
+
+
+def _read_metrics(output_dir, level):
+    with open(os.path.join(output_dir, f'metrics_{level}.json')) as file:
+        return json.load(file)
+
+
+def test_help_does_not_import_heavy_modules():
+    command = 'import sys, PyPCAlg.cli; ' \
+              'print(any(module in sys.modules for module in ' \
+              '("numpy", "pandas", "pingouin")))'
+
+    output = subprocess.run([sys.executable, '-c', command],
+                            capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == 'False'
+
+
+@pytest.mark.parametrize('nb_workers', [1, 2])
+def test_cli_d_separation(example_4_files, tmp_path, nb_workers):
+    data_file, dag_file = example_4_files
+    output_dir = str(tmp_path / 'results')
+
+    status = main([data_file, '--test', 'd-separation', '--dag', dag_file,
+                   '--level', '0.01', '0.05', '--output-dir', output_dir,
+                   '--workers', str(nb_workers)])
+
+    assert status == 0
+    for level in ['0.01', '0.05']:
+        assert np.array_equal(_read_cpdag(output_dir, level),
+                              cpdag_example_4())
+        with open(os.path.join(output_dir,
+                               f'separation_sets_{level}.json')) as file:
+            separation_sets = json.load(file)
+        assert len(separation_sets) > 0
+    # The second level only reads the cached p-values
+    assert _read_metrics(output_dir, '0.01')['nb_tests'] > 0
+    assert _read_metrics(output_dir, '0.05')['nb_tests'] == 0
+
+
+def test_cli_cache_and_checkpoint(example_4_files, tmp_path, capsys):
+    data_file, dag_file = example_4_files
+    arguments = [data_file, '--test', 'd-separation', '--dag', dag_file,
+                 '--output-dir', str(tmp_path / 'results'),
+                 '--cache-dir', str(tmp_path / 'cache'),
+                 '--checkpoint-dir', str(tmp_path / 'checkpoint'),
+                 '--checkpoint-every', '5']
+
+    main(arguments + ['--level', '0.05'])
+    main(arguments + ['--level', '0.05', '0.1'])
+
+    assert 'Level 0.05 already completed' in capsys.readouterr().out
+    assert _read_metrics(str(tmp_path / 'results'), '0.1')['nb_tests'] == 0
+    assert len(os.listdir(tmp_path / 'cache')) == 1
+
+
+def test_cli_checkpointed_levels_do_not_read_data(example_4_files, tmp_path,
+                                                  capsys, monkeypatch):
+    data_file, dag_file = example_4_files
+    arguments = [data_file, '--test', 'd-separation', '--dag', dag_file,
+                 '--output-dir', str(tmp_path / 'results'),
+                 '--checkpoint-dir', str(tmp_path / 'checkpoint'),
+                 '--level', '0.01', '0.05', '--workers', '2']
+
+    assert main(arguments) == 0
+
+    def read_dataset(*args, **kwargs):
+        raise AssertionError('The data is read')
+
+    monkeypatch.setattr(dataset, 'read_dataset', read_dataset)
+    assert main(arguments) == 0
+    out = capsys.readouterr().out
+    assert 'Level 0.01 already completed' in out
+    assert 'Level 0.05 already completed' in out
+
+
+def test_cli_checkpoints_of_other_jobs_are_ignored(example_4_files, tmp_path,
+                                                   capsys):
+    data_file, dag_file = example_4_files
+    other_dag_file = str(tmp_path / 'other_dag.npy')
+    # The empty DAG : every pair of variables is d-separated
+    np.save(other_dag_file, np.zeros_like(dag_example_4()))
+    arguments = ['--test', 'd-separation', '--level', '0.05',
+                 '--output-dir', str(tmp_path / 'results'),
+                 '--checkpoint-dir', str(tmp_path / 'checkpoint')]
+
+    main([data_file, '--dag', other_dag_file] + arguments)
+    main([data_file, '--dag', dag_file] + arguments)
+
+    assert 'already completed' not in capsys.readouterr().out
+    assert np.array_equal(_read_cpdag(str(tmp_path / 'results'), '0.05'),
+                          cpdag_example_4())
+    assert _read_metrics(str(tmp_path / 'results'), '0.05')['nb_tests'] > 0
+
+
+def test_cli_d_separation_rejects_columns(example_4_files, tmp_path):
+    data_file, dag_file = example_4_files
+
+    with pytest.raises(SystemExit):
+        main([data_file, '--test', 'd-separation', '--dag', dag_file,
+              '--columns', 'x1', 'x2', '--output-dir', str(tmp_path)])
+
+
+def test_cli_workers_single_level(tmp_path):
+    data_file = str(tmp_path / 'data.csv')
+    generate_data_example_4(sample_size=300).to_csv(data_file, index=False)
+
+    for nb_workers in [1, 3]:
+        status = main([data_file, '--level', '0.05',
+                       '--output-dir', str(tmp_path / str(nb_workers)),
+                       '--workers', str(nb_workers)])
+        assert status == 0
+
+    sequential = pd.read_csv(tmp_path / '1' / 'cpdag_0.05.csv')
+    parallel = pd.read_csv(tmp_path / '3' / 'cpdag_0.05.csv')
+    pd.testing.assert_frame_equal(parallel, sequential)
+    # The workers compute every test the depths may carry out
+    assert _read_metrics(str(tmp_path / '3'), '0.05')['nb_tests'] >= \
+        _read_metrics(str(tmp_path / '1'), '0.05')['nb_tests']
+
+
+def test_cli_linear_npy(tmp_path):
+    data_file = str(tmp_path / 'data.npy')
+    np.save(data_file, np.asfortranarray(
+        generate_data_example_4(sample_size=200).to_numpy()
+    ))
+
+    status = main([data_file, '--columns', '0', '1', '2',
+                   '--output-dir', str(tmp_path)])
+
+    assert status == 0
+    metrics = _read_metrics(str(tmp_path), '0.05')
+    assert metrics['nb_var'] == 3
+    assert metrics['nb_obs'] == 200
+
@@ -0,0 +1,87 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from PyPCAlg.examples.oracle_tools import OracleStore, \
+    check_independence_from_oracle
+from PyPCAlg.examples import graph_3, graph_4
+
+
+@pytest.mark.parametrize('graph', [graph_3, graph_4])
+def test_oracle_store_agrees_with_oracle(graph):
+    oracle = graph.get_oracle_independence_relationships()
+    data = graph.generate_data(10)
+    indep_test = graph.oracle_indep_test()
+    cond_indep_test = graph.oracle_cond_indep_test()
+    nb_var = data.shape[1]
+
+    for x in range(nb_var):
+        for y in range(nb_var):
+            if x == y:
+                continue
+            others = [i for i in range(nb_var) if i not in (x, y)]
+            for mask in range(2 ** len(others)):
+                z = [i for k, i in enumerate(others) if (mask >> k) & 1]
+                expected = check_independence_from_oracle(
+                    oracle=oracle, data=data, x=x, y=y, z=z
+                )
+                if len(z) == 0:
+                    actual = indep_test(data=data, x=x, y=y, level=0.05)
+                else:
+                    actual = cond_indep_test(data=data, x=x, y=y, z=z,
+                                             level=0.05)
+                assert actual == expected
+
+
+def test_oracle_store_save_and_load(tmp_path):
+    store = graph_4.get_oracle_store()
+    filename = os.path.join(tmp_path, 'oracle.npz')
+
+    store.save(filename)
+    loaded = OracleStore.load(filename)
+
+    assert loaded.variables == store.variables
+    assert len(loaded) == len(store) == 80
+    assert loaded.holds(0, 3, [1]) == store.holds(0, 3, [1])
+    assert loaded.holds(2, 4, []) == store.holds(2, 4, [])
+
+
+def test_oracle_store_with_permuted_columns():
+    store = graph_4.get_oracle_store()
+    data = graph_4.generate_data(10)
+    permuted = data[['x3', 'x0', 'x1', 'x2', 'x4']]
+    cond_indep_test = store.cond_indep_test()
+
+    # x0 _||_ x3 | x1 in graph 4
+    assert cond_indep_test(data=permuted, x=1, y=0, z=[2], level=0.05) == \
+        store.holds(0, 3, [1])
+    assert cond_indep_test(data=np.empty((0, 5)), x=0, y=3, z=[1],
+                           level=0.05) == store.holds(0, 3, [1])
+
+
+def test_oracle_store_shared_between_threads():
+    store = graph_4.get_oracle_store()
+    data = graph_4.generate_data(10)
+    frames = [data, data[['x3', 'x0', 'x1', 'x2', 'x4']]]
+    # x0 _||_ x3 | x1, with the indices of the columns of each frame
+    arguments = [dict(x=0, y=3, z=[1]), dict(x=1, y=0, z=[2])]
+    cond_indep_test = store.cond_indep_test()
+    expected = store.holds(0, 3, [1])
+    results = []
+
+    def run(k):
+        results.append(all(
+            cond_indep_test(data=frames[(i + k) % 2], level=0.05,
+                            **arguments[(i + k) % 2]) == expected
+            for i in range(2000)
+        ))
+
+    threads = [threading.Thread(target=run, args=(k,)) for k in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 4
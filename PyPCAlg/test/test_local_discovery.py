@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from PyPCAlg.local_discovery import run_local_discovery, \
+    find_parents_and_children, field_parents_and_children, field_parents, \
+    field_children, field_markov_blanket, field_target_separating_sets
+from PyPCAlg.markov_equivalence import dag_to_cpdag
+from PyPCAlg.pc_algorithm import field_nb_tests
+from PyPCAlg.utilities.d_separation import DSeparationOracle
+
+from PyPCAlg.examples.graph_4 import get_adjacency_matrix as \
+    dag_example_4
+from PyPCAlg.test.helpers import random_dag
+
+
+def _local_discovery(dag, target, **kwargs):
+    oracle = DSeparationOracle(dag)
+
+    return run_local_discovery(
+        data=np.zeros((1, dag.shape[0])),
+        target=target,
+        indep_test_func=oracle.indep_test(),
+        cond_indep_test_func=oracle.cond_indep_test(),
+        level=0.05,
+        **kwargs
+    )
+
+
+def test_local_discovery_example_4():
+    res = _local_discovery(dag_example_4(), target=2, markov_blanket=True)
+
+    assert res[field_parents_and_children] == [1, 3, 4]
+    assert res[field_parents] == [1, 4]
+    # x2 -> x3 by Meek's rule R1 (x1 -> x2 - x3 with x1, x3 not adjacent)
+    assert res[field_children] == [3]
+    # x4 is both a parent of x2 and a spouse (through x3)
+    assert res[field_markov_blanket] == [1, 3, 4]
+    # x0 is outside the blanket of x2, and separated from it given the
+    # blanket found so far
+    assert 1 in res[field_target_separating_sets][0]
+    assert DSeparationOracle(dag_example_4()).is_d_separated(
+        2, 0, res[field_target_separating_sets][0]
+    )
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_local_discovery_random_dags(seed):
+    dag = random_dag(nb_var=12, density=0.2, seed=seed)
+    cpdag = dag_to_cpdag(dag)
+    directed = (cpdag != 0) & (cpdag.T == 0)
+
+    for target in range(dag.shape[0]):
+        res = _local_discovery(dag, target, markov_blanket=True)
+
+        parents = np.flatnonzero(dag[:, target]).tolist()
+        children = np.flatnonzero(dag[target, :]).tolist()
+        spouses = {v for c in children
+                   for v in np.flatnonzero(dag[:, c]).tolist()}
+        assert res[field_parents_and_children] == sorted(parents + children)
+        assert res[field_markov_blanket] == \
+            sorted(set(parents) | set(children) | spouses - {target})
+        # The local orientations agree with the CPDAG
+        assert set(res[field_parents]) <= \
+            set(np.flatnonzero(directed[:, target]).tolist())
+        assert set(res[field_children]) <= \
+            set(np.flatnonzero(directed[target, :]).tolist())
+        for v, z in res[field_target_separating_sets].items():
+            assert DSeparationOracle(dag).is_d_separated(target, v, z)
+
+
+def test_local_discovery_is_local():
+    # A chain of 40 variables : the neighbourhood of a variable is small
+    nb_var = 40
+    dag = np.zeros((nb_var, nb_var))
+    for i in range(nb_var - 1):
+        dag[i, i + 1] = 1
+
+    res = _local_discovery(dag, target=20)
+
+    assert res[field_parents_and_children] == [19, 21]
+    # The target and its two neighbours are each tested against the other
+    # variables given single variables (the full PC algorithm performs more
+    # than 20000 tests on this chain)
+    assert res[field_nb_tests] < 3 * nb_var * nb_var
+
+
+def test_local_discovery_orientation_is_local():
+    # On a connected graph, orienting the edges and finding the spouses only
+    # costs a few tests around the target, not the neighbourhoods of the
+    # variables further away (the full PC algorithm performs more than
+    # 200000 tests on this graph)
+    dag = random_dag(nb_var=22, density=0.25, seed=0)
+    nb_tests = dict()
+    for target in [14, 19]:
+        unoriented = _local_discovery(dag, target, orient=False)
+        res = _local_discovery(dag, target, markov_blanket=True)
+        nb_tests[target] = res[field_nb_tests]
+
+        assert res[field_nb_tests] - unoriented[field_nb_tests] < 100
+
+    # The target 14 has a single neighbour, the target 19 nine of them
+    assert nb_tests[14] < 5000
+    assert nb_tests[19] < 30000
+
+
+def test_find_parents_and_children_candidates():
+    oracle = DSeparationOracle(dag_example_4())
+
+    adjacent, separating_sets = find_parents_and_children(
+        data=np.zeros((1, 5)), target=2,
+        indep_test_func=oracle.indep_test(),
+        cond_indep_test_func=oracle.cond_indep_test(),
+        level=0.05, candidates=[0, 1]
+    )
+
+    assert adjacent == [1]
+    assert separating_sets == {0: (1,)}
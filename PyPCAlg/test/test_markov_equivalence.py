@@ -0,0 +1,152 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from PyPCAlg.markov_equivalence import dag_to_cpdag, find_chain_components, \
+    count_markov_equivalent_dags, iter_markov_equivalent_dags, \
+    sample_markov_equivalent_dags
+
+from PyPCAlg.examples.graph_1 import get_adjacency_matrix as \
+    adjacency_matrix_example_1
+from PyPCAlg.examples.graph_1 import get_cpdag as cpdag_example_1
+from PyPCAlg.examples.graph_2 import get_adjacency_matrix as \
+    adjacency_matrix_example_2
+from PyPCAlg.examples.graph_2 import get_cpdag as cpdag_example_2
+from PyPCAlg.examples.graph_3 import get_adjacency_matrix as \
+    adjacency_matrix_example_3
+from PyPCAlg.examples.graph_3 import get_cpdag as cpdag_example_3
+from PyPCAlg.examples.graph_4 import get_adjacency_matrix as \
+    adjacency_matrix_example_4
+from PyPCAlg.examples.graph_4 import get_cpdag as cpdag_example_4
+from PyPCAlg.test.helpers import random_dag
+
+
+def markov_equivalent_dags_by_brute_force(cpdag):
+    edges = np.asarray(cpdag) != 0
+    undirected_edges = list(zip(*np.nonzero(np.triu(edges & edges.T))))
+    dags = []
+    for orientation in itertools.product([False, True],
+                                         repeat=len(undirected_edges)):
+        dag = edges & ~edges.T
+        for (i, j), reverse in zip(undirected_edges, orientation):
+            dag[(j, i) if reverse else (i, j)] = True
+        is_acyclic = not any(
+            np.trace(np.linalg.matrix_power(dag.astype(int), k)) > 0
+            for k in range(2, dag.shape[0] + 1)
+        )
+        if is_acyclic and np.array_equal(dag_to_cpdag(dag) != 0, edges):
+            dags.append(dag)
+
+    return dags
+
+
+@pytest.mark.parametrize(
+    'dag, cpdag',
+    [
+        (adjacency_matrix_example_1(), cpdag_example_1()),
+        (adjacency_matrix_example_2(), cpdag_example_2()),
+        (adjacency_matrix_example_3(), cpdag_example_3()),
+        (adjacency_matrix_example_4(), cpdag_example_4()),
+    ]
+)
+def test_dag_to_cpdag(dag, cpdag):
+
+    actual = dag_to_cpdag(dag)
+
+    assert np.array_equal(actual, cpdag)
+
+
+def test_find_chain_components():
+    cpdag = np.asarray([
+        [0, 1, 0, 0, 0],
+        [1, 0, 1, 0, 0],
+        [0, 1, 0, 1, 0],
+        [0, 0, 0, 0, 1],
+        [0, 0, 0, 1, 0]
+    ])
+
+    actual = find_chain_components(cpdag)
+
+    assert sorted(actual) == [(0, 1, 2), (3, 4)]
+
+
+@pytest.mark.parametrize(
+    'cpdag, expected',
+    [
+        (cpdag_example_1(), 1),
+        (cpdag_example_2(), 3),
+        (cpdag_example_3(), 4),
+        (cpdag_example_4(), 2),
+        (np.ones((6, 6)) - np.identity(6), math.factorial(6)),
+        (np.zeros((4, 4)), 1),
+    ]
+)
+def test_count_markov_equivalent_dags(cpdag, expected):
+
+    actual = count_markov_equivalent_dags(cpdag)
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    'nb_var, density, seed',
+    [
+        (5, 0.6, 1),
+        (6, 0.5, 2),
+        (7, 0.4, 3),
+        (7, 0.6, 4),
+        (8, 0.3, 5),
+        (8, 0.5, 6),
+    ]
+)
+def test_enumeration_against_brute_force(nb_var, density, seed):
+    cpdag = dag_to_cpdag(random_dag(nb_var, density, seed))
+
+    expected = {dag.tobytes() for dag in
+                markov_equivalent_dags_by_brute_force(cpdag)}
+
+    actual = [dag != 0 for dag in iter_markov_equivalent_dags(cpdag)]
+
+    assert count_markov_equivalent_dags(cpdag) == len(expected)
+    assert len(actual) == len(expected)
+    assert {dag.tobytes() for dag in actual} == expected
+
+
+def test_sample_markov_equivalent_dags():
+    cpdag = np.ones((4, 4)) - np.identity(4)
+    nb_samples = 2400
+
+    samples = list(sample_markov_equivalent_dags(
+        cpdag, nb_samples, rng=np.random.default_rng(42)
+    ))
+    counts = dict()
+    for dag in samples:
+        counts[dag.tobytes()] = counts.get(dag.tobytes(), 0) + 1
+
+    assert all(np.array_equal(dag_to_cpdag(dag), cpdag) for dag in samples)
+    assert len(counts) == 24
+    # Each of the 24 DAGs is expected 100 times
+    assert min(counts.values()) > 60
+    assert max(counts.values()) < 140
+
+
+def test_sample_markov_equivalent_dags_large_class():
+    # The 21! orderings of the complete graph exceed 64-bit integers
+    nb_var = 21
+    cpdag = np.ones((nb_var, nb_var)) - np.identity(nb_var)
+    assert count_markov_equivalent_dags(cpdag) == math.factorial(nb_var)
+
+    samples = list(sample_markov_equivalent_dags(
+        cpdag, 20 * nb_var, rng=np.random.default_rng(0)
+    ))
+    sources = [int(np.flatnonzero(dag.sum(axis=0) == 0)[0])
+               for dag in samples]
+
+    assert all(np.array_equal(dag_to_cpdag(dag), cpdag)
+               for dag in samples[:10])
+    # Each variable is expected to be the source 20 times
+    counts = np.bincount(sources, minlength=nb_var)
+    assert counts.min() > 4
+    assert counts.max() < 40
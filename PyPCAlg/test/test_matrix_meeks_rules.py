@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+
+from PyPCAlg.matrix_meeks_rules import apply_rule_R1, apply_rule_R2, \
+    apply_rule_R3, apply_rule_R4, propagate_Meeks_rules, split_pdag, \
+    merge_pdag
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+from PyPCAlg.test.test_meeks_rules import random_pattern, \
+    apply_Meeks_rules_until_fixed_point
+
+
+@pytest.mark.parametrize(
+    'rule, input_pdag, expected',
+    [
+        (
+            apply_rule_R1,
+            np.asarray([
+                [0, 1, 0],
+                [0, 0, 1],
+                [0, 1, 0]
+            ]),
+            np.asarray([
+                [0, 1, 0],
+                [0, 0, 1],
+                [0, 0, 0]
+            ]),
+        ),
+        (
+            apply_rule_R2,
+            np.asarray([
+                [0, 1, 1],
+                [0, 0, 1],
+                [1, 0, 0]
+            ]),
+            np.asarray([
+                [0, 1, 1],
+                [0, 0, 1],
+                [0, 0, 0]
+            ]),
+        ),
+        (
+            apply_rule_R3,
+            np.asarray([
+                [0, 1, 1, 1],
+                [1, 0, 0, 0],
+                [1, 1, 0, 0],
+                [1, 1, 0, 0]
+            ]),
+            np.asarray([
+                [0, 1, 1, 1],
+                [0, 0, 0, 0],
+                [1, 1, 0, 0],
+                [1, 1, 0, 0]
+            ]),
+        ),
+        (
+            apply_rule_R3,
+            np.asarray([
+                [0, 1, 1, 1],
+                [1, 0, 0, 0],
+                [1, 1, 0, 1],
+                [1, 1, 1, 0]
+            ]),
+            np.asarray([
+                [0, 1, 1, 1],
+                [1, 0, 0, 0],
+                [1, 1, 0, 1],
+                [1, 1, 1, 0]
+            ]),
+        ),
+        (
+            apply_rule_R4,
+            np.asarray([
+                [0, 1, 1, 1],
+                [1, 0, 0, 0],
+                [1, 0, 0, 1],
+                [1, 1, 0, 0]
+            ]),
+            np.asarray([
+                [0, 1, 1, 1],
+                [0, 0, 0, 0],
+                [1, 0, 0, 1],
+                [1, 1, 0, 0]
+            ]),
+        ),
+        (
+            apply_rule_R4,
+            np.asarray([
+                [0, 1, 1, 1],
+                [1, 0, 1, 0],
+                [1, 1, 0, 1],
+                [1, 1, 0, 0]
+            ]),
+            np.asarray([
+                [0, 1, 1, 1],
+                [1, 0, 1, 0],
+                [1, 1, 0, 1],
+                [1, 1, 0, 0]
+            ]),
+        ),
+    ]
+)
+def test_apply_rule(rule, input_pdag, expected):
+
+    actual = rule(input_pdag)
+
+    assert np.array_equal(actual, expected)
+
+
+def test_split_and_merge_pdag():
+    pdag = np.asarray([
+        [0, 1, 1],
+        [0, 0, 1],
+        [1, 0, 0]
+    ])
+
+    directed, undirected = split_pdag(pdag)
+
+    assert np.array_equal(directed, [
+        [False, True, False],
+        [False, False, True],
+        [False, False, False]
+    ])
+    assert np.array_equal(undirected, [
+        [False, False, True],
+        [False, False, False],
+        [True, False, False]
+    ])
+    assert np.array_equal(merge_pdag(directed, undirected), pdag)
+
+
+@pytest.mark.parametrize(
+    'nb_var, density, nb_known, apply_R4, seed',
+    [
+        (10, 0.3, 0, False, 1),
+        (20, 0.2, 0, False, 2),
+        (30, 0.15, 0, False, 9),
+        (40, 0.08, 0, False, 8),
+        (10, 0.4, 3, True, 4),
+        (20, 0.3, 5, True, 5),
+        (15, 0.5, 6, True, 10),
+    ]
+)
+def test_propagate_Meeks_rules(nb_var, density, nb_known, apply_R4, seed):
+    pattern = random_pattern(nb_var, density, nb_known, seed)
+
+    expected = apply_Meeks_rules_until_fixed_point(pattern, apply_R4)
+
+    actual = propagate_Meeks_rules(pdag=pattern, apply_R4=apply_R4)
+    actual_bit_packed = propagate_Meeks_rules(
+        pdag=BitPackedGraph.from_adjacency_matrix(pattern),
+        apply_R4=apply_R4
+    )
+
+    assert np.array_equal(actual, expected)
+    assert np.array_equal(actual_bit_packed.to_adjacency_matrix(), expected)
@@ -2,7 +2,8 @@ import numpy as np
 import pytest
 
 from PyPCAlg.meeks_rules import apply_rule_R1, apply_rule_R2, apply_rule_R3, \
-    apply_rule_R4
+    apply_rule_R4, apply_Meeks_rules, propagate_Meeks_rules
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
 
 
 @pytest.mark.parametrize(
@@ -147,3 +148,67 @@ def test_apply_rule_R4(input_pdag, expected):
     print(actual)
 
     assert np.array_equal(actual, expected)
+
+
+def random_pattern(nb_var, density, nb_known, seed):
+    """
+    Returns the pattern (skeleton with the v-structures oriented) of a random
+    DAG, with nb_known additional edges oriented as in the DAG.
+    """
+    rng = np.random.default_rng(seed)
+    dag = np.triu(rng.random((nb_var, nb_var)) < density, k=1).astype(int)
+    permutation = rng.permutation(nb_var)
+    dag = dag[np.ix_(permutation, permutation)]
+
+    pattern = dag | dag.T
+    for b in range(nb_var):
+        parents = np.flatnonzero(dag[:, b])
+        for a in parents:
+            for c in parents:
+                if a < c and pattern[a, c] == 0:
+                    pattern[b, a] = 0
+                    pattern[b, c] = 0
+    rows, columns = np.nonzero(dag)
+    for k in rng.permutation(len(rows))[:nb_known]:
+        pattern[columns[k], rows[k]] = 0
+
+    return pattern
+
+
+def apply_Meeks_rules_until_fixed_point(pdag, apply_R4):
+    current_pdag = pdag
+    while True:
+        new_pdag = apply_Meeks_rules(pdag=current_pdag, apply_R4=apply_R4)
+        if np.array_equal(new_pdag, current_pdag):
+            return new_pdag
+        current_pdag = new_pdag
+
+
+@pytest.mark.parametrize(
+    'nb_var, density, nb_known, apply_R4, seed',
+    [
+        (6, 0.5, 0, False, 0),
+        (10, 0.3, 0, False, 1),
+        (20, 0.2, 0, False, 2),
+        (30, 0.1, 0, False, 3),
+        (30, 0.15, 0, False, 9),
+        (40, 0.08, 0, False, 8),
+        (10, 0.4, 3, True, 4),
+        (20, 0.3, 5, True, 5),
+        (25, 0.2, 8, True, 6),
+        (15, 0.5, 6, True, 10),
+    ]
+)
+def test_propagate_Meeks_rules(nb_var, density, nb_known, apply_R4, seed):
+    pattern = random_pattern(nb_var, density, nb_known, seed)
+
+    expected = apply_Meeks_rules_until_fixed_point(pattern, apply_R4)
+
+    actual = propagate_Meeks_rules(pdag=pattern.copy(), apply_R4=apply_R4)
+    actual_bit_packed = propagate_Meeks_rules(
+        pdag=BitPackedGraph.from_adjacency_matrix(pattern),
+        apply_R4=apply_R4
+    )
+
+    assert np.array_equal(actual, expected)
+    assert np.array_equal(actual_bit_packed.to_adjacency_matrix(), expected)
@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from PyPCAlg.markov_equivalence import dag_to_cpdag
+from PyPCAlg.partitioned import partition_variables, run_pc_partitioned, \
+    field_clusters
+from PyPCAlg.pc_algorithm import run_pc_algorithm, field_pc_cpdag, \
+    field_separation_sets, field_nb_tests
+from PyPCAlg.utilities.d_separation import DSeparationOracle
+from PyPCAlg.utilities.data_generation import generate_linear_sem_data, \
+    random_edge_weights
+from PyPCAlg.utilities.dataset import Dataset
+from PyPCAlg.utilities.independence_relationships import \
+    linear_indep_test, linear_cond_indep_test
+from PyPCAlg.utilities.sufficient_statistics import \
+    GaussianSufficientStatistics
+
+from PyPCAlg.examples.graph_4 import generate_data as generate_data_example_4
+from PyPCAlg.test.helpers import random_dag
+
+
+def test_partition_variables():
+    # Two chains 0 - 1 - ... - 6 and 7 - 8, and the isolated variable 9
+    neighbours = [set() for _ in range(10)]
+    for x, y in [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (7, 8)]:
+        neighbours[x].add(y)
+        neighbours[y].add(x)
+
+    clusters = partition_variables(neighbours, max_cluster_size=3)
+
+    assert sorted(v for cluster in clusters for v in cluster) == \
+        list(range(10))
+    assert all(len(cluster) <= 3 for cluster in clusters)
+    # The large chain is split into connected regions, the small components
+    # are packed together
+    assert [0, 1, 2] in clusters
+    assert [7, 8, 9] in clusters
+
+    with pytest.raises(ValueError):
+        partition_variables(neighbours, max_cluster_size=0)
+
+
+@pytest.mark.parametrize('nb_var,density,seed,max_cluster_size', [
+    (12, 0.2, 0, 3),
+    (15, 0.2, 1, 4),
+    (20, 0.15, 2, 5),
+    (20, 0.3, 3, 6),
+])
+def test_run_pc_partitioned_oracle(nb_var, density, seed, max_cluster_size):
+    dag = random_dag(nb_var, density, seed)
+    oracle = DSeparationOracle(dag)
+
+    res = run_pc_partitioned(
+        data=np.zeros((1, nb_var)),
+        level=0.05,
+        indep_test_func=oracle.indep_test(),
+        cond_indep_test_func=oracle.cond_indep_test(),
+        max_cluster_size=max_cluster_size
+    )
+
+    assert np.array_equal(res[field_pc_cpdag], dag_to_cpdag(dag))
+    assert all(len(cluster) <= max_cluster_size
+               for cluster in res[field_clusters])
+    for (x, y) in res[field_separation_sets]:
+        for z in res[field_separation_sets][(x, y)]:
+            assert oracle.is_d_separated(x, y, z)
+
+
+def test_run_pc_partitioned_chain():
+    # A chain of 40 variables, all marginally dependent
+    nb_var = 40
+    dag = np.eye(nb_var, k=1)
+    oracle = DSeparationOracle(dag)
+
+    res = run_pc_partitioned(
+        data=np.zeros((1, nb_var)),
+        level=0.05,
+        indep_test_func=oracle.indep_test(),
+        cond_indep_test_func=oracle.cond_indep_test(),
+        max_cluster_size=8,
+        bit_packed=True,
+        output_format='edge_list'
+    )
+
+    assert np.array_equal(res[field_pc_cpdag].to_dense(), dag_to_cpdag(dag))
+    assert len(res[field_clusters]) == 5
+    # The full PC algorithm performs more than 20000 tests on this chain
+    assert res[field_nb_tests] < 3 * nb_var * nb_var
+
+
+def test_run_pc_partitioned_single_cluster():
+    data = generate_data_example_4(sample_size=500)
+
+    res = run_pc_partitioned(data=data, level=0.05)
+    expected = run_pc_algorithm(
+        data=Dataset(data),
+        indep_test_func=linear_indep_test,
+        cond_indep_test_func=linear_cond_indep_test,
+        level=0.05
+    )
+
+    assert res[field_clusters] == [[0, 1, 2, 3, 4]]
+    assert np.array_equal(res[field_pc_cpdag], expected[field_pc_cpdag])
+
+
+@pytest.mark.parametrize('nb_workers', [1, 2])
+def test_run_pc_partitioned_linear(nb_workers):
+    rng = np.random.default_rng(0)
+    dag = random_dag(nb_var=16, density=0.15, seed=4)
+    data = generate_linear_sem_data(
+        dag, random_edge_weights(dag, rng=rng), sample_size=5000, rng=rng
+    )
+    statistics = GaussianSufficientStatistics.from_data(data)
+
+    res = run_pc_partitioned(data=statistics, level=0.01,
+                             max_cluster_size=4, nb_workers=nb_workers)
+    res_tests = run_pc_partitioned(data=Dataset(data), level=0.01,
+                                   indep_test_func=linear_indep_test,
+                                   cond_indep_test_func=linear_cond_indep_test,
+                                   max_cluster_size=4, nb_workers=nb_workers)
+
+    assert np.array_equal(res[field_pc_cpdag], dag_to_cpdag(dag))
+    assert np.array_equal(res_tests[field_pc_cpdag], res[field_pc_cpdag])
+    assert res_tests[field_separation_sets] == res[field_separation_sets]
+
+
+def test_run_pc_partitioned_wrong_arguments():
+    data = generate_data_example_4(sample_size=50)
+    statistics = GaussianSufficientStatistics.from_data(data)
+
+    with pytest.raises(ValueError):
+        run_pc_partitioned(data=data, level=0.05,
+                           indep_test_func=linear_indep_test)
+    with pytest.raises(ValueError):
+        run_pc_partitioned(data=statistics, level=0.05,
+                           indep_test_func=linear_indep_test,
+                           cond_indep_test_func=linear_cond_indep_test)
+    with pytest.raises(ValueError):
+        run_pc_partitioned(data=data, level=0.05, output_format='sparse')
@@ -1,8 +1,14 @@
 import numpy as np
 import pytest
 
+from PyPCAlg.markov_equivalence import dag_to_cpdag
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+from PyPCAlg.utilities.d_separation import DSeparationOracle
+from PyPCAlg.utilities.edge_list import EdgeListCPDAG
 from PyPCAlg.pc_algorithm import run_pc_adjacency_phase, \
-    run_pc_orientation_phase, run_pc_algorithm, field_pc_cpdag
+    run_pc_orientation_phase, run_pc_algorithm, field_pc_cpdag, \
+    field_separation_sets
+from PyPCAlg.test.helpers import random_dag
 
 from PyPCAlg.examples.graph_1 import generate_data as generate_data_example_1
 from PyPCAlg.examples.graph_1 import get_graph_skeleton as skeleton_example_1
@@ -132,6 +138,14 @@ def test_run_pc_orientation_phase(causal_skeleton, separation_sets,
 
     assert np.array_equal(actual_cpdag, expected_cpdag)
 
+    actual_cpdag = run_pc_orientation_phase(
+        causal_skeleton=causal_skeleton,
+        separation_sets=separation_sets,
+        matrix_form_meeks_rules=True
+    )
+
+    assert np.array_equal(actual_cpdag, expected_cpdag)
+
 
 @pytest.mark.parametrize(
     'data, indep_test_func, cond_indep_test_func, level, expected_cpdag',
@@ -177,3 +191,122 @@ def test_run_pc_algorithm(data, indep_test_func, cond_indep_test_func, level,
     )[field_pc_cpdag]
 
     assert np.array_equal(actual_cpdag, expected_cpdag)
+
+
+@pytest.mark.parametrize(
+    'data, indep_test_func, cond_indep_test_func, level, expected_cpdag',
+    [
+        (
+                generate_data_example_1(10),
+                oracle_indep_test_example_1(),
+                oracle_cond_indep_test_example_1(),
+                0.05,
+                cpdag_example_1()
+        ),
+        (
+                generate_data_example_3(10),
+                oracle_indep_test_example_3(),
+                oracle_cond_indep_test_example_3(),
+                0.05,
+                cpdag_example_3()
+        ),
+        (
+                generate_data_example_4(10),
+                oracle_indep_test_example_4(),
+                oracle_cond_indep_test_example_4(),
+                0.05,
+                cpdag_example_4()
+        ),
+    ]
+)
+def test_run_pc_algorithm_bit_packed(data, indep_test_func,
+                                     cond_indep_test_func, level,
+                                     expected_cpdag):
+
+    actual_cpdag = run_pc_algorithm(
+        data=data,
+        indep_test_func=indep_test_func,
+        cond_indep_test_func=cond_indep_test_func,
+        level=level,
+        bit_packed=True
+    )[field_pc_cpdag]
+
+    assert isinstance(actual_cpdag, BitPackedGraph)
+    assert np.array_equal(actual_cpdag.to_adjacency_matrix(), expected_cpdag)
+
+
+@pytest.mark.parametrize('bit_packed', [False, True])
+def test_run_pc_algorithm_edge_list(bit_packed):
+    data = generate_data_example_3(10)
+
+    res = run_pc_algorithm(
+        data=data,
+        indep_test_func=oracle_indep_test_example_3(),
+        cond_indep_test_func=oracle_cond_indep_test_example_3(),
+        level=0.05,
+        bit_packed=bit_packed,
+        output_format='edge_list'
+    )
+    actual_cpdag = res[field_pc_cpdag]
+
+    assert isinstance(actual_cpdag, EdgeListCPDAG)
+    assert actual_cpdag.column_names == list(data.columns)
+    assert np.array_equal(actual_cpdag.to_dense(), cpdag_example_3())
+    assert res[field_separation_sets].to_dict() == separation_sets_example_3()
+
+
+def test_run_pc_algorithm_unknown_output_format():
+
+    with pytest.raises(ValueError):
+        run_pc_algorithm(
+            data=generate_data_example_1(10),
+            indep_test_func=oracle_indep_test_example_1(),
+            cond_indep_test_func=oracle_cond_indep_test_example_1(),
+            level=0.05,
+            output_format='csv'
+        )
+
+
+@pytest.mark.parametrize('nb_var,density,seed,bit_packed', [
+    (8, 0.3, 0, False),
+    (12, 0.2, 1, False),
+    (12, 0.3, 2, True),
+    (20, 0.15, 3, False),
+])
+@pytest.mark.parametrize('marginal_screening', [True, False])
+def test_run_pc_algorithm_markov_blanket_prefilter(nb_var, density, seed,
+                                                   bit_packed,
+                                                   marginal_screening):
+    dag = random_dag(nb_var, density, seed)
+    oracle = DSeparationOracle(dag)
+    counts = {False: 0, True: 0}
+
+    for prefilter in [False, True]:
+
+        def indep_test(data, x, y, level):
+            counts[prefilter] += 1
+            return oracle.is_d_separated(x, y, ())
+
+        def cond_indep_test(data, x, y, z, level):
+            counts[prefilter] += 1
+            return oracle.is_d_separated(x, y, z)
+
+        res = run_pc_algorithm(
+            data=np.zeros((1, nb_var)),
+            indep_test_func=indep_test,
+            cond_indep_test_func=cond_indep_test,
+            level=0.05,
+            bit_packed=bit_packed,
+            output_format='edge_list',
+            markov_blanket_prefilter=prefilter,
+            marginal_screening=marginal_screening
+        )
+
+        assert np.array_equal(res[field_pc_cpdag].to_dense(),
+                              dag_to_cpdag(dag))
+        for (x, y) in res[field_separation_sets]:
+            for z in res[field_separation_sets][(x, y)]:
+                assert oracle.is_d_separated(x, y, z)
+
+    if marginal_screening:
+        assert counts[True] < counts[False]
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from PyPCAlg.pc_algorithm import run_pc_algorithm, field_pc_cpdag, \
+    field_separation_sets
+from PyPCAlg.rolling import RollingPC, run_pc_rolling, field_nb_tests, \
+    field_nb_retested_pairs
+from PyPCAlg.utilities.dataset import Dataset
+from PyPCAlg.utilities.independence_relationships import \
+    linear_indep_test, linear_cond_indep_test
+
+from PyPCAlg.examples.graph_4 import generate_data as generate_data_example_4
+
+
+@pytest.fixture(scope='module')
+def stream():
+    return Dataset(generate_data_example_4(sample_size=1200))
+
+
+def _full_run(dataset, start, window_size):
+    return run_pc_algorithm(
+        data=Dataset(dataset.values[start:start + window_size],
+                     column_names=dataset.columns),
+        indep_test_func=linear_indep_test,
+        cond_indep_test_func=linear_cond_indep_test,
+        level=0.05
+    )
+
+
+def test_rolling_refresh_matches_full_runs(stream):
+    windows = list(run_pc_rolling(stream, window_size=500, step=100,
+                                  level=0.05, refresh_every=1))
+
+    assert [start for start, _ in windows] == list(range(0, 701, 100))
+    for start, res in windows:
+        expected = _full_run(stream, start, 500)
+        assert np.array_equal(res[field_pc_cpdag], expected[field_pc_cpdag])
+        assert res[field_separation_sets] == expected[field_separation_sets]
+
+
+def test_rolling_warm_start(stream):
+    windows = list(run_pc_rolling(stream, window_size=500, step=50,
+                                  level=0.05, tolerance=0.05))
+    first = windows[0][1]
+    full_run_tests = first[field_nb_tests]
+
+    assert first[field_nb_retested_pairs] == 10
+    # The windows after the first one only retest the pairs which moved
+    assert sum(res[field_nb_tests] for _, res in windows[1:]) < \
+        full_run_tests * (len(windows) - 1)
+
+    # Nothing moves with an infinite tolerance
+    frozen = list(run_pc_rolling(stream, window_size=500, step=50,
+                                 level=0.05, tolerance=np.inf))
+    for _, res in frozen[1:]:
+        assert res[field_nb_tests] == 0
+        assert res[field_nb_retested_pairs] == 0
+        assert np.array_equal(res[field_pc_cpdag],
+                              frozen[0][1][field_pc_cpdag])
+
+
+def test_rolling_window_statistics(stream):
+    rolling = RollingPC(column_names=stream.columns, window_size=300,
+                        level=0.05)
+
+    assert rolling.update(stream.values[:200]) is None
+    for start in range(200, 1200, 137):
+        res = rolling.update(stream.values[start:start + 137])
+        end = min(start + 137, 1200)
+        assert res is not None
+        assert rolling.statistics.nb_obs == 300
+        assert np.allclose(rolling.statistics.covariance(),
+                           np.cov(stream.values[end - 300:end],
+                                  rowvar=False))
@@ -0,0 +1,164 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from PyPCAlg.pc_algorithm import run_pc_algorithm, field_pc_cpdag
+from PyPCAlg.server import DiscoveryServer, DiscoveryService
+from PyPCAlg.utilities.dataset import Dataset
+from PyPCAlg.utilities.independence_relationships import \
+    linear_indep_test, linear_cond_indep_test
+
+from PyPCAlg.examples.graph_4 import generate_data as generate_data_example_4
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    generate_data_example_4(sample_size=500).to_csv(filename, index=False)
+
+    return filename
+
+
+@pytest.fixture
+def server(data_file):
+    service = DiscoveryService()
+    service.load('example', data_file)
+    server = DiscoveryServer(('127.0.0.1', 0), service, nb_workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(server, path, content=None):
+    host, port = server.server_address[:2]
+    data = None if content is None else json.dumps(content).encode()
+    request = urllib.request.Request(f'http://{host}:{port}{path}',
+                                     data=data)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+
+@pytest.mark.parametrize('variables', [None, ['x4', 'x1', 'x2']])
+def test_service_run_pc(data_file, variables):
+    service = DiscoveryService()
+    service.load('example', data_file)
+    data = pd.read_csv(data_file)
+    if variables is not None:
+        data = data[variables]
+
+    res = service.run_pc({'dataset': 'example', 'variables': variables,
+                          'level': 0.05})
+    expected = run_pc_algorithm(
+        data=Dataset(data),
+        indep_test_func=linear_indep_test,
+        cond_indep_test_func=linear_cond_indep_test,
+        level=0.05,
+        output_format='edge_list'
+    )[field_pc_cpdag].named_edges()
+
+    assert (res['directed'], res['undirected']) == expected
+    assert res['nb_computed_tests'] > 0
+
+    # The same request again only reads the cached p-values
+    res = service.run_pc({'dataset': 'example', 'variables': variables,
+                          'level': 0.05})
+    assert res['nb_computed_tests'] == 0
+    assert (res['directed'], res['undirected']) == expected
+
+
+def test_service_background_knowledge(data_file):
+    service = DiscoveryService()
+    service.load('example', data_file)
+
+    res = service.run_pc({
+        'dataset': 'example',
+        'background_knowledge': {'forbidden_edges': [['x0', 'x1'],
+                                                     ['x1', 'x0']]}
+    })
+
+    assert all({x, y} != {'x0', 'x1'}
+               for x, y in res['directed'] + res['undirected'])
+
+
+def test_server_requests(server):
+    status, datasets = _request(server, '/datasets')
+    assert status == 200
+    assert datasets[0]['name'] == 'example'
+    assert datasets[0]['nb_obs'] == 500
+
+    status, res = _request(server, '/pc', {'dataset': 'example',
+                                           'level': 0.05})
+    assert status == 200
+    assert res['nb_tests'] > 0
+
+    status, res = _request(server, '/pc', {'dataset': 'unknown'})
+    assert status == 400
+    assert 'unknown' in res['error']
+
+    status, _ = _request(server, '/unknown')
+    assert status == 404
+
+
+@pytest.mark.parametrize('variables', [[0, 5], [-1, 2], ['x0', 'y']])
+def test_server_wrong_variables(server, variables):
+    status, res = _request(server, '/pc', {'dataset': 'example',
+                                           'variables': variables})
+
+    assert status == 400
+    assert 'error' in res
+
+
+def test_server_internal_error(server, monkeypatch):
+    def run_pc(request):
+        raise RuntimeError('failure')
+
+    monkeypatch.setattr(server.service, 'run_pc', run_pc)
+    status, res = _request(server, '/pc', {'dataset': 'example'})
+
+    assert status == 500
+    assert 'failure' in res['error']
+
+    # The server keeps answering
+    status, _ = _request(server, '/datasets')
+    assert status == 200
+
+
+def test_server_load_requests(tmp_path, data_file):
+    status, res = _request_load(DiscoveryService(), {
+        'name': 'loaded', 'path': data_file
+    })
+    assert status == 403
+    assert 'disabled' in res['error']
+
+    service = DiscoveryService(data_dir=str(tmp_path))
+    status, res = _request_load(service, {'name': 'loaded',
+                                          'path': 'data.csv',
+                                          'columns': ['x1', 'x2']})
+    assert status == 200
+    assert res['nb_var'] == 2
+
+    for path in ('../data.csv', '/etc/passwd', data_file + '/../../x.csv'):
+        status, res = _request_load(service, {'name': 'outside',
+                                              'path': path})
+        assert status == 403
+        assert 'outside' in res['error']
+
+
+def _request_load(service, content):
+    server = DiscoveryServer(('127.0.0.1', 0), service, nb_workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        return _request(server, '/datasets', content)
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,111 @@
+import copy
+
+import numpy as np
+import pytest
+
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+from PyPCAlg.utilities.pdag import find_children, find_parents, \
+    find_undirected_neighbours, find_undirected_adjacent_pairs, \
+    find_undirected_non_adjacent_pairs, iter_undirected_adjacent_pairs, \
+    iter_undirected_non_adjacent_pairs
+from PyPCAlg.utilities.pc_algorithm import find_adjacent_vertices, \
+    find_adjacent_vertices_to, iter_adjacent_vertices
+
+pdag_1 = np.asarray(
+    [
+        [0, 1, 1, 0],
+        [0, 0, 1, 0],
+        [1, 1, 0, 1],
+        [0, 0, 0, 0]
+    ]
+)
+
+
+def random_pdag(nb_var, seed):
+    rng = np.random.default_rng(seed)
+    pdag = (rng.random((nb_var, nb_var)) < 0.1).astype(float)
+    np.fill_diagonal(pdag, 0)
+
+    return pdag
+
+
+@pytest.mark.parametrize('nb_var', [1, 5, 63, 64, 65, 130])
+def test_complete(nb_var):
+    expected = np.ones((nb_var, nb_var)) - np.identity(nb_var)
+
+    actual = BitPackedGraph.complete(nb_var).to_adjacency_matrix()
+
+    assert np.array_equal(actual, expected)
+
+
+@pytest.mark.parametrize('nb_var, seed', [(4, 0), (64, 1), (150, 2)])
+def test_round_trip(nb_var, seed):
+    pdag = random_pdag(nb_var, seed)
+
+    graph = BitPackedGraph.from_adjacency_matrix(pdag)
+
+    assert graph.shape == (nb_var, nb_var)
+    assert np.array_equal(graph.to_adjacency_matrix(), pdag)
+    rows, columns = graph.nonzero(chunk_size=7)
+    assert np.array_equal(rows, np.nonzero(pdag)[0])
+    assert np.array_equal(columns, np.nonzero(pdag)[1])
+
+
+def test_get_and_set_items():
+    graph = BitPackedGraph(100)
+
+    graph[3, 70] = 1
+    graph[70, 3] = 1
+    graph[70, 3] = 0
+
+    assert graph[3, 70] == 1
+    assert graph[70, 3] == 0
+    assert graph.to_adjacency_matrix().sum() == 1
+    assert graph.has_edges([3, 70, 3], [70, 3, 3]).tolist() == \
+        [True, False, False]
+
+    other = copy.deepcopy(graph)
+    assert other == graph
+    other[0, 1] = 1
+    assert other != graph
+
+
+@pytest.mark.parametrize('pdag', [pdag_1, random_pdag(150, 3)])
+def test_pdag_helpers_agree_with_dense(pdag):
+    graph = BitPackedGraph.from_adjacency_matrix(pdag)
+
+    for node in range(pdag.shape[0]):
+        assert find_children(graph, node) == find_children(pdag, node)
+        assert find_parents(graph, node) == find_parents(pdag, node)
+        assert find_undirected_neighbours(graph, node) == \
+            find_undirected_neighbours(pdag, node)
+        assert find_adjacent_vertices_to(node, graph) == \
+            find_adjacent_vertices_to(node, pdag)
+
+    assert find_undirected_adjacent_pairs(graph) == \
+        find_undirected_adjacent_pairs(pdag)
+    assert find_undirected_non_adjacent_pairs(graph) == \
+        find_undirected_non_adjacent_pairs(pdag)
+    assert find_adjacent_vertices(graph) == find_adjacent_vertices(pdag)
+
+
+@pytest.mark.parametrize('pdag', [pdag_1, random_pdag(150, 3)])
+def test_lazy_pair_iterators(pdag):
+    graph = BitPackedGraph.from_adjacency_matrix(pdag)
+
+    for find, iterate in [
+        (find_undirected_adjacent_pairs, iter_undirected_adjacent_pairs),
+        (find_undirected_non_adjacent_pairs,
+         iter_undirected_non_adjacent_pairs),
+        (find_adjacent_vertices, iter_adjacent_vertices),
+    ]:
+        expected = sorted(find(pdag))
+        assert list(iterate(pdag)) == expected
+        assert list(iterate(graph)) == expected
+
+
+def test_common_successors():
+    graph = BitPackedGraph.from_adjacency_matrix(pdag_1)
+
+    assert list(graph.common_successors(0, 1)) == [2]
+    assert list(graph.common_successors(0, 2)) == [1]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from PyPCAlg.markov_equivalence import dag_to_cpdag
+from PyPCAlg.pc_algorithm import run_pc_algorithm, field_pc_cpdag
+from PyPCAlg.utilities.d_separation import DSeparationOracle
+from PyPCAlg.test.helpers import random_dag
+from PyPCAlg.examples import graph_1, graph_2, graph_3, graph_4
+
+
+@pytest.mark.parametrize('graph', [graph_1, graph_2, graph_3, graph_4])
+def test_d_separation_agrees_with_oracle(graph):
+    store = graph.get_oracle_store()
+    oracle = DSeparationOracle(graph.get_adjacency_matrix())
+    nb_var = store.nb_var
+
+    for x in range(nb_var):
+        for y in range(x + 1, nb_var):
+            others = [i for i in range(nb_var) if i not in (x, y)]
+            for mask in range(2 ** len(others)):
+                z = [i for k, i in enumerate(others) if (mask >> k) & 1]
+                assert oracle.is_d_separated(x, y, z) == store.holds(x, y, z)
+
+
+def test_d_separation_invalid_query():
+    oracle = DSeparationOracle(graph_2.get_adjacency_matrix())
+
+    with pytest.raises(ValueError):
+        oracle.is_d_separated(0, 2, [2])
+
+
+@pytest.mark.parametrize(
+    'nb_var, density, seed',
+    [
+        (20, 0.2, 1),
+        (40, 0.08, 2),
+        (60, 0.05, 3),
+    ]
+)
+def test_pc_algorithm_with_d_separation_oracle(nb_var, density, seed):
+    dag = random_dag(nb_var, density, seed)
+    oracle = DSeparationOracle(dag)
+
+    cpdag = run_pc_algorithm(
+        data=pd.DataFrame(np.empty((0, nb_var))),
+        indep_test_func=oracle.indep_test(),
+        cond_indep_test_func=oracle.cond_indep_test(),
+        level=0.05
+    )[field_pc_cpdag]
+
+    assert np.array_equal(cpdag, dag_to_cpdag(dag))
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from PyPCAlg.utilities.data_generation import topological_layers, \
+    random_edge_weights, generate_linear_sem_data
+
+from PyPCAlg.examples.graph_3 import get_adjacency_matrix as \
+    adjacency_matrix_example_3
+from PyPCAlg.examples.graph_4 import get_adjacency_matrix as \
+    adjacency_matrix_example_4
+
+
+@pytest.mark.parametrize(
+    'dag',
+    [adjacency_matrix_example_3(), adjacency_matrix_example_4()]
+)
+def test_topological_layers(dag):
+
+    layers = topological_layers(dag)
+
+    position = np.empty(dag.shape[0], dtype=int)
+    for k, layer in enumerate(layers):
+        position[layer] = k
+    rows, columns = np.nonzero(dag)
+    assert sorted(np.concatenate(layers).tolist()) == list(range(dag.shape[0]))
+    assert (position[rows] < position[columns]).all()
+
+
+def test_topological_layers_cycle():
+    cyclic = np.asarray([
+        [0, 1, 0],
+        [0, 0, 1],
+        [1, 0, 0]
+    ])
+
+    with pytest.raises(ValueError):
+        topological_layers(cyclic)
+
+
+def test_generate_linear_sem_data_covariance():
+    dag = adjacency_matrix_example_4()
+    rng = np.random.default_rng(0)
+    weights = random_edge_weights(dag, rng=rng)
+    noise_std = np.asarray([1.0, 0.5, 1.0, 2.0, 1.0])
+
+    data = generate_linear_sem_data(dag, weights, sample_size=200000,
+                                    noise_std=noise_std, chunk_size=30000,
+                                    rng=rng)
+
+    # X = E (I - W)^-1, so that cov(X) = (I - W)^-T D (I - W)^-1
+    inverse = np.linalg.inv(np.identity(5) - weights)
+    expected = inverse.T @ np.diag(noise_std ** 2) @ inverse
+    assert list(data.columns) == ['x0', 'x1', 'x2', 'x3', 'x4']
+    assert np.allclose(np.cov(data.to_numpy(), rowvar=False), expected,
+                       rtol=0.05, atol=0.05)
+
+
+def test_generate_linear_sem_data_does_not_depend_on_chunks(tmp_path):
+    dag = adjacency_matrix_example_3()
+    weights = random_edge_weights(dag, rng=np.random.default_rng(1))
+    filename = str(tmp_path / 'data.npy')
+
+    in_memory = generate_linear_sem_data(dag, weights, sample_size=1000,
+                                         chunk_size=1000,
+                                         rng=np.random.default_rng(2))
+    memory_mapped = generate_linear_sem_data(dag, weights, sample_size=1000,
+                                             chunk_size=64,
+                                             rng=np.random.default_rng(2),
+                                             filename=filename)
+
+    assert memory_mapped.flags['F_CONTIGUOUS']
+    assert np.allclose(np.load(filename), in_memory.to_numpy())
+
+
+def test_generate_linear_sem_data_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    dag = adjacency_matrix_example_3()
+    weights = random_edge_weights(dag, rng=np.random.default_rng(1))
+    filename = str(tmp_path / 'data.parquet')
+
+    generate_linear_sem_data(dag, weights, sample_size=1000, chunk_size=300,
+                             rng=np.random.default_rng(2), filename=filename)
+
+    assert pd.read_parquet(filename).shape == (1000, 5)
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from PyPCAlg.pc_algorithm import run_pc_algorithm, field_pc_cpdag
+from PyPCAlg.utilities.data_generation import generate_linear_sem_data
+from PyPCAlg.utilities.dataset import Dataset, as_dataset, read_dataset
+from PyPCAlg.utilities.d_separation import DSeparationOracle
+from PyPCAlg.utilities.independence_relationships import \
+    do_test_linear_independence, do_test_linear_conditional_independence
+
+from PyPCAlg.examples.graph_4 import get_adjacency_matrix as \
+    dag_example_4
+from PyPCAlg.examples.graph_4 import get_cpdag as cpdag_example_4
+
+
+def _observations(order):
+    values = np.arange(12, dtype=float).reshape(4, 3)
+    return np.asarray(values, order=order)
+
+
+@pytest.mark.parametrize('order', ['C', 'F'])
+def test_dataset_from_array(order):
+    values = _observations(order)
+
+    dataset = Dataset(values, column_names=['a', 'b', 'c'])
+
+    assert dataset.shape == (4, 3)
+    assert dataset.columns == ['a', 'b', 'c']
+    assert dataset.values.flags.f_contiguous
+    assert np.array_equal(dataset.column('b'), values[:, 1])
+    assert np.array_equal(dataset.column(2), values[:, 2])
+    assert np.shares_memory(dataset.column(1), dataset.values)
+    assert dataset.column(1).flags.c_contiguous
+    # A Fortran-ordered array of floats is not copied
+    assert np.shares_memory(dataset.values, values) == (order == 'F')
+
+
+def test_dataset_from_memmap(tmp_path):
+    filename = str(tmp_path / 'data.npy')
+    values = generate_linear_sem_data(
+        dag=dag_example_4(),
+        weights=dag_example_4(),
+        sample_size=50,
+        rng=np.random.default_rng(0),
+        filename=filename
+    )
+
+    memmap = np.load(filename, mmap_mode='r')
+    dataset = Dataset(memmap)
+
+    assert np.shares_memory(dataset.values, memmap)
+    assert dataset.columns == [f'x{j}' for j in range(values.shape[1])]
+    assert np.array_equal(dataset.values, values)
+
+
+def test_dataset_from_dataframe_and_arrow():
+    df = pd.DataFrame(_observations('C'), columns=['a', 'b', 'c'])
+
+    dataset = Dataset(df)
+
+    assert dataset.columns == ['a', 'b', 'c']
+    assert np.array_equal(dataset.values, df.to_numpy())
+    pd.testing.assert_frame_equal(dataset.to_pandas(), df)
+    assert as_dataset(df) is df
+    assert as_dataset(dataset) is dataset
+
+    pa = pytest.importorskip('pyarrow')
+    dataset_arrow = Dataset(pa.Table.from_pandas(df))
+
+    assert dataset_arrow.columns == ['a', 'b', 'c']
+    assert np.array_equal(dataset_arrow.values, df.to_numpy())
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.parquet', '.npy'])
+def test_read_dataset(tmp_path, extension):
+    if extension == '.parquet':
+        pytest.importorskip('pyarrow')
+    df = pd.DataFrame(np.arange(30, dtype=float).reshape(10, 3),
+                      columns=['x0', 'x1', 'x2'])
+    filename = str(tmp_path / f'data{extension}')
+    if extension == '.csv':
+        df.to_csv(filename, index=False)
+    elif extension == '.parquet':
+        df.to_parquet(filename)
+    else:
+        np.save(filename, df.to_numpy())
+
+    dataset = read_dataset(filename, chunk_size=3)
+    columns = ['x2', 'x0'] if extension != '.npy' else [2, 0]
+    subset = read_dataset(filename, columns=columns, chunk_size=4)
+
+    assert dataset.columns == ['x0', 'x1', 'x2']
+    assert dataset.values.flags.f_contiguous
+    assert np.array_equal(dataset.values, df.to_numpy())
+    assert sorted(subset.columns) == ['x0', 'x2']
+    assert np.array_equal(subset.values, df[subset.columns].to_numpy())
+
+
+@pytest.mark.parametrize('line_terminator,quoted_line_breaks', [
+    ('\n', True), ('\r\n', True), ('\r', False)
+])
+def test_read_dataset_csv_line_breaks(tmp_path, line_terminator,
+                                      quoted_line_breaks):
+    df = pd.DataFrame(np.arange(30, dtype=float).reshape(10, 3),
+                      columns=['x0', 'x1', 'x2'])
+    # Line breaks inside the quoted values of a column which is not read
+    df['note'] = [f'line {i}\nof note {i}' if quoted_line_breaks
+                  else f'note {i}' for i in range(10)]
+    filename = str(tmp_path / 'data.csv')
+    df.to_csv(filename, index=False, lineterminator=line_terminator)
+
+    dataset = read_dataset(filename, columns=['x0', 'x1', 'x2'],
+                           chunk_size=3)
+
+    assert dataset.values.flags.f_contiguous
+    assert np.array_equal(dataset.values,
+                          df[['x0', 'x1', 'x2']].to_numpy())
+
+
+def test_dataset_wrong_input():
+
+    with pytest.raises(ValueError):
+        Dataset(np.zeros(3))
+
+    with pytest.raises(ValueError):
+        Dataset(np.zeros((3, 2)), column_names=['a'])
+
+
+def test_linear_tests_on_dataset():
+    rng = np.random.default_rng(0)
+    values = rng.standard_normal((200, 4))
+    values[:, 1] += 0.3 * values[:, 0]
+    values[:, 2] += 0.5 * values[:, 1]
+    df = pd.DataFrame(values, columns=['a', 'b', 'c', 'd'])
+    dataset = Dataset(df)
+
+    # Same p-values as pingouin on the DataFrame
+    assert do_test_linear_independence(dataset, 0, 1, 0.05) == \
+        pytest.approx(do_test_linear_independence(df, 'a', 'b', 0.05))
+    assert do_test_linear_conditional_independence(
+        dataset, 'a', 'c', ['b', 'd'], 0.05
+    ) == pytest.approx(do_test_linear_conditional_independence(
+        df, 'a', 'c', ['b', 'd'], 0.05
+    ))
+    assert do_test_linear_conditional_independence(
+        values, 0, 3, [2], 0.05
+    ) == pytest.approx(do_test_linear_conditional_independence(
+        df, 'a', 'd', ['c'], 0.05
+    ))
+
+
+@pytest.mark.parametrize('order', ['C', 'F'])
+def test_pc_algorithm_on_array(order):
+    oracle = DSeparationOracle(dag_example_4())
+    data = np.zeros((1, 5), order=order)
+
+    cpdag = run_pc_algorithm(
+        data=data,
+        indep_test_func=oracle.indep_test(),
+        cond_indep_test_func=oracle.cond_indep_test(),
+        level=0.05,
+        output_format='edge_list'
+    )[field_pc_cpdag]
+
+    assert np.array_equal(cpdag.to_dense(), cpdag_example_4())
+    assert cpdag.column_names == [f'x{j}' for j in range(5)]
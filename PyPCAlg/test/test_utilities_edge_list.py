@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+from PyPCAlg.utilities.edge_list import EdgeListCPDAG
+
+from PyPCAlg.examples.graph_3 import get_cpdag as cpdag_example_3
+from PyPCAlg.examples.graph_4 import get_cpdag as cpdag_example_4
+from PyPCAlg.test.test_utilities_bit_packed_graph import random_pdag
+
+
+@pytest.mark.parametrize('cpdag', [cpdag_example_3(), cpdag_example_4(),
+                                   random_pdag(150, 0)])
+def test_edge_list_round_trip(cpdag):
+
+    edge_list = EdgeListCPDAG.from_pdag(cpdag)
+    edge_list_bit_packed = EdgeListCPDAG.from_pdag(
+        BitPackedGraph.from_adjacency_matrix(cpdag)
+    )
+
+    assert edge_list == edge_list_bit_packed
+    assert np.array_equal(edge_list.to_dense(), cpdag)
+    assert np.array_equal(edge_list.to_csr().toarray(), cpdag)
+
+
+def test_edge_list_edges():
+    cpdag = np.asarray([
+        [0, 1, 0],
+        [1, 0, 1],
+        [0, 0, 0]
+    ])
+
+    edge_list = EdgeListCPDAG.from_pdag(cpdag, column_names=['a', 'b', 'c'])
+
+    assert edge_list.directed.tolist() == [[1, 2]]
+    assert edge_list.undirected.tolist() == [[0, 1]]
+    assert edge_list.named_edges() == ([('b', 'c')], [('a', 'b')])
+
+
+def test_edge_list_wrong_number_of_names():
+
+    with pytest.raises(ValueError):
+        EdgeListCPDAG(nb_var=3, directed=[], undirected=[],
+                      column_names=['a', 'b'])
@@ -0,0 +1,118 @@
+import pandas as pd
+import pytest
+
+from PyPCAlg.utilities.independence_relationships import \
+    do_test_linear_independence, do_test_linear_conditional_independence, \
+    iter_independence_relationships, produce_independence_relationships, \
+    write_independence_relationships, render_independence_relationships, \
+    save_independence_relationships, load_independence_relationships
+
+from PyPCAlg.examples.graph_4 import generate_data as generate_data_example_4
+
+
+@pytest.mark.parametrize(
+    'max_conditioning_size, expected_nb_relationships',
+    [
+        (None, 10 * 8),
+        (0, 10),
+        (1, 10 * 4),
+    ]
+)
+def test_iter_independence_relationships(max_conditioning_size,
+                                         expected_nb_relationships):
+    data = generate_data_example_4(200)
+
+    relationships = list(iter_independence_relationships(
+        data=data,
+        independence_test=do_test_linear_independence,
+        conditional_independence_test=do_test_linear_conditional_independence,
+        max_conditioning_size=max_conditioning_size
+    ))
+
+    assert len(relationships) == expected_nb_relationships
+    assert all(len(z) <= (max_conditioning_size or 3)
+               for (_, _, z, _) in relationships)
+
+
+def test_parallel_independence_relationships():
+    data = generate_data_example_4(200)
+
+    expected = produce_independence_relationships(
+        data=data,
+        independence_test=do_test_linear_independence,
+        conditional_independence_test=do_test_linear_conditional_independence
+    )
+
+    actual = produce_independence_relationships(
+        data=data,
+        independence_test=do_test_linear_independence,
+        conditional_independence_test=do_test_linear_conditional_independence,
+        nb_workers=2
+    )
+
+    assert list(actual.keys()) == list(expected.keys())
+    assert actual == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('extension', ['csv', 'parquet'])
+def test_write_independence_relationships(tmp_path, extension):
+    if extension == 'parquet':
+        pytest.importorskip('pyarrow')
+    data = generate_data_example_4(200)
+    filename = str(tmp_path / f'relationships.{extension}')
+
+    nb_written = write_independence_relationships(
+        iter_independence_relationships(
+            data=data,
+            independence_test=do_test_linear_independence,
+            conditional_independence_test=(
+                do_test_linear_conditional_independence
+            )
+        ),
+        filename=filename,
+        level=0.05,
+        chunk_size=7
+    )
+
+    if extension == 'csv':
+        df = pd.read_csv(filename, sep=';')
+    else:
+        df = pd.read_parquet(filename)
+
+    assert nb_written == 80
+    assert df.shape == (80, 5)
+    assert list(df.iloc[0, :2]) == ['x0', 'x1']
+
+
+def test_render_independence_relationships():
+    relationships = {
+        'x0 _||_ x2 | [\'x1\']': 0.6,
+        'x0 _||_ x2': 0.01,
+        'x0 _||_ x1': 0.0,
+    }
+
+    df = render_independence_relationships(relationships, level=0.05)
+
+    assert list(df.columns) == ['X', 'Y', 'Conditioning Set', 'p-value',
+                                '(Conditional) Independence Holds']
+    assert list(df['Y']) == ['x1', 'x2', 'x2']
+    assert list(df['Conditioning Set']) == [(), (), ('x1',)]
+    assert list(df['(Conditional) Independence Holds']) == [False, False,
+                                                            True]
+
+
+@pytest.mark.parametrize('extension', ['csv', 'npz', 'parquet'])
+def test_save_and_load_independence_relationships(tmp_path, extension):
+    if extension == 'parquet':
+        pytest.importorskip('pyarrow')
+    df = render_independence_relationships(
+        [('x0', 'x1', [], 0.0), ('x0', 'x1', ['x2', 'x3'], 0.5),
+         ('x0', 'x2', ['x1'], 0.02)],
+        level=0.05
+    )
+    filename = str(tmp_path / f'relationships.{extension}')
+
+    save_independence_relationships(df, filename)
+    actual = load_independence_relationships(filename)
+
+    pd.testing.assert_frame_equal(actual, df, check_dtype=False)
@@ -0,0 +1,130 @@
+import logging
+import threading
+
+from PyPCAlg.utilities.logs import create_logger, flush_log_file, \
+    shutdown_loggers
+from PyPCAlg.pc_algorithm import run_pc_algorithm
+
+from PyPCAlg.examples.graph_1 import generate_data as generate_data_example_1
+from PyPCAlg.examples.graph_1 import oracle_indep_test as \
+    oracle_indep_test_example_1
+from PyPCAlg.examples.graph_1 import oracle_cond_indep_test as \
+    oracle_cond_indep_test_example_1
+
+
+def test_create_logger_does_not_duplicate_handlers(tmp_path):
+    log_file = str(tmp_path / 'test.log')
+
+    logger = create_logger(logger_name='test_logs', log_file=log_file)
+    logger = create_logger(logger_name='test_logs', log_file=log_file)
+    logger.info('Logged once')
+    shutdown_loggers()
+
+    with open(log_file) as f:
+        lines = f.read().splitlines()
+
+    assert len(lines) == 1
+    assert lines[0].endswith('test_logs - Logged once')
+
+
+def test_create_logger_switches_file(tmp_path):
+    log_file_1 = str(tmp_path / 'test_1.log')
+    log_file_2 = str(tmp_path / 'test_2.log')
+
+    logger = create_logger(logger_name='test_logs', log_file=log_file_1)
+    logger.info('First')
+    logger = create_logger(logger_name='test_logs', log_file=log_file_2)
+    logger.info('Second')
+    shutdown_loggers()
+
+    with open(log_file_1) as f:
+        content_1 = f.read()
+    with open(log_file_2) as f:
+        content_2 = f.read()
+
+    assert 'First' in content_1 and 'Second' not in content_1
+    assert 'Second' in content_2 and 'First' not in content_2
+
+
+def test_logging_is_level_gated(tmp_path):
+    log_file = str(tmp_path / 'test.log')
+
+    logger = create_logger(logger_name='test_logs', log_file=log_file,
+                           level=logging.INFO)
+    logger.debug('Not logged')
+    logger.info('Logged')
+    shutdown_loggers()
+
+    with open(log_file) as f:
+        content = f.read()
+
+    assert 'Not logged' not in content
+    assert 'Logged' in content
+
+
+def test_repeated_runs_do_not_duplicate_log_lines(tmp_path):
+    log_file = str(tmp_path / 'pc.log')
+
+    counts = []
+    for _ in range(2):
+        run_pc_algorithm(
+            data=generate_data_example_1(10),
+            indep_test_func=oracle_indep_test_example_1(),
+            cond_indep_test_func=oracle_cond_indep_test_example_1(),
+            level=0.05,
+            log_file=log_file
+        )
+        shutdown_loggers()
+
+        with open(log_file) as f:
+            counts.append(f.read().count('INDEPENDENCE FOUND'))
+
+    assert counts[0] > 0
+    assert counts[1] == 2 * counts[0]
+
+
+def test_log_is_complete_when_run_returns(tmp_path):
+    log_file = str(tmp_path / 'pc.log')
+
+    try:
+        run_pc_algorithm(
+            data=generate_data_example_1(10),
+            indep_test_func=oracle_indep_test_example_1(),
+            cond_indep_test_func=oracle_cond_indep_test_example_1(),
+            level=0.05,
+            log_file=log_file
+        )
+
+        # Read before the background writer is stopped
+        with open(log_file) as f:
+            content = f.read()
+    finally:
+        shutdown_loggers()
+
+    assert 'INDEPENDENCE FOUND' in content
+    assert 'Removing' in content
+
+
+def test_concurrent_flushes(tmp_path):
+    log_file = str(tmp_path / 'test.log')
+    logger = create_logger(logger_name='test_logs', log_file=log_file)
+
+    def log(k):
+        for i in range(50):
+            logger.info(f'Thread {k} line {i}')
+            flush_log_file(log_file)
+
+    threads = [threading.Thread(target=log, args=(k,)) for k in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Read before the background writer is stopped
+        with open(log_file) as f:
+            lines = f.read().splitlines()
+    finally:
+        shutdown_loggers()
+
+    assert len(lines) == 200
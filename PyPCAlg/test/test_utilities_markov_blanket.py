@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from PyPCAlg.utilities.d_separation import DSeparationOracle
+from PyPCAlg.utilities.markov_blanket import grow_shrink, \
+    estimate_markov_blankets
+
+from PyPCAlg.test.helpers import random_dag
+
+
+def true_markov_blanket(dag, x):
+    parents = set(np.flatnonzero(dag[:, x]).tolist())
+    children = set(np.flatnonzero(dag[x, :]).tolist())
+    spouses = {v for c in children for v in np.flatnonzero(dag[:, c]).tolist()}
+
+    return sorted((parents | children | spouses) - {x})
+
+
+@pytest.mark.parametrize('nb_var,density,seed', [
+    (6, 0.4, 0),
+    (10, 0.3, 1),
+    (15, 0.2, 2),
+])
+def test_grow_shrink(nb_var, density, seed):
+    dag = random_dag(nb_var, density, seed)
+    oracle = DSeparationOracle(dag)
+    data = np.zeros((1, nb_var))
+
+    blankets, separating_sets = estimate_markov_blankets(
+        data=data, indep_test_func=oracle.indep_test(),
+        cond_indep_test_func=oracle.cond_indep_test(), level=0.05
+    )
+
+    for x in range(nb_var):
+        assert blankets[x] == true_markov_blanket(dag, x)
+        assert sorted(separating_sets[x]) == \
+            sorted(set(range(nb_var)) - set(blankets[x]) - {x})
+        for y, z in separating_sets[x].items():
+            assert oracle.is_d_separated(x, y, z)
+
+
+def test_grow_shrink_candidates():
+    # 0 -> 1 -> 2
+    dag = np.eye(3, k=1)
+    oracle = DSeparationOracle(dag)
+
+    blanket, separating_sets = grow_shrink(
+        data=np.zeros((1, 3)), target=0,
+        indep_test_func=oracle.indep_test(),
+        cond_indep_test_func=oracle.cond_indep_test(), level=0.05,
+        candidates=[2]
+    )
+
+    assert blanket == [2]
+    assert separating_sets == dict()
+
+
+def test_estimate_markov_blankets_marginal_screening():
+    # 0 -> 2 <- 1 : the spouses 0 and 1 are marginally independent
+    dag = np.zeros((3, 3))
+    dag[0, 2] = dag[1, 2] = 1
+    oracle = DSeparationOracle(dag)
+
+    blankets, separating_sets = estimate_markov_blankets(
+        data=np.zeros((1, 3)), indep_test_func=oracle.indep_test(),
+        cond_indep_test_func=oracle.cond_indep_test(), level=0.05,
+        marginal_screening=True
+    )
+
+    assert blankets == [[2], [2], [0, 1]]
+    assert separating_sets[0] == {1: ()}
+    assert separating_sets[1] == {0: ()}
@@ -1,9 +1,13 @@
+from collections import defaultdict
+
 import pytest
 
 import numpy as np
 
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
 from PyPCAlg.utilities.pc_algorithm import find_adjacent_vertices, \
-    find_adjacent_vertices_to, find_unshielded_triples
+    find_adjacent_vertices_to, find_unshielded_triples, \
+    find_unshielded_colliders
 
 # Graph with no edges
 adjacency_matrix_1 = np.asarray(
@@ -151,3 +155,66 @@ def test_find_unshielded_triples(adjacency_matrix, expected):
     actual = find_unshielded_triples(adjacency_matrix=adjacency_matrix)
 
     assert expected == actual
+
+
+def brute_force_unshielded_triples(adjacency_matrix):
+    n = adjacency_matrix.shape[0]
+    triples = set()
+    for a in range(n):
+        for c in range(a + 1, n):
+            if adjacency_matrix[a, c] != 0:
+                continue
+            for b in range(n):
+                if adjacency_matrix[a, b] != 0 and adjacency_matrix[c, b] != 0:
+                    triples.add((a, b, c))
+
+    return triples
+
+
+@pytest.mark.parametrize('nb_var, seed', [(10, 0), (40, 1), (70, 2)])
+def test_find_unshielded_triples_random_graphs(nb_var, seed):
+    rng = np.random.default_rng(seed)
+    adjacency_matrix = np.triu(rng.random((nb_var, nb_var)) < 0.2, k=1)
+    adjacency_matrix = (adjacency_matrix | adjacency_matrix.T).astype(float)
+
+    expected = brute_force_unshielded_triples(adjacency_matrix)
+
+    actual_dense = find_unshielded_triples(adjacency_matrix)
+    actual_bit_packed = find_unshielded_triples(
+        BitPackedGraph.from_adjacency_matrix(adjacency_matrix)
+    )
+
+    assert actual_dense == expected
+    assert actual_bit_packed == expected
+
+
+@pytest.mark.parametrize(
+    'unshielded_triples, separation_sets, expected',
+    [
+        (
+            np.zeros((0, 3), dtype=int),
+            dict(),
+            []
+        ),
+        (
+            np.asarray([[0, 1, 2], [0, 3, 2], [2, 1, 4]]),
+            {(0, 2): {(1,), (4, 5)}, (2, 0): {(1,), (4, 5)}},
+            [False, True, True]
+        ),
+        (
+            np.asarray([[0, 1, 2], [0, 3, 2]]),
+            {(0, 2): {tuple()}, (2, 0): {tuple()}},
+            [True, True]
+        ),
+    ]
+)
+def test_find_unshielded_colliders(unshielded_triples, separation_sets,
+                                   expected):
+    separation_sets = defaultdict(set, separation_sets)
+
+    actual = find_unshielded_colliders(
+        unshielded_triples=unshielded_triples,
+        separation_sets=separation_sets
+    )
+
+    assert list(actual) == expected
@@ -0,0 +1,66 @@
+import pickle
+import threading
+
+from PyPCAlg.utilities.pvalue_cache import PValueCache
+
+def test_pvalue_cache_round_trip(tmp_path):
+    cache = PValueCache()
+    pval_func = lambda data, x, y, z: 0.5 + 0.01 * len(z)
+
+    assert cache.get_or_compute(pval_func, None, 2, 0, (3, 1)) == 0.52
+    assert cache.get_or_compute(pval_func, None, 0, 2, (1, 3)) == 0.52
+    assert cache.get_or_compute(pval_func, None, 0, 1) == 0.5
+    assert (cache.nb_computed, cache.nb_hits) == (2, 1)
+
+    cache.save(str(tmp_path / 'cache.npz'))
+    loaded = PValueCache.load(str(tmp_path / 'cache.npz'))
+
+    assert loaded.pvalues == cache.pvalues
+    assert (0, 2, (3, 1)) in loaded
+
+
+def test_pvalue_cache_shared_by_threads():
+    cache = PValueCache()
+    pval_func = lambda data, x, y, z: 0.01 * (x + y + sum(z))
+    tests = [(x, y, (z,)) for x in range(8) for y in range(x + 1, 8)
+             for z in range(8) if z not in (x, y)]
+
+    def worker():
+        for x, y, z in tests:
+            cache.get_or_compute(pval_func, None, x, y, z)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache) == len(tests)
+    assert cache.nb_computed == len(tests)
+    assert cache.nb_computed + cache.nb_hits == 8 * len(tests)
+
+
+def test_pvalue_cache_pickle():
+    cache = PValueCache({(0, 1, ()): 0.5})
+    loaded = pickle.loads(pickle.dumps(cache))
+
+    assert loaded.pvalues == cache.pvalues
+    assert loaded.get_or_compute(None, None, 1, 0) == 0.5
+
+
+def test_pvalue_cache_missing_and_add():
+    cache = PValueCache({(0, 1, ()): 0.5})
+    tests = [(1, 0, ()), (0, 2, (1,)), (2, 0, (1,)), (1, 2, (3, 0)),
+             (1, 2, (0, 3))]
+
+    missing = list(cache.missing(tests))
+    assert missing == [(0, 2, (1,)), (1, 2, (0, 3))]
+
+    for (x, y, z), pval in zip(missing, [0.1, 0.2]):
+        cache.add(x, y, z, pval)
+    cache.add(0, 1, (), 0.9)
+
+    assert list(cache.missing(tests)) == []
+    assert cache.get(1, 0) == 0.5
+    assert cache.get(2, 1, (3, 0)) == 0.2
+    assert cache.nb_computed == 2
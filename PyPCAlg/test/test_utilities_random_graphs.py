@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from PyPCAlg.utilities.data_generation import topological_layers
+from PyPCAlg.utilities.random_graphs import erdos_renyi_dag, \
+    scale_free_dag, structural_hamming_distance
+
+
+@pytest.mark.parametrize('generator', [erdos_renyi_dag, scale_free_dag])
+@pytest.mark.parametrize('nb_var, expected_degree', [(50, 2), (200, 4)])
+def test_random_dag(generator, nb_var, expected_degree):
+
+    dag = generator(nb_var, expected_degree, rng=np.random.default_rng(0))
+
+    nb_edges = (dag != 0).sum()
+    assert dag.shape == (nb_var, nb_var)
+    assert not np.diagonal(dag).any()
+    assert len(topological_layers(dag)) > 1  # raises if there is a cycle
+    assert 0.5 < 2 * nb_edges / (nb_var * expected_degree) < 1.5
+
+
+def test_scale_free_dag_has_hubs():
+    rng = np.random.default_rng(1)
+
+    erdos_renyi = erdos_renyi_dag(500, 4, rng=rng)
+    scale_free = scale_free_dag(500, 4, rng=rng)
+
+    def max_degree(dag):
+        return ((dag != 0) | (dag.T != 0)).sum(axis=0).max()
+
+    assert max_degree(scale_free) > 2 * max_degree(erdos_renyi)
+
+
+def test_structural_hamming_distance():
+    true = np.asarray([
+        [0, 1, 0, 0],
+        [0, 0, 1, 0],
+        [0, 1, 0, 1],
+        [0, 0, 0, 0]
+    ])
+    estimated = np.asarray([
+        [0, 1, 0, 1],  # extra edge 0 -> 3
+        [1, 0, 1, 0],  # 0 -> 1 undirected instead of directed
+        [0, 0, 0, 1],  # 1 -> 2 directed instead of undirected
+        [0, 0, 0, 0]
+    ])
+
+    assert structural_hamming_distance(true, true) == 0
+    assert structural_hamming_distance(estimated, true) == 3
+    assert structural_hamming_distance(true, estimated) == 3
@@ -0,0 +1,62 @@
+import pytest
+
+from PyPCAlg.utilities.separation_sets import SeparationSets
+
+
+def test_separation_sets_read_api():
+    separation_sets = SeparationSets(nb_var=4)
+    separation_sets.add(0, 2, tuple())
+    separation_sets.add(3, 1, [2, 0])
+    separation_sets.add(1, 3, (0, 2))
+    separation_sets.add(1, 3, [2])
+
+    assert separation_sets[(0, 2)] == {tuple()}
+    assert separation_sets[(2, 0)] == {tuple()}
+    assert separation_sets[(1, 3)] == {(0, 2), (2,)}
+    assert separation_sets[(3, 1)] == {(0, 2), (2,)}
+    assert separation_sets[(0, 1)] == set()
+
+    assert (2, 0) in separation_sets
+    assert (0, 1) not in separation_sets
+    assert len(separation_sets) == 4
+    assert set(separation_sets) == {(0, 2), (2, 0), (1, 3), (3, 1)}
+
+
+@pytest.mark.parametrize('pair', [(0, 0), (0, 4), (-1, 2)])
+def test_separation_sets_invalid_pair(pair):
+    separation_sets = SeparationSets(nb_var=4)
+
+    with pytest.raises(KeyError):
+        separation_sets[pair]
+
+
+def test_separation_sets_equal_to_dense_dict():
+    separation_sets = SeparationSets(nb_var=3)
+    separation_sets.add(0, 2, [1])
+
+    expected = dict()
+    for i in range(3):
+        for j in range(i + 1, 3):
+            expected[(i, j)] = set()
+            expected[(j, i)] = set()
+    expected[(0, 2)].add((1,))
+    expected[(2, 0)].add((1,))
+
+    assert separation_sets == expected
+    assert expected == separation_sets
+
+    expected[(0, 1)].add(tuple())
+
+    assert separation_sets != expected
+
+
+def test_separation_sets_to_dict():
+    separation_sets = SeparationSets(nb_var=3)
+    separation_sets.add(2, 0, [1])
+
+    actual = separation_sets.to_dict()
+
+    assert len(actual) == 6
+    assert actual[(0, 2)] == {(1,)}
+    assert actual[(2, 0)] == {(1,)}
+    assert actual[(0, 1)] == set()
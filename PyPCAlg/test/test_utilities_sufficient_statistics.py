@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from PyPCAlg.utilities.dataset import Dataset
+from PyPCAlg.utilities.independence_relationships import \
+    do_test_linear_independence, do_test_linear_conditional_independence
+from PyPCAlg.utilities.sufficient_statistics import \
+    GaussianSufficientStatistics
+
+from PyPCAlg.examples.graph_4 import generate_data as generate_data_example_4
+
+
+@pytest.fixture
+def dataset():
+    return Dataset(generate_data_example_4(sample_size=300) + 100)
+
+
+@pytest.mark.parametrize('x,y,z', [
+    (0, 1, ()),
+    (0, 4, (2,)),
+    (1, 3, (0, 2)),
+    (4, 2, (0, 1, 3)),
+])
+def test_sufficient_statistics_pvalue(dataset, x, y, z):
+    statistics = GaussianSufficientStatistics.from_data(dataset,
+                                                        chunk_size=70)
+
+    if len(z) == 0:
+        expected = do_test_linear_independence(dataset, x, y, 0.05)
+    else:
+        expected = do_test_linear_conditional_independence(dataset, x, y,
+                                                           list(z), 0.05)
+
+    assert statistics.pvalue(x, y, z) == pytest.approx(expected)
+    assert statistics.pvalue(dataset.columns[x], dataset.columns[y],
+                             [dataset.columns[v] for v in z]) == \
+        pytest.approx(expected)
+
+
+@pytest.mark.parametrize('x,y,z', [
+    (0, 5, ()),
+    (5, 1, (0,)),
+    (0, 1, (5,)),
+    (1, 3, (0, 5, 2)),
+])
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_sufficient_statistics_constant_variable(dataset, x, y, z):
+    # Variable 5 is constant
+    values = np.column_stack((dataset.values,
+                              np.full(dataset.shape[0], 3.0)))
+    constant = Dataset(values)
+    statistics = GaussianSufficientStatistics.from_data(constant)
+
+    if len(z) == 0:
+        expected = do_test_linear_independence(constant, x, y, 0.05)
+    else:
+        expected = do_test_linear_conditional_independence(constant, x, y,
+                                                           list(z), 0.05)
+
+    assert statistics.pvalue(x, y, z) == pytest.approx(expected,
+                                                       nan_ok=True)
+    assert np.isnan(expected) == (5 in (x, y))
+    assert np.isnan(statistics.correlation()[5]).all()
+
+    indep_test, cond_indep_test = statistics.tests()
+    if len(z) == 0:
+        assert indep_test(None, x, y, 0.05) == (expected >= 0.05)
+    else:
+        assert cond_indep_test(None, x, y, list(z), 0.05) == \
+            (expected >= 0.05)
+
+
+def test_sufficient_statistics_updates(dataset):
+    values = dataset.values
+    statistics = GaussianSufficientStatistics.from_data(values[:200])
+    other = GaussianSufficientStatistics.from_data(values[200:])
+    expected = np.cov(values, rowvar=False)
+
+    statistics.add_rows(values[200:])
+    assert np.allclose(statistics.covariance(), expected)
+
+    statistics.remove_rows(values[:100])
+    assert np.allclose(statistics.covariance(),
+                       np.cov(values[100:], rowvar=False))
+    assert statistics.nb_obs == 200
+
+    merged = GaussianSufficientStatistics.from_data(values[:200])
+    version = merged.version
+    merged.merge(other)
+    assert merged.version > version
+    assert np.allclose(merged.covariance(), expected)
+    assert np.allclose(merged.mean(), values.mean(axis=0))
+
+
+def test_sufficient_statistics_wrong_rows(dataset):
+    statistics = GaussianSufficientStatistics.from_data(dataset)
+
+    with pytest.raises(ValueError):
+        statistics.add_rows(np.zeros((3, 2)))
+
+    with pytest.raises(ValueError):
+        statistics.remove_rows(np.zeros((400, 5)))
@@ -0,0 +1,156 @@
+import struct
+
+import numpy as np
+import pytest
+
+from PyPCAlg.background_knowledge import BackgroundKnowledge
+from PyPCAlg.pc_algorithm import run_pc_algorithm, \
+    run_pc_algorithm_from_trace, field_pc_cpdag, field_separation_sets
+from PyPCAlg.utilities.trace import DecisionTraceWriter, read_decision_trace
+
+from PyPCAlg.examples.graph_1 import generate_data as generate_data_example_1
+from PyPCAlg.examples.graph_1 import oracle_indep_test as \
+    oracle_indep_test_example_1
+from PyPCAlg.examples.graph_1 import oracle_cond_indep_test as \
+    oracle_cond_indep_test_example_1
+
+from PyPCAlg.examples.graph_3 import generate_data as generate_data_example_3
+from PyPCAlg.examples.graph_3 import oracle_indep_test as \
+    oracle_indep_test_example_3
+from PyPCAlg.examples.graph_3 import oracle_cond_indep_test as \
+    oracle_cond_indep_test_example_3
+
+from PyPCAlg.examples.graph_4 import generate_data as generate_data_example_4
+from PyPCAlg.examples.graph_4 import oracle_indep_test as \
+    oracle_indep_test_example_4
+from PyPCAlg.examples.graph_4 import oracle_cond_indep_test as \
+    oracle_cond_indep_test_example_4
+
+
+def test_decision_trace_round_trip(tmp_path):
+    trace_file = str(tmp_path / 'trace.bin')
+
+    with DecisionTraceWriter(trace_file, nb_var=4, level=0.01) as writer:
+        writer.record(x=0, y=1, z=[], value=0.5)
+        writer.record(x=2, y=3, z=[1, 0], value=0.0)
+        writer.record(x=1, y=2, z=[3], value=True)
+
+    trace = read_decision_trace(trace_file)
+
+    assert trace.nb_var == 4
+    assert trace.level == 0.01
+    assert trace.records == [
+        (0, 1, (), 0.5, True),
+        (2, 3, (1, 0), 0.0, False),
+        (1, 2, (3,), 1.0, True),
+    ]
+    assert trace.decision(x=2, y=3, z=[0, 1]) is False
+    with pytest.raises(KeyError):
+        trace.decision(x=3, y=2, z=[0, 1])
+
+
+@pytest.mark.parametrize(
+    'data, indep_test_func, cond_indep_test_func',
+    [
+        (
+                generate_data_example_1(10),
+                oracle_indep_test_example_1(),
+                oracle_cond_indep_test_example_1(),
+        ),
+        (
+                generate_data_example_3(10),
+                oracle_indep_test_example_3(),
+                oracle_cond_indep_test_example_3(),
+        ),
+        (
+                generate_data_example_4(10),
+                oracle_indep_test_example_4(),
+                oracle_cond_indep_test_example_4(),
+        ),
+    ]
+)
+def test_run_pc_algorithm_from_trace(tmp_path, data, indep_test_func,
+                                     cond_indep_test_func):
+    trace_file = str(tmp_path / 'trace.bin')
+
+    expected = run_pc_algorithm(
+        data=data,
+        indep_test_func=indep_test_func,
+        cond_indep_test_func=cond_indep_test_func,
+        level=0.05,
+        trace_file=trace_file
+    )
+
+    actual = run_pc_algorithm_from_trace(trace_file=trace_file)
+
+    assert np.array_equal(actual[field_pc_cpdag], expected[field_pc_cpdag])
+    assert actual[field_separation_sets] == expected[field_separation_sets]
+
+
+def test_run_pc_algorithm_from_trace_with_options(tmp_path):
+    trace_file = str(tmp_path / 'trace.bin')
+    background_knowledge = BackgroundKnowledge(
+        nb_var=5, tiers=[[0, 1], [2, 3, 4]], forbidden_conditioning=[0]
+    )
+
+    expected = run_pc_algorithm(
+        data=generate_data_example_4(10),
+        indep_test_func=oracle_indep_test_example_4(),
+        cond_indep_test_func=oracle_cond_indep_test_example_4(),
+        level=0.05,
+        trace_file=trace_file,
+        bit_packed=True,
+        background_knowledge=background_knowledge,
+        markov_blanket_prefilter=True,
+        marginal_screening=False
+    )
+
+    trace = read_decision_trace(trace_file)
+    assert trace.options['bit_packed'] is True
+    assert trace.options['markov_blanket_prefilter'] is True
+    assert trace.options['marginal_screening'] is False
+    assert BackgroundKnowledge.from_dict(
+        trace.options['background_knowledge']
+    ).to_dict() == background_knowledge.to_dict()
+
+    actual = run_pc_algorithm_from_trace(trace_file=trace_file)
+    assert actual[field_pc_cpdag] == expected[field_pc_cpdag]
+    assert actual[field_separation_sets] == expected[field_separation_sets]
+
+    # Options which do not change the tests can be overridden
+    actual = run_pc_algorithm_from_trace(trace_file=trace_file,
+                                         bit_packed=False,
+                                         matrix_form_meeks_rules=True)
+    assert np.array_equal(actual[field_pc_cpdag],
+                          expected[field_pc_cpdag].to_adjacency_matrix())
+
+
+def test_run_pc_algorithm_from_trace_option_mismatch(tmp_path):
+    trace_file = str(tmp_path / 'trace.bin')
+
+    run_pc_algorithm(
+        data=generate_data_example_4(10),
+        indep_test_func=oracle_indep_test_example_4(),
+        cond_indep_test_func=oracle_cond_indep_test_example_4(),
+        level=0.05,
+        trace_file=trace_file,
+        background_knowledge=BackgroundKnowledge(nb_var=5,
+                                                 forbidden_conditioning=[0])
+    )
+
+    with pytest.raises(ValueError, match='background_knowledge'):
+        run_pc_algorithm_from_trace(
+            trace_file=trace_file,
+            background_knowledge=BackgroundKnowledge(nb_var=5)
+        )
+
+
+def test_read_decision_trace_wrong_magic(tmp_path):
+    trace_file = str(tmp_path / 'trace.bin')
+    with open(trace_file, 'wb') as f:
+        f.write(b'PCALGTR1')
+        f.write(struct.pack('<Id', 3, 0.05))
+        f.write(struct.pack('<IIHd?', 0, 1, 0, 1.0, True))
+
+    with pytest.raises(ValueError, match='not a decision trace file'):
+        read_decision_trace(trace_file)
@@ -0,0 +1,252 @@
+import numpy as np
+
+from numpy import typing as npt
+
+_word_dtype = np.dtype('<u8')
+_one = np.uint64(1)
+
+
+class BitPackedGraph:
+    """
+    A directed graph stored as a bit-packed adjacency matrix.
+
+    Entry (i, j) of the adjacency matrix (1 if there is an edge i -> j in the
+    graph, 0 otherwise) is stored as bit j % 64 of word j // 64 of row i, the
+    rows being arrays of unsigned 64-bit integers. An undirected edge i - j
+    is stored as the two directed edges i -> j and j -> i, as in the dense
+    adjacency matrices used elsewhere in the package. A graph on p nodes thus
+    takes p * ceil(p / 64) * 8 bytes instead of p * p * 8 bytes for a dense
+    matrix of floats.
+
+    The graph supports reading and writing single entries as a dense
+    adjacency matrix would (graph[i, j] and graph[i, j] = 0), as well as
+    vectorized queries for the neighbours, parents and children of a node.
+
+    Parameters
+    ----------
+    nb_var : int
+        The number of nodes in the graph.
+    """
+
+    def __init__(self, nb_var: int):
+        self.nb_var = nb_var
+        self.nb_words = (nb_var + 63) // 64
+        self.words = np.zeros((nb_var, self.nb_words), dtype=_word_dtype)
+
+    @classmethod
+    def complete(cls, nb_var: int) -> 'BitPackedGraph':
+        """
+        Creates the complete graph (without self-loops) on nb_var nodes.
+
+        Parameters
+        ----------
+        nb_var : int
+            The number of nodes in the graph.
+
+        Returns
+        -------
+        BitPackedGraph
+            The complete graph.
+        """
+        graph = cls(nb_var)
+        graph.words[:, :] = np.iinfo(_word_dtype).max
+        remainder = nb_var % 64
+        if remainder != 0:
+            graph.words[:, -1] = (_one << np.uint64(remainder)) - _one
+        nodes = np.arange(nb_var)
+        graph.words[nodes, nodes >> 6] &= \
+            ~(_one << (nodes & 63).astype(_word_dtype))
+
+        return graph
+
+    @classmethod
+    def from_adjacency_matrix(cls,
+                              adjacency_matrix: npt.ArrayLike
+                              ) -> 'BitPackedGraph':
+        """
+        Creates a bit-packed graph from a dense adjacency matrix.
+
+        Parameters
+        ----------
+        adjacency_matrix : array_like
+            The dense adjacency matrix (any non-zero entry is an edge).
+
+        Returns
+        -------
+        BitPackedGraph
+            The bit-packed graph.
+        """
+        adjacency_matrix = np.asarray(adjacency_matrix)
+        nb_var = adjacency_matrix.shape[0]
+        graph = cls(nb_var)
+        packed = np.packbits(adjacency_matrix != 0, axis=1, bitorder='little')
+        graph.words.view(np.uint8)[:, :packed.shape[1]] = packed
+
+        return graph
+
+    def to_adjacency_matrix(self, dtype: npt.DTypeLike = float) -> np.ndarray:
+        """
+        Returns the dense adjacency matrix of the graph.
+
+        Parameters
+        ----------
+        dtype : data-type, optional
+            The type of the entries of the matrix (defaults to float).
+
+        Returns
+        -------
+        array_like
+            The dense adjacency matrix.
+        """
+        return self._unpack(self.words).astype(dtype)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.nb_var, self.nb_var
+
+    def _unpack(self, words: np.ndarray) -> np.ndarray:
+        """
+        Unpacks one row (or a 2D array of rows) of words into booleans.
+        """
+        return np.unpackbits(
+            words.view(np.uint8),
+            axis=-1,
+            count=self.nb_var,
+            bitorder='little'
+        ).astype(bool)
+
+    def __getitem__(self, index: tuple[int, int]) -> int:
+        i, j = index
+        return int((self.words[i, j >> 6] >> np.uint64(j & 63)) & _one)
+
+    def __setitem__(self, index: tuple[int, int], value) -> None:
+        i, j = index
+        mask = _one << np.uint64(j & 63)
+        if value:
+            self.words[i, j >> 6] |= mask
+        else:
+            self.words[i, j >> 6] &= ~mask
+
+    def row(self, node: int) -> np.ndarray:
+        """
+        Returns the successors of a node as a boolean mask (row of the
+        adjacency matrix).
+        """
+        return self._unpack(self.words[node])
+
+    def column(self, node: int) -> np.ndarray:
+        """
+        Returns the predecessors of a node as a boolean mask (column of the
+        adjacency matrix).
+        """
+        return ((self.words[:, node >> 6] >> np.uint64(node & 63)) & _one) \
+            .astype(bool)
+
+    def successors(self, node: int) -> np.ndarray:
+        """
+        Returns the nodes b such that node -> b is in the graph (including
+        undirected edges).
+        """
+        return np.flatnonzero(self.row(node))
+
+    def adjacent(self, node: int) -> np.ndarray:
+        """
+        Returns the nodes connected to a node by an edge of any kind.
+        """
+        return np.flatnonzero(self.row(node) | self.column(node))
+
+    def children(self, node: int) -> np.ndarray:
+        """
+        Returns the nodes b such that node -> b (and not b -> node).
+        """
+        return np.flatnonzero(self.row(node) & ~self.column(node))
+
+    def parents(self, node: int) -> np.ndarray:
+        """
+        Returns the nodes b such that b -> node (and not node -> b).
+        """
+        return np.flatnonzero(~self.row(node) & self.column(node))
+
+    def undirected_neighbours(self, node: int) -> np.ndarray:
+        """
+        Returns the nodes b such that node - b.
+        """
+        return np.flatnonzero(self.row(node) & self.column(node))
+
+    def submatrix(self, nodes: npt.ArrayLike) -> np.ndarray:
+        """
+        Returns the dense boolean adjacency matrix of the subgraph induced by
+        some nodes (in the order given).
+        """
+        nodes = np.asarray(nodes, dtype=int)
+
+        return self._unpack(self.words[nodes])[:, nodes]
+
+    def remove_edges(self, rows: npt.ArrayLike,
+                     columns: npt.ArrayLike) -> None:
+        """
+        Removes the edges rows[k] -> columns[k] from the graph, for all k at
+        once.
+        """
+        rows = np.asarray(rows, dtype=int)
+        columns = np.asarray(columns, dtype=int)
+        masks = _one << (columns & 63).astype(_word_dtype)
+        np.bitwise_and.at(self.words, (rows, columns >> 6), ~masks)
+
+    def has_edges(self, rows: npt.ArrayLike,
+                  columns: npt.ArrayLike) -> np.ndarray:
+        """
+        Returns whether each edge rows[k] -> columns[k] is in the graph, for
+        all k at once.
+        """
+        rows = np.asarray(rows, dtype=int)
+        columns = np.asarray(columns, dtype=int)
+        bits = self.words[rows, columns >> 6] >> \
+            (columns & 63).astype(_word_dtype)
+
+        return (bits & _one).astype(bool)
+
+    def common_successors(self, a: int, b: int) -> np.ndarray:
+        """
+        Returns the nodes c such that both a -> c and b -> c are in the graph
+        (including undirected edges), intersecting the rows word by word.
+        """
+        return np.flatnonzero(self._unpack(self.words[a] & self.words[b]))
+
+    def nonzero(self, chunk_size: int = 1024) -> tuple[np.ndarray,
+                                                        np.ndarray]:
+        """
+        Returns the indices (i, j) of the edges i -> j in the graph, in
+        row-major order, unpacking at most chunk_size rows at a time.
+        """
+        rows, columns = [], []
+        for start in range(0, self.nb_var, chunk_size):
+            i, j = np.nonzero(self._unpack(self.words[start:start +
+                                                      chunk_size]))
+            rows.append(i + start)
+            columns.append(j)
+
+        if len(rows) == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+        return np.concatenate(rows), np.concatenate(columns)
+
+    def copy(self) -> 'BitPackedGraph':
+        graph = BitPackedGraph(self.nb_var)
+        graph.words[:, :] = self.words
+
+        return graph
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BitPackedGraph):
+            return NotImplemented
+        return self.nb_var == other.nb_var and \
+            np.array_equal(self.words, other.words)
+
+    __hash__ = None
+
+    def __str__(self) -> str:
+        return str(self.to_adjacency_matrix(dtype=int))
+
+    def __repr__(self) -> str:
+        return f'BitPackedGraph(nb_var={self.nb_var})'
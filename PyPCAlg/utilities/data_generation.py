@@ -0,0 +1,206 @@
+"""
+This module contains a generator of observations from a linear Structural
+Equation Model (SEM) with additive Gaussian noise, x_j = sum_i w_ij x_i + e_j
+where the sum runs over the parents i of j in a Directed Acyclic Graph (DAG),
+for any DAG given by its adjacency matrix.
+
+The DAG is sorted topologically once, and the observations are generated in
+chunks of rows stored column by column (Fortran order), each variable being
+obtained from the noise with one matrix-vector product over the columns of
+its parents, so that the work is proportional to the number of edges. The
+chunks can be written directly to a memory-mapped .npy file or to a Parquet
+file, so that datasets larger than memory can be produced.
+"""
+import numpy as np
+import pandas as pd
+
+from numpy.lib.format import open_memmap
+
+
+def topological_layers(dag: np.ndarray) -> list[np.ndarray]:
+    """
+    Sorts the nodes of a DAG into topological layers : the first layer holds
+    the nodes without parents, and each following layer the nodes all the
+    parents of which are in the previous layers.
+
+    Parameters
+    ----------
+    dag : array_like
+        The adjacency matrix of the DAG (dag[i, j] != 0 iff i -> j).
+
+    Returns
+    -------
+    list
+        The layers, as sorted arrays of node indices.
+    """
+
+    edges = np.asarray(dag) != 0
+    nb_parents = edges.sum(axis=0)
+    placed = np.zeros(edges.shape[0], dtype=bool)
+
+    layers = []
+    while not placed.all():
+        layer = np.flatnonzero((nb_parents == 0) & ~placed)
+        if len(layer) == 0:
+            raise ValueError('The graph is not acyclic !')
+        layers.append(layer)
+        placed[layer] = True
+        nb_parents = nb_parents - edges[layer, :].sum(axis=0)
+
+    return layers
+
+
+def random_edge_weights(dag: np.ndarray, low: float = 0.5, high: float = 2.0,
+                        rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Draws the weights of the edges of a DAG uniformly at random in
+    [-high, -low] U [low, high] (so that the weights are bounded away from 0).
+
+    Parameters
+    ----------
+    dag : array_like
+        The adjacency matrix of the DAG.
+    low : float, optional
+        The minimum absolute value of the weights.
+    high : float, optional
+        The maximum absolute value of the weights.
+    rng : numpy.random.Generator, optional
+        The random number generator.
+
+    Returns
+    -------
+    array_like
+        The matrix of the weights (weights[i, j] is the weight of i -> j, 0
+        if there is no such edge).
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    edges = np.asarray(dag) != 0
+    nb_edges = int(edges.sum())
+    magnitudes = rng.uniform(low, high, size=nb_edges)
+    signs = rng.choice([-1.0, 1.0], size=nb_edges)
+
+    weights = np.zeros(edges.shape, dtype=float)
+    weights[edges] = magnitudes * signs
+
+    return weights
+
+
+def _generate_chunk(parents: list[tuple[int, np.ndarray, np.ndarray]],
+                    noise: np.ndarray) -> np.ndarray:
+    """
+    Turns a chunk of noise (in Fortran order) into observations, variable by
+    variable in topological order, in place.
+    """
+
+    for j, parents_j, weights_j in parents:
+        noise[:, j] += noise[:, parents_j] @ weights_j
+
+    return noise
+
+
+def generate_linear_sem_data(dag: np.ndarray, weights: np.ndarray,
+                             sample_size: int, noise_std=1.0,
+                             column_names: list = None,
+                             chunk_size: int = 100000,
+                             rng: np.random.Generator = None,
+                             filename: str = None, dtype=np.float64):
+    """
+    Generates observations from the linear SEM with additive Gaussian noise
+    defined by a DAG and the weights of its edges.
+
+    Parameters
+    ----------
+    dag : array_like
+        The adjacency matrix of the DAG (dag[i, j] != 0 iff i -> j).
+    weights : array_like
+        The weights of the edges (weights[i, j] is the weight of i -> j ;
+        entries without an edge are ignored).
+    sample_size : int
+        The number of observations.
+    noise_std : float or array_like, optional
+        The standard deviation of the noise, for all the variables or for
+        each of them (defaults to 1).
+    column_names : list, optional
+        The names of the variables (defaults to 'x0', 'x1', ...).
+    chunk_size : int, optional
+        The number of observations generated at a time.
+    rng : numpy.random.Generator, optional
+        The random number generator. The observations do not depend on
+        chunk_size for a given state of the generator.
+    filename : str, optional
+        A path ending in '.npy', to write the observations to a memory-mapped
+        array (in Fortran order, so that the columns are contiguous), or in
+        '.parquet', to write them to a Parquet file (one row group per chunk
+        ; requires pyarrow). The observations are returned in a DataFrame if
+        no filename is provided.
+    dtype : data-type, optional
+        The type of the observations (defaults to float64).
+
+    Returns
+    -------
+    pandas.DataFrame, numpy.memmap or None
+        The observations in a DataFrame if no filename is provided, the
+        memory-mapped array if filename ends in '.npy', None otherwise.
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    edges = np.asarray(dag) != 0
+    weights = np.where(edges, np.asarray(weights, dtype=float), 0.0)
+    nb_var = edges.shape[0]
+    if column_names is None:
+        column_names = [f'x{i}' for i in range(nb_var)]
+    noise_std = np.broadcast_to(np.asarray(noise_std, dtype=float), (nb_var,))
+
+    parents = []
+    for j in np.concatenate(topological_layers(edges)).tolist():
+        parents_j = np.flatnonzero(edges[:, j])
+        if len(parents_j) > 0:
+            parents.append((j, parents_j, weights[parents_j, j].astype(dtype)))
+
+    if filename is None:
+        output = np.empty((sample_size, nb_var), dtype=dtype, order='F')
+    elif filename.endswith('.npy'):
+        output = open_memmap(filename, mode='w+', dtype=dtype,
+                             shape=(sample_size, nb_var), fortran_order=True)
+    elif filename.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        output = None
+        schema = pa.schema([(str(name), pa.from_numpy_dtype(np.dtype(dtype)))
+                            for name in column_names])
+        parquet_writer = pq.ParquetWriter(filename, schema)
+    else:
+        raise ValueError(f'Unknown file format for {filename} !')
+
+    buffer = np.empty((min(chunk_size, sample_size), nb_var), dtype=dtype,
+                      order='F')
+    try:
+        for start in range(0, sample_size, chunk_size):
+            nb_rows = min(chunk_size, sample_size - start)
+            chunk = buffer[:nb_rows, :]
+            np.multiply(rng.standard_normal((nb_rows, nb_var), dtype=dtype),
+                        noise_std, out=chunk, casting='same_kind')
+            _generate_chunk(parents, chunk)
+            if output is not None:
+                output[start:start + nb_rows, :] = chunk
+            else:
+                parquet_writer.write_table(pa.Table.from_arrays(
+                    [chunk[:, j] for j in range(nb_var)], schema=schema
+                ))
+    finally:
+        if output is None:
+            parquet_writer.close()
+
+    if filename is None:
+        return pd.DataFrame(output, columns=column_names, copy=False)
+    elif output is not None:
+        output.flush()
+        return output
+
+    return None
@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+
+dataset_extensions = ('.csv', '.parquet', '.npy')
+
+
+def _is_arrow_table(data) -> bool:
+    """
+    Checks whether data is a pyarrow Table (without importing pyarrow).
+    """
+    return type(data).__module__.startswith('pyarrow') and \
+        hasattr(data, 'column_names') and hasattr(data, 'num_rows')
+
+
+class Dataset:
+    """
+    The observations, stored in a single contiguous buffer of floats in
+    Fortran order (column after column), together with the names of the
+    variables.
+
+    Each column is then a contiguous zero-copy view of the buffer, so that
+    the (conditional) independence tests can read the observations of a
+    variable without any indexing machinery or copy. A Fortran-ordered
+    floating-point array (e.g. a np.memmap written by
+    generate_linear_sem_data) is used as is, without being copied or read
+    into memory ; any other input is copied once into a new buffer.
+
+    Parameters
+    ----------
+    data : array_like, numpy.memmap, pandas.DataFrame or pyarrow.Table
+        The observations, one column per variable.
+    column_names : list, optional
+        The names of the variables (defaults to the column names of a
+        DataFrame or a Table, to 'x0', 'x1', ... otherwise).
+    dtype : data-type, optional
+        The floating-point type of the buffer (defaults to float64, or to
+        the type of a floating-point array).
+    """
+
+    def __init__(self, data, column_names: list = None, dtype=None):
+        if isinstance(data, Dataset):
+            values = data.values
+            if column_names is None:
+                column_names = data.columns
+        elif isinstance(data, pd.DataFrame):
+            if column_names is None:
+                column_names = list(data.columns)
+            values = np.asfortranarray(data.to_numpy(dtype=dtype or float))
+        elif _is_arrow_table(data):
+            if column_names is None:
+                column_names = list(data.column_names)
+            values = np.empty((data.num_rows, data.num_columns),
+                              dtype=dtype or float, order='F')
+            for j in range(data.num_columns):
+                values[:, j] = data.column(j).to_numpy()
+        else:
+            values = np.asarray(data)
+            if values.ndim != 2:
+                raise ValueError(f'Expected a 2-dimensional array, got '
+                                 f'{values.ndim} dimension(s) !')
+            if dtype is None and not np.issubdtype(values.dtype,
+                                                   np.floating):
+                dtype = float
+            if dtype is not None:
+                values = values.astype(dtype, order='F', copy=False)
+            values = np.asfortranarray(values)
+
+        self.values = values
+        nb_var = values.shape[1]
+        if column_names is None:
+            column_names = [f'x{j}' for j in range(nb_var)]
+        if len(column_names) != nb_var:
+            raise ValueError(f'Expected {nb_var} column names, got '
+                             f'{len(column_names)} !')
+        self.columns = list(column_names)
+        self._index = {name: j for j, name in enumerate(self.columns)}
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.values.shape
+
+    def column_index(self, key) -> int:
+        """
+        Returns the index of a variable given by its index or its name.
+        """
+        if isinstance(key, (int, np.integer)):
+            return int(key)
+
+        return self._index[key]
+
+    def column(self, key) -> np.ndarray:
+        """
+        Returns the observations of a variable (given by its index or its
+        name), as a zero-copy view of the buffer.
+        """
+        return self.values[:, self.column_index(key)]
+
+    def select(self, keys) -> np.ndarray:
+        """
+        Returns the observations of several variables (given by their
+        indices or their names), one column per variable.
+        """
+        return self.values[:, [self.column_index(key) for key in keys]]
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Converts the observations into a DataFrame (without a copy).
+        """
+        return pd.DataFrame(self.values, columns=self.columns, copy=False)
+
+    def __repr__(self) -> str:
+        return f'Dataset(nb_obs={self.shape[0]}, nb_var={self.shape[1]})'
+
+
+def as_dataset(data):
+    """
+    Returns the observations as a Dataset, unless they are in a DataFrame
+    (which is returned as is, so that the (conditional) independence tests
+    written for DataFrames keep working).
+
+    Parameters
+    ----------
+    data : array_like, numpy.memmap, pandas.DataFrame, pyarrow.Table or
+    Dataset
+        The observations.
+
+    Returns
+    -------
+    Dataset or pandas.DataFrame
+        The observations.
+    """
+
+    if isinstance(data, (Dataset, pd.DataFrame)):
+        return data
+
+    return Dataset(data)
+
+
+def _count_csv_rows(filename: str) -> int:
+    """
+    Estimates the number of rows of observations in a CSV file with a header
+    line, from its line feeds : the estimate is exact unless the values hold
+    line breaks or the lines end with a carriage return alone.
+    """
+    nb_lines = 0
+    last = b'\n'
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            nb_lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        nb_lines += 1
+
+    return max(nb_lines - 1, 0)
+
+
+def read_dataset(filename: str, columns: list = None,
+                 chunk_size: int = 100000, dtype=np.float64) -> Dataset:
+    """
+    Reads observations from a file into a Dataset, chunk by chunk, so that
+    only the Fortran-ordered buffer of the Dataset is held in memory in full.
+
+    Parameters
+    ----------
+    filename : str
+        A path ending in '.csv' (with a header line), '.parquet' (requires
+        pyarrow) or '.npy'. A .npy file is memory-mapped rather than read,
+        without a copy if it is stored in Fortran order with the requested
+        dtype.
+    columns : list, optional
+        The columns to read (names, or indices for a .npy file ; defaults to
+        all of them).
+    chunk_size : int, optional
+        The number of rows read at a time.
+    dtype : data-type, optional
+        The floating-point type of the buffer (defaults to float64).
+
+    Returns
+    -------
+    Dataset
+        The observations.
+    """
+
+    if filename.endswith('.npy'):
+        values = np.load(filename, mmap_mode='r')
+        column_names = None
+        if columns is not None:
+            values = values[:, columns]
+            column_names = [f'x{j}' for j in columns]
+        return Dataset(values, column_names=column_names, dtype=dtype)
+
+    if filename.endswith('.csv'):
+        # The buffer is grown or trimmed to the rows actually read
+        nb_obs = _count_csv_rows(filename)
+        column_names = list(pd.read_csv(filename, usecols=columns,
+                                        nrows=0).columns)
+        chunks = (
+            chunk.to_numpy(dtype=dtype)
+            for chunk in pd.read_csv(filename, usecols=column_names,
+                                     chunksize=chunk_size)
+        )
+    elif filename.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(filename)
+        nb_obs = parquet_file.metadata.num_rows
+        column_names = columns
+        if column_names is None:
+            column_names = list(parquet_file.schema_arrow.names)
+        chunks = (
+            np.column_stack([batch.column(j).to_numpy()
+                             for j in range(batch.num_columns)])
+            for batch in parquet_file.iter_batches(batch_size=chunk_size,
+                                                   columns=column_names)
+        )
+    else:
+        raise ValueError(f'Unknown file format for {filename}, expected '
+                         f'one of {dataset_extensions} !')
+
+    values = np.empty((nb_obs, len(column_names)), dtype=dtype, order='F')
+    start = 0
+    for chunk in chunks:
+        end = start + len(chunk)
+        if end > len(values):
+            grown = np.empty((max(end, 2 * len(values)), len(column_names)),
+                             dtype=dtype, order='F')
+            grown[:start, :] = values[:start, :]
+            values = grown
+        values[start:end, :] = chunk
+        start = end
+    if start < len(values):
+        values = np.asfortranarray(values[:start, :])
+
+    return Dataset(values, column_names=column_names)
@@ -0,0 +1,169 @@
+import numpy as np
+
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+
+
+class EdgeListCPDAG:
+    """
+    A Completed Partially Directed Acyclic Graph (CPDAG) stored as lists of
+    edges.
+
+    The directed edges i -> j are stored in an integer array of shape (k, 2)
+    and the undirected edges i - j in an integer array of shape (m, 2) with
+    i < j, both in row-major order, so that a CPDAG with a few edges per node
+    takes memory proportional to its number of edges instead of p * p
+    entries. The names of the variables are attached to the graph, and the
+    dense adjacency matrix (or a scipy.sparse CSR matrix) is only built on
+    request.
+
+    The edge list is an output format : the PC algorithm orients the edges
+    on a dense or a bit-packed adjacency matrix, and converts the result.
+
+    Parameters
+    ----------
+    nb_var : int
+        The number of nodes in the graph.
+    directed : array_like
+        The directed edges, as pairs (i, j) for i -> j.
+    undirected : array_like
+        The undirected edges, as pairs (i, j) for i - j with i < j.
+    column_names : list, optional
+        The names of the variables (defaults to their indices).
+    """
+
+    def __init__(self, nb_var: int, directed, undirected,
+                 column_names: list = None):
+        self.nb_var = nb_var
+        self.directed = np.asarray(directed, dtype=np.int64).reshape(-1, 2)
+        self.undirected = np.asarray(undirected, dtype=np.int64).reshape(-1, 2)
+        if column_names is None:
+            column_names = list(range(nb_var))
+        if len(column_names) != nb_var:
+            raise ValueError(f'Expected {nb_var} column names, got '
+                             f'{len(column_names)} !')
+        self.column_names = list(column_names)
+
+    @classmethod
+    def from_pdag(cls, pdag, column_names: list = None) -> 'EdgeListCPDAG':
+        """
+        Extracts the edges of a CPDAG given as an adjacency matrix. A
+        BitPackedGraph is read a block of rows at a time, so that the dense
+        adjacency matrix is never built.
+
+        Parameters
+        ----------
+        pdag : array_like or BitPackedGraph
+            The CPDAG.
+        column_names : list, optional
+            The names of the variables (defaults to their indices).
+
+        Returns
+        -------
+        EdgeListCPDAG
+            The CPDAG as lists of edges.
+        """
+        nb_var = pdag.shape[0]
+        if isinstance(pdag, BitPackedGraph):
+            rows, columns = pdag.nonzero()
+            has_reverse = pdag.has_edges(columns, rows)
+        else:
+            pdag = np.asarray(pdag)
+            rows, columns = np.nonzero(pdag)
+            has_reverse = pdag[columns, rows] != 0
+
+        is_directed = ~has_reverse
+        is_undirected = has_reverse & (rows < columns)
+
+        return cls(
+            nb_var=nb_var,
+            directed=np.column_stack((rows[is_directed],
+                                      columns[is_directed])),
+            undirected=np.column_stack((rows[is_undirected],
+                                        columns[is_undirected])),
+            column_names=column_names
+        )
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.nb_var, self.nb_var
+
+    def _edges(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the indices (i, j) of the entries of the adjacency matrix
+        equal to 1.
+        """
+        rows = np.concatenate((self.directed[:, 0], self.undirected[:, 0],
+                               self.undirected[:, 1]))
+        columns = np.concatenate((self.directed[:, 1], self.undirected[:, 1],
+                                  self.undirected[:, 0]))
+
+        return rows, columns
+
+    def to_dense(self, dtype=float) -> np.ndarray:
+        """
+        Converts the CPDAG into its dense adjacency matrix, as returned by
+        the PC algorithm by default.
+
+        Parameters
+        ----------
+        dtype : data-type, optional
+            The type of the entries of the matrix (defaults to float).
+
+        Returns
+        -------
+        array_like
+            The adjacency matrix.
+        """
+        adjacency_matrix = np.zeros(self.shape, dtype=dtype)
+        rows, columns = self._edges()
+        adjacency_matrix[rows, columns] = 1
+
+        return adjacency_matrix
+
+    def to_csr(self, dtype=float):
+        """
+        Converts the CPDAG into its adjacency matrix in scipy.sparse CSR
+        format.
+
+        Parameters
+        ----------
+        dtype : data-type, optional
+            The type of the entries of the matrix (defaults to float).
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            The adjacency matrix.
+        """
+        from scipy import sparse
+
+        rows, columns = self._edges()
+
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=dtype), (rows, columns)),
+            shape=self.shape
+        )
+
+    def named_edges(self) -> tuple[list[tuple], list[tuple]]:
+        """
+        Returns the directed and undirected edges as pairs of variable names.
+        """
+        names = self.column_names
+
+        return [(names[i], names[j]) for i, j in self.directed.tolist()], \
+            [(names[i], names[j]) for i, j in self.undirected.tolist()]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, EdgeListCPDAG):
+            return NotImplemented
+        return self.nb_var == other.nb_var and \
+            np.array_equal(self.directed, other.directed) and \
+            np.array_equal(self.undirected, other.undirected) and \
+            self.column_names == other.column_names
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'EdgeListCPDAG(nb_var={self.nb_var}, ' \
+               f'nb_directed={len(self.directed)}, ' \
+               f'nb_undirected={len(self.undirected)})'
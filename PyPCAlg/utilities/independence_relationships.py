@@ -1,11 +1,78 @@
-from collections.abc import Callable
+from collections import deque
+from collections.abc import Callable, Mapping
+from concurrent.futures import ProcessPoolExecutor
 from itertools import combinations
 
+import ast
 import copy
+import functools
 
 import numpy as np
 import pandas as pd
-import pingouin as pg
+
+from scipy import stats
+
+from PyPCAlg.utilities.dataset import Dataset, as_dataset
+
+_column_x = 'X'
+_column_y = 'Y'
+_column_conditioning_set = 'Conditioning Set'
+_column_pval = 'p-value'
+_column_holds = '(Conditional) Independence Holds'
+
+
+def _pval(correlation_stats: pd.DataFrame) -> float:
+    """
+    Reads the p-value in the output of pingouin (the column is named 'p-val'
+    or, from pingouin 0.7 on, 'p_val').
+    """
+
+    column = 'p-val' if 'p-val' in correlation_stats.columns else 'p_val'
+
+    return correlation_stats[column].values[0]
+
+
+def correlation_pval(r: float, nb_obs: int, nb_covar: int = 0) -> float:
+    """
+    Computes the two-sided p-value of a (partial) Pearson correlation, with
+    the Student t-test on nb_obs - nb_covar - 2 degrees of freedom used by
+    pingouin.
+
+    Parameters
+    ----------
+    r : float
+        The (partial) correlation.
+    nb_obs : int
+        The number of observations.
+    nb_covar : int, optional
+        The number of variables in the conditioning set.
+
+    Returns
+    -------
+    float
+        The p-value of the test r = 0.
+    """
+
+    dof = nb_obs - nb_covar - 2
+    if dof <= 0:
+        return np.nan
+    r = min(max(float(r), -1.0), 1.0)
+    if abs(r) == 1.0:
+        return 0.0
+    statistic = r * np.sqrt(dof / (1 - r * r))
+
+    return float(2 * stats.t.sf(abs(statistic), dof))
+
+
+def partial_correlation(values: np.ndarray) -> float:
+    """
+    Computes the partial correlation of the first two columns of values
+    given the other columns, from the inverse of their covariance matrix.
+    """
+
+    precision = np.linalg.pinv(np.cov(values, rowvar=False))
+
+    return -precision[0, 1] / np.sqrt(precision[0, 0] * precision[1, 1])
 
 
 def do_test_linear_independence(data: pd.DataFrame, x: str, y: str,
@@ -18,12 +85,16 @@ def do_test_linear_independence(data: pd.DataFrame, x: str, y: str,
 
     Parameters
     ----------
-    data : pandas.DataFrame
-        The observations.
-    x : str
-        The name of the column containing the observations for variable x.
-    y : str
-        The name of the column containing the observations for variable y.
+    data : pandas.DataFrame or Dataset
+        The observations (any other input accepted by Dataset is converted
+        first). Outside of a DataFrame, the test is computed directly on the
+        columns of the buffer, without pingouin.
+    x : str or int
+        The name of the column containing the observations for variable x
+        (or its index, outside of a DataFrame).
+    y : str or int
+        The name of the column containing the observations for variable y
+        (or its index, outside of a DataFrame).
     level : float
         The level of the test.
 
@@ -34,6 +105,13 @@ def do_test_linear_independence(data: pd.DataFrame, x: str, y: str,
         independence holds).
     """
 
+    data = as_dataset(data)
+    if isinstance(data, Dataset):
+        r = np.corrcoef(data.column(x), data.column(y))[0, 1]
+        return correlation_pval(r, data.shape[0])
+
+    import pingouin as pg
+
     correlation_stats = pg.corr(
         data.loc[:, x],
         data.loc[:, y],
@@ -41,7 +119,7 @@ def do_test_linear_independence(data: pd.DataFrame, x: str, y: str,
         method='pearson'
     )
 
-    pval = correlation_stats['p-val'].values[0]
+    pval = _pval(correlation_stats)
 
     return pval
 
@@ -57,15 +135,19 @@ def do_test_linear_conditional_independence(data: pd.DataFrame, x: str, y: str,
 
     Parameters
     ----------
-    data : pandas.DataFrame
-        The observations.
-    x : str
-        The name of the column containing the observations for variable x.
-    y : str
-        The name of the column containing the observations for variable y.
+    data : pandas.DataFrame or Dataset
+        The observations (any other input accepted by Dataset is converted
+        first). Outside of a DataFrame, the test is computed directly on the
+        columns of the buffer, without pingouin.
+    x : str or int
+        The name of the column containing the observations for variable x
+        (or its index, outside of a DataFrame).
+    y : str or int
+        The name of the column containing the observations for variable y
+        (or its index, outside of a DataFrame).
     z : list
         A list of the names of the column containing the observations for
-        the variables in z.
+        the variables in z (or their indices, outside of a DataFrame).
     level : float
         The level of the test.
 
@@ -76,6 +158,13 @@ def do_test_linear_conditional_independence(data: pd.DataFrame, x: str, y: str,
         conditional independence holds).
     """
 
+    data = as_dataset(data)
+    if isinstance(data, Dataset):
+        r = partial_correlation(data.select([x, y, *z]))
+        return correlation_pval(r, data.shape[0], len(z))
+
+    import pingouin as pg
+
     correlation_stats = pg.partial_corr(
         data=data,
         x=x,
@@ -85,15 +174,216 @@ def do_test_linear_conditional_independence(data: pd.DataFrame, x: str, y: str,
         method='pearson'
     )
 
-    pval = correlation_stats['p-val'].values[0]
+    pval = _pval(correlation_stats)
 
     return pval
 
 
+def linear_indep_test(data: pd.DataFrame, x: str, y: str,
+                      level: float) -> bool:
+    """
+    Tests for linear independence between variables x and y at a level, with
+    the signature of the unconditional independence tests of the PC algorithm
+    (see do_test_linear_independence).
+
+    Returns
+    -------
+    bool
+        Whether independence holds at the level.
+    """
+
+    return do_test_linear_independence(data=data, x=x, y=y,
+                                       level=level) >= level
+
+
+def linear_cond_indep_test(data: pd.DataFrame, x: str, y: str, z: list[str],
+                           level: float) -> bool:
+    """
+    Tests for linear independence between variables x and y given the set of
+    variables z at a level, with the signature of the conditional
+    independence tests of the PC algorithm (see
+    do_test_linear_conditional_independence).
+
+    Returns
+    -------
+    bool
+        Whether conditional independence holds at the level.
+    """
+
+    return do_test_linear_conditional_independence(data=data, x=x, y=y, z=z,
+                                                   level=level) >= level
+
+
+def _format_relation(x: str, y: str, z: list[str]) -> str:
+    """
+    Formats a (conditional) independence relationship as 'x _||_ y' or
+    'x _||_ y | z'.
+    """
+
+    if len(z) == 0:
+        return f'{x} _||_ {y}'
+
+    return f'{x} _||_ {y} | {z}'
+
+
+# The state of the worker processes, set once per process by
+# _initialise_worker rather than sent with every unit of work
+_worker_state = dict()
+
+
+def _initialise_worker(data: pd.DataFrame, independence_test: Callable,
+                       conditional_independence_test: Callable,
+                       level: float):
+
+    _worker_state['data'] = data
+    _worker_state['independence_test'] = independence_test
+    _worker_state['conditional_independence_test'] = \
+        conditional_independence_test
+    _worker_state['level'] = level
+
+
+def _run_tests(x: str, y: str, other_variables: list[str],
+               size: int) -> list[tuple]:
+    """
+    Performs the tests of x _||_ y given all the subsets of other_variables
+    of a given size, in a worker process.
+    """
+
+    return list(_iter_tests(
+        data=_worker_state['data'],
+        independence_test=_worker_state['independence_test'],
+        conditional_independence_test=_worker_state[
+            'conditional_independence_test'
+        ],
+        level=_worker_state['level'],
+        x=x,
+        y=y,
+        other_variables=other_variables,
+        size=size
+    ))
+
+
+def _iter_tests(data: pd.DataFrame, independence_test: Callable,
+                conditional_independence_test: Callable, level: float,
+                x: str, y: str, other_variables: list[str], size: int):
+    """
+    Performs the tests of x _||_ y given all the subsets of other_variables
+    of a given size.
+    """
+
+    if size == 0:
+        yield x, y, [], independence_test(
+            data=data,
+            x=x,
+            y=y,
+            level=level
+        )
+        return
+
+    for conditioning_set in combinations(other_variables, size):
+        z = sorted(conditioning_set)
+        yield x, y, z, conditional_independence_test(
+            data=data,
+            x=x,
+            y=y,
+            z=z,
+            level=level
+        )
+
+
+def iter_independence_relationships(
+        data: pd.DataFrame, independence_test: Callable,
+        conditional_independence_test: Callable,
+        level: float = 0.05, max_conditioning_size: int = None,
+        nb_workers: int = 1):
+    """
+    Performs all possible conditional independence tests for the variables in
+    the dataset (up to a maximum size of the conditioning sets), and yields
+    the results as they are produced.
+
+    The units of work are the pairs of variables together with a size of the
+    conditioning sets. When nb_workers > 1 they are distributed to a pool of
+    processes (in which case the tests must be picklable, e.g. functions
+    defined at the top level of a module), keeping a bounded number of units
+    in flight so that memory stays flat ; the results are yielded in the
+    same order as with a single process.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The observations.
+    independence_test : callable
+        A function to perform unconditional independence testing.
+    conditional_independence_test : callable
+        A function to perform conditional independence testing.
+    level : float, optional
+        The level of the test.
+    max_conditioning_size : int, optional
+        The maximum size of the conditioning sets (defaults to no maximum).
+    nb_workers : int, optional
+        The number of worker processes (defaults to 1, i.e. the tests are
+        performed in the current process).
+
+    Yields
+    ------
+    tuple
+        Tuples (x, y, z, p-value) where x is any variable in the dataset
+        (represented by its column name), y is any variable after x in the
+        dataset, z is the sorted list of the variables in a subset of the
+        other variables (possibly empty) and p-value is the result of the
+        (conditional) independence test x _||_ y | z.
+    """
+
+    variables = list(data.columns)
+    p = len(variables)
+    if max_conditioning_size is None:
+        max_conditioning_size = p - 2
+
+    units = []
+    for i in range(p):
+        for j in range(i + 1, p):
+            other_variables = copy.deepcopy(variables)
+            other_variables.remove(variables[i])
+            other_variables.remove(variables[j])
+            for size in range(min(max_conditioning_size,
+                                  len(other_variables)) + 1):
+                units.append((variables[i], variables[j], other_variables,
+                              size))
+
+    if nb_workers <= 1:
+        for x, y, other_variables, size in units:
+            yield from _iter_tests(
+                data=data,
+                independence_test=independence_test,
+                conditional_independence_test=conditional_independence_test,
+                level=level,
+                x=x,
+                y=y,
+                other_variables=other_variables,
+                size=size
+            )
+        return
+
+    with ProcessPoolExecutor(
+            max_workers=nb_workers,
+            initializer=_initialise_worker,
+            initargs=(data, independence_test, conditional_independence_test,
+                      level)
+    ) as executor:
+        in_flight = deque()
+        for unit in units:
+            in_flight.append(executor.submit(_run_tests, *unit))
+            if len(in_flight) >= 4 * nb_workers:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
 def produce_independence_relationships(
         data: pd.DataFrame, independence_test: Callable,
         conditional_independence_test: Callable,
-        level: float = 0.05):
+        level: float = 0.05, max_conditioning_size: int = None,
+        nb_workers: int = 1):
     """
     Performs all possible conditional independence tests for the variables in
     the dataset.
@@ -108,6 +398,11 @@ def produce_independence_relationships(
         A function to perform conditional independence testing.
     level : float
         The level of the test.
+    max_conditioning_size : int, optional
+        The maximum size of the conditioning sets (defaults to no maximum).
+    nb_workers : int, optional
+        The number of worker processes (see
+        iter_independence_relationships).
 
     Returns
     -------
@@ -119,55 +414,198 @@ def produce_independence_relationships(
         for the (conditional) independence tests.
     """
 
-    variables = list(data.columns)
-    p = len(variables)
+    return {
+        _format_relation(x, y, z): pval
+        for x, y, z, pval in iter_independence_relationships(
+            data=data,
+            independence_test=independence_test,
+            conditional_independence_test=conditional_independence_test,
+            level=level,
+            max_conditioning_size=max_conditioning_size,
+            nb_workers=nb_workers
+        )
+    }
+
+
+def write_independence_relationships(relationships, filename: str,
+                                     level: float, chunk_size: int = 100000):
+    """
+    Writes (conditional) independence relationships to a CSV file (separated
+    by semicolons, as the tables of the examples) or to a Parquet file
+    (which requires pyarrow), chunk by chunk, so that they can be streamed
+    from iter_independence_relationships without being held in memory.
 
-    res = dict()
+    The relationships are written in the order in which they are produced
+    (not sorted as by render_independence_relationships).
 
-    for i in range(p):
-        x = variables[i]
-        for j in range(i + 1, p):
-            y = variables[j]
+    Parameters
+    ----------
+    relationships : iterable
+        Tuples (x, y, z, p-value) as yielded by
+        iter_independence_relationships.
+    filename : str
+        The path to the file, ending in '.csv' or '.parquet'.
+    level : float
+        The level of the tests.
+    chunk_size : int, optional
+        The number of relationships written at a time.
 
-            # Test unconditional independence
-            x_indep_y = independence_test(
-                data=data,
-                x=x,
-                y=y,
-                level=level
-            )
-            res[f'{x} _||_ {y}'] = x_indep_y
+    Returns
+    -------
+    int
+        The number of relationships written.
+    """
 
-            # Test conditional independence
-            other_variables = copy.deepcopy(variables)
-            other_variables.remove(x)
-            other_variables.remove(y)
-            for r in range(1, len(other_variables) + 1):
-                for conditioning_set in combinations(other_variables, r):
-                    z = list(conditioning_set)
-                    z.sort()
-                    x_indep_y_given_z = conditional_independence_test(
-                        data=data,
-                        x=x,
-                        y=y,
-                        z=z,
-                        level=level
-                    )
-                    res[f'{x} _||_ {y} | {z}'] = x_indep_y_given_z
-
-    return res
-
-
-def render_independence_relationships(dic: dict, level: float):
+    if filename.endswith('.parquet'):
+        import pyarrow.parquet as pq
+    elif not filename.endswith('.csv'):
+        raise ValueError(f'Unknown file format for {filename} !')
+
+    nb_written = 0
+    parquet_writer = None
+
+    def write(chunk):
+        nonlocal parquet_writer
+        df = _relationships_frame(chunk, level)
+        if filename.endswith('.csv'):
+            df[_column_conditioning_set] = [
+                _format_conditioning_set(z)
+                for z in df[_column_conditioning_set]
+            ]
+            df.to_csv(filename, sep=';', index=False,
+                      mode='w' if nb_written == 0 else 'a',
+                      header=nb_written == 0)
+        else:
+            table = _to_arrow(df)
+            if parquet_writer is None:
+                parquet_writer = pq.ParquetWriter(filename, table.schema)
+            parquet_writer.write_table(table)
+
+    try:
+        chunk = []
+        for relationship in relationships:
+            chunk.append(relationship)
+            if len(chunk) == chunk_size:
+                write(chunk)
+                nb_written += len(chunk)
+                chunk = []
+        if len(chunk) > 0 or nb_written == 0:
+            write(chunk)
+            nb_written += len(chunk)
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+    return nb_written
+
+
+def _parse_relation(relation: str) -> tuple:
+    """
+    Parses a (conditional) independence relationship formatted by
+    _format_relation back into (x, y, z).
+    """
+
+    left, _, conditioning_set = relation.partition(' | ')
+    x, y = left.split(' _||_ ')
+    if conditioning_set == '':
+        return x, y, tuple()
+
+    return x, y, _literal_conditioning_set(conditioning_set)
+
+
+@functools.lru_cache(maxsize=2 ** 16)
+def _literal_conditioning_set(conditioning_set: str) -> tuple:
+    """
+    Parses the representation of a list of variable names (the same
+    conditioning sets appear for many pairs of variables, hence the cache).
+    """
+
+    return tuple(ast.literal_eval(conditioning_set))
+
+
+def _format_conditioning_set(z) -> str:
+    """
+    Formats a conditioning set as in the tables of the examples, e.g.
+    '[x1, x2]'.
+    """
+
+    return '[' + ', '.join(str(elt) for elt in z) + ']'
+
+
+def _parse_conditioning_set(conditioning_set: str) -> tuple:
+
+    without_brackets = conditioning_set[1:-1]
+    if len(without_brackets) == 0:
+        return tuple()
+
+    return tuple(elt.strip() for elt in without_brackets.split(','))
+
+
+def _to_arrow(df: pd.DataFrame):
+    """
+    Converts a dataframe of (conditional) independence relationships into an
+    Arrow table, the variables being stored as strings and the conditioning
+    sets as lists of strings.
+    """
+
+    import pyarrow as pa
+
+    schema = pa.schema([
+        (_column_x, pa.string()),
+        (_column_y, pa.string()),
+        (_column_conditioning_set, pa.list_(pa.string())),
+        (_column_pval, pa.float64()),
+        (_column_holds, pa.bool_())
+    ])
+    df = df.assign(**{
+        _column_x: df[_column_x].astype(str),
+        _column_y: df[_column_y].astype(str),
+        _column_conditioning_set: [
+            [str(elt) for elt in z] for z in df[_column_conditioning_set]
+        ]
+    })
+
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def _relationships_frame(relationships: list[tuple],
+                         level: float) -> pd.DataFrame:
+    """
+    Builds the dataframe of a list of (conditional) independence
+    relationships (x, y, z, p-value), column by column.
+    """
+
+    if len(relationships) == 0:
+        x, y, z, pvals = [], [], [], []
+    else:
+        x, y, z, pvals = zip(*relationships)
+    pvals = np.asarray(pvals, dtype=float)
+
+    return pd.DataFrame({
+        _column_x: list(x),
+        _column_y: list(y),
+        _column_conditioning_set: [tuple(elt) for elt in z],
+        _column_pval: pvals,
+        _column_holds: pvals >= level
+    })
+
+
+def render_independence_relationships(relationships, level: float):
     """
     Renders the conditional independence relationships in dataframe format.
 
+    The dataframe is built column by column, with the variables x and y and
+    the conditioning set z (as a tuple of variable names) in separate
+    columns, and sorted by x, y and z.
+
     Parameters
     ----------
-    dic : dict
+    relationships : dict or iterable
         A dictionary the keys of which are strings 'x _||_ y | z' and the
         values of which are the corresponding p-values in the (conditional)
-        independence tests of the relationships.
+        independence tests of the relationships (as returned by
+        produce_independence_relationships), or an iterable of tuples
+        (x, y, z, p-value) (as yielded by iter_independence_relationships).
     level : float
         The level of the tests.
 
@@ -175,32 +613,124 @@ def render_independence_relationships(dic: dict, level: float):
     -------
     pandas.DataFrame
         A dataframe containing information on all (conditional) independence
-        relationships.
+        relationships, with columns 'X', 'Y', 'Conditioning Set', 'p-value'
+        and '(Conditional) Independence Holds'.
     """
 
-    keys = list(dic.keys())
-    n = len(keys)
-
-    df = pd.DataFrame()
-    df['Relation'] = np.repeat(np.nan, n)
-    df['p-value'] = np.repeat(np.nan, n)
-    df['(Conditional) Independence Holds'] = np.repeat(np.nan, n)
+    if isinstance(relationships, Mapping):
+        relationships = [
+            _parse_relation(relation) + (pval,)
+            for relation, pval in relationships.items()
+        ]
+    else:
+        relationships = list(relationships)
 
-    for i in range(n):
-        key = keys[i]
-        value = dic[key]
-        df.loc[i, 'Relation'] = key
-        df.loc[i, 'p-value'] = value
+    df = _relationships_frame(relationships, level)
 
-    df.loc[:, '(Conditional) Independence Holds'] = (
-            df.loc[:, 'p-value'] >= level
+    order = sorted(
+        range(df.shape[0]),
+        key=lambda i: (str(relationships[i][0]), str(relationships[i][1]),
+                       [str(elt) for elt in relationships[i][2]])
     )
 
-    df.sort_values(
-        by='Relation',
-        axis=0,
-        ascending=True,
-        inplace=True
-    )
+    return df.iloc[order].reset_index(drop=True)
+
+
+def save_independence_relationships(df: pd.DataFrame, filename: str):
+    """
+    Saves the dataframe of (conditional) independence relationships returned
+    by render_independence_relationships to a CSV file (separated by
+    semicolons, the conditioning sets being written as '[x1, x2]' as in the
+    tables of the examples), a Parquet file (which requires pyarrow ; the
+    conditioning sets are stored as lists) or a NumPy .npz archive (the
+    conditioning sets are stored flattened, with their offsets).
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The (conditional) independence relationships.
+    filename : str
+        The path to the file, ending in '.csv', '.parquet' or '.npz'.
+    """
+
+    conditioning_sets = df[_column_conditioning_set]
+
+    if filename.endswith('.csv'):
+        df = df.assign(**{
+            _column_conditioning_set: [
+                _format_conditioning_set(z) for z in conditioning_sets
+            ]
+        })
+        df.to_csv(filename, sep=';', index=False)
+    elif filename.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        pq.write_table(_to_arrow(df), filename)
+    elif filename.endswith('.npz'):
+        sizes = np.fromiter((len(z) for z in conditioning_sets),
+                            dtype=np.int64, count=len(conditioning_sets))
+        np.savez(
+            filename,
+            x=np.asarray(df[_column_x], dtype=str),
+            y=np.asarray(df[_column_y], dtype=str),
+            conditioning_sets=np.asarray(
+                [str(elt) for z in conditioning_sets for elt in z], dtype=str
+            ),
+            offsets=np.concatenate(([0], np.cumsum(sizes))),
+            pvals=df[_column_pval].to_numpy(dtype=float),
+            holds=df[_column_holds].to_numpy(dtype=bool)
+        )
+    else:
+        raise ValueError(f'Unknown file format for {filename} !')
+
+
+def load_independence_relationships(filename: str) -> pd.DataFrame:
+    """
+    Loads a dataframe of (conditional) independence relationships saved by
+    save_independence_relationships (the variables are read as strings).
+
+    Parameters
+    ----------
+    filename : str
+        The path to the file, ending in '.csv', '.parquet' or '.npz'.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The (conditional) independence relationships.
+    """
 
-    return df
+    if filename.endswith('.csv'):
+        df = pd.read_csv(filename, sep=';', dtype={_column_x: str,
+                                                   _column_y: str,
+                                                   _column_conditioning_set:
+                                                       str})
+        conditioning_sets = [
+            _parse_conditioning_set(z) for z in df[_column_conditioning_set]
+        ]
+    elif filename.endswith('.parquet'):
+        df = pd.read_parquet(filename)
+        conditioning_sets = [
+            tuple(z) for z in df[_column_conditioning_set]
+        ]
+    elif filename.endswith('.npz'):
+        with np.load(filename) as archive:
+            flat = archive['conditioning_sets'].tolist()
+            offsets = archive['offsets'].tolist()
+            df = pd.DataFrame({
+                _column_x: archive['x'].tolist(),
+                _column_y: archive['y'].tolist(),
+                _column_pval: archive['pvals'],
+                _column_holds: archive['holds']
+            })
+        conditioning_sets = [
+            tuple(flat[start:end]) for start, end in zip(offsets[:-1],
+                                                         offsets[1:])
+        ]
+    else:
+        raise ValueError(f'Unknown file format for {filename} !')
+
+    df[_column_conditioning_set] = conditioning_sets
+
+    return df[[_column_x, _column_y, _column_conditioning_set, _column_pval,
+               _column_holds]]
@@ -1,16 +1,111 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import threading
 
+_log_format = '%(asctime)s - %(name)s - %(message)s'
+_date_format = '%d-%b-%y %H:%M:%S'
 
-def create_logger(logger_name: str, log_file: str) -> logging.Logger:
+# One queue, background listener thread and file handler per log file, shared
+# by all the loggers writing to that file.
+_queue_handlers = dict()
+_queue_listeners = dict()
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    A queue handler which hands the log records over to the background
+    listener as they are, so that the (possibly expensive) formatting of the
+    messages happens in the listener thread rather than in the caller's.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _FlushRequest:
+    """
+    A request put on the queue of a log file, which the background listener
+    answers once the records queued before it are written.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """
+    A queue listener which flushes its handlers when it reaches a flush
+    request on its queue, and signals the request.
+    """
+
+    def handle(self, record) -> None:
+        if isinstance(record, _FlushRequest):
+            for handler in self.handlers:
+                handler.flush()
+            record.done.set()
+        else:
+            super().handle(record)
+
+
+def _get_queue_handler(log_file: str) -> logging.Handler:
+    """
+    Returns the queue handler attached to a log file, starting the
+    background listener writing to the file if needed.
+
+    Parameters
+    ----------
+    log_file : str
+        The path of the file to which write the logs.
+
+    Returns
+    -------
+    logging.Handler
+        The queue handler feeding the background writer of the log file.
+    """
+    path = os.path.abspath(log_file)
+
+    if path not in _queue_handlers:
+        formatter = logging.Formatter(
+            fmt=_log_format,
+            datefmt=_date_format
+        )
+        file_handler = logging.FileHandler(
+            path,
+            mode='a'
+        )
+        file_handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        listener = _FlushingQueueListener(log_queue, file_handler)
+        listener.start()
+
+        _queue_handlers[path] = _DeferredQueueHandler(log_queue)
+        _queue_listeners[path] = listener
+
+    return _queue_handlers[path]
+
+
+def create_logger(logger_name: str, log_file: str,
+                  level: int = logging.INFO) -> logging.Logger:
     """
     Creates a logger for logging to a file.
 
+    The records are put on a queue and written to the file by a background
+    thread, so that logging does not block the caller on file I/O. Calling
+    this function several times for the same logger and file does not
+    duplicate the handlers : each file has a single writer.
+
     Parameters
     ----------
     logger_name : str
         The name of the logger.
     log_file : str
         The path of the file to which write the logs.
+    level : int, optional
+        The logging level of the logger (defaults to logging.INFO).
 
     Returns
     -------
@@ -18,17 +113,63 @@ def create_logger(logger_name: str, log_file: str) -> logging.Logger:
         The logger.
     """
     logger = logging.getLogger(logger_name)
-    logger.setLevel(logging.INFO)
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(message)s',
-        datefmt='%d-%b-%y %H:%M:%S'
-    )
-    file_handler = logging.FileHandler(
-        log_file,
-        mode='a'
-    )
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    logger.setLevel(level)
+
+    queue_handler = _get_queue_handler(log_file)
+    for handler in list(logger.handlers):
+        if isinstance(handler, _DeferredQueueHandler) and \
+                handler is not queue_handler:
+            logger.removeHandler(handler)
+    if queue_handler not in logger.handlers:
+        logger.addHandler(queue_handler)
 
     return logger
+
+
+def flush_log_file(log_file: str) -> None:
+    """
+    Waits until all the records logged so far to a log file are written,
+    so that the file is complete when a run returns.
+
+    A flush request is put on the queue of the file, behind the records
+    logged so far, and the call returns once the background writer has
+    reached it and flushed the file.
+
+    Parameters
+    ----------
+    log_file : str
+        The path of the log file.
+    """
+    listener = _queue_listeners.get(os.path.abspath(log_file))
+    if listener is None:
+        return
+
+    request = _FlushRequest()
+    listener.queue.put_nowait(request)
+    request.done.wait()
+
+
+def shutdown_loggers() -> None:
+    """
+    Flushes all pending log records to their files, stops the background
+    writers and closes the log files.
+
+    The loggers created by create_logger are detached from their files ;
+    calling create_logger again starts a new background writer.
+    """
+    for path, listener in list(_queue_listeners.items()):
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+        queue_handler = _queue_handlers[path]
+        for logger in logging.Logger.manager.loggerDict.values():
+            if isinstance(logger, logging.Logger) and \
+                    queue_handler in logger.handlers:
+                logger.removeHandler(queue_handler)
+
+    _queue_listeners.clear()
+    _queue_handlers.clear()
+
+
+atexit.register(shutdown_loggers)
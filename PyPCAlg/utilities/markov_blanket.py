@@ -0,0 +1,143 @@
+"""
+This module contains the estimation of the Markov blankets of the variables
+with the grow-shrink algorithm (D. Margaritis and S. Thrun, 'Bayesian network
+induction via local neighborhoods', NIPS, 1999), using the (conditional)
+independence tests of the PC algorithm.
+
+The Markov blanket of a variable contains its parents, its children and the
+other parents of its children, so that the variables adjacent to it in the
+causal skeleton are among its Markov blanket. Estimating the blankets first
+costs a number of tests linear in the number of variables for each variable,
+and allows the adjacency phase of the PC algorithm to start from the pairs of
+variables in each other's blanket rather than from the complete graph.
+"""
+
+
+def _test(data, indep_test_func: callable, cond_indep_test_func: callable,
+          level: float, x: int, y: int, z: list[int]) -> bool:
+    if len(z) == 0:
+        return indep_test_func(data=data, x=x, y=y, level=level)
+
+    return cond_indep_test_func(data=data, x=x, y=y, z=list(z), level=level)
+
+
+def grow_shrink(data, target: int, indep_test_func: callable,
+                cond_indep_test_func: callable, level: float,
+                candidates: list[int] = None) -> tuple[list[int], dict]:
+    """
+    Estimates the Markov blanket of a variable with the grow-shrink
+    algorithm : the variables dependent on the target given the current
+    blanket are added to it until none is left (grow phase), then the
+    variables independent of the target given the rest of the blanket are
+    removed from it (shrink phase).
+
+    Parameters
+    ----------
+    data : pandas.DataFrame, Dataset, array_like or pyarrow.Table
+        The observations.
+    target : int
+        The index of the target variable.
+    indep_test_func : callable
+        A function to perform unconditional independence testing.
+    cond_indep_test_func : callable
+        A function to perform conditional independence testing.
+    level : float
+        The level for the tests.
+    candidates : list, optional
+        The indices of the candidate variables (defaults to all the variables
+        but the target).
+
+    Returns
+    -------
+    tuple
+        The indices of the variables in the Markov blanket, in increasing
+        order, and for each other candidate a set separating it from the
+        target (as a sorted tuple).
+    """
+    if candidates is None:
+        candidates = [v for v in range(data.shape[1]) if v != target]
+
+    blanket = []
+    separating_sets = dict()
+    changed = True
+    while changed:
+        changed = False
+        for v in candidates:
+            if v in blanket:
+                continue
+            if _test(data, indep_test_func, cond_indep_test_func, level,
+                     target, v, blanket):
+                separating_sets[v] = tuple(sorted(blanket))
+            else:
+                blanket.append(v)
+                separating_sets.pop(v, None)
+                changed = True
+
+    for v in list(blanket):
+        others = [u for u in blanket if u != v]
+        if _test(data, indep_test_func, cond_indep_test_func, level,
+                 target, v, others):
+            blanket.remove(v)
+            separating_sets[v] = tuple(sorted(others))
+
+    return sorted(blanket), separating_sets
+
+
+def estimate_markov_blankets(data, indep_test_func: callable,
+                             cond_indep_test_func: callable, level: float,
+                             marginal_screening: bool = False
+                             ) -> tuple[list[list[int]], list]:
+    """
+    Estimates the Markov blankets of all the variables with the grow-shrink
+    algorithm.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame, Dataset, array_like or pyarrow.Table
+        The observations.
+    indep_test_func : callable
+        A function to perform unconditional independence testing.
+    cond_indep_test_func : callable
+        A function to perform conditional independence testing.
+    level : float
+        The level for the tests.
+    marginal_screening : bool, optional
+        Whether to test every pair of variables for marginal independence
+        first (once per pair), and to only search the blanket of a variable
+        among the variables marginally dependent on it. The blankets then
+        miss the spouses marginally independent of the variable, which are
+        not adjacent to it, but the tests of the grow phase are much fewer
+        on sparse graphs (defaults to False).
+
+    Returns
+    -------
+    tuple
+        The Markov blankets of the variables (as sorted lists of indices),
+        and for each variable the dictionary of the sets separating it from
+        the variables outside its blanket.
+    """
+    nb_var = data.shape[1]
+    candidates = [[v for v in range(nb_var) if v != x] for x in range(nb_var)]
+    separating_sets = [dict() for _ in range(nb_var)]
+    if marginal_screening:
+        candidates = [[] for _ in range(nb_var)]
+        for x in range(nb_var):
+            for y in range(x + 1, nb_var):
+                if indep_test_func(data=data, x=x, y=y, level=level):
+                    separating_sets[x][y] = tuple()
+                    separating_sets[y][x] = tuple()
+                else:
+                    candidates[x].append(y)
+                    candidates[y].append(x)
+
+    blankets = []
+    for x in range(nb_var):
+        blanket, separating_sets_x = grow_shrink(
+            data=data, target=x, indep_test_func=indep_test_func,
+            cond_indep_test_func=cond_indep_test_func, level=level,
+            candidates=candidates[x]
+        )
+        blankets.append(blanket)
+        separating_sets[x].update(separating_sets_x)
+
+    return blankets, separating_sets
@@ -1,7 +1,11 @@
+from collections.abc import Mapping
+
 import numpy as np
 
 from numpy import typing as npt
 
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+
 
 def find_adjacent_vertices(adjacency_matrix: npt.ArrayLike) -> set[tuple]:
     """
@@ -12,7 +16,7 @@ def find_adjacent_vertices(adjacency_matrix: npt.ArrayLike) -> set[tuple]:
 
     Parameters
     ----------
-    adjacency_matrix : array_like
+    adjacency_matrix : array_like or BitPackedGraph
         The adjacency matrix of the graph
 
     Returns
@@ -21,14 +25,42 @@ def find_adjacent_vertices(adjacency_matrix: npt.ArrayLike) -> set[tuple]:
         A set of tuples. Each tuple represents an edge in the graph.
     """
 
-    n = adjacency_matrix.shape[0]
-    adjacent_vertices = set()
-    for i in range(n):
-        for j in range(n):
-            if adjacency_matrix[i, j] != 0:
-                adjacent_vertices.add((i, j))
+    if isinstance(adjacency_matrix, BitPackedGraph):
+        rows, columns = adjacency_matrix.nonzero()
+    else:
+        rows, columns = np.nonzero(np.asarray(adjacency_matrix))
+
+    return set(zip(rows.tolist(), columns.tolist()))
+
+
+def iter_adjacent_vertices(adjacency_matrix: npt.ArrayLike):
+    """
+    Iterates lazily, row by row, over the pairs of vertices that are adjacent
+    in the graph, without materialising all of them (see
+    find_adjacent_vertices).
+
+    Parameters
+    ----------
+    adjacency_matrix : array_like or BitPackedGraph
+        The adjacency matrix of the graph
+
+    Yields
+    ------
+    tuple
+        The pairs (x, y) of adjacent vertices, by increasing x then y.
+    """
 
-    return adjacent_vertices
+    bit_packed = isinstance(adjacency_matrix, BitPackedGraph)
+    if not bit_packed:
+        adjacency_matrix = np.asarray(adjacency_matrix)
+
+    for x in range(adjacency_matrix.shape[0]):
+        if bit_packed:
+            row = adjacency_matrix.successors(x)
+        else:
+            row = np.flatnonzero(adjacency_matrix[x, :])
+        for y in row.tolist():
+            yield x, y
 
 
 def find_adjacent_vertices_to(x: int, adjacency_matrix: npt.ArrayLike) -> list:
@@ -39,7 +71,7 @@ def find_adjacent_vertices_to(x: int, adjacency_matrix: npt.ArrayLike) -> list:
     ----------
     x : int
         The index of the vertex of interest.
-    adjacency_matrix : array_like
+    adjacency_matrix : array_like or BitPackedGraph
         The adjacency matrix of the graph.
 
     Returns
@@ -49,9 +81,74 @@ def find_adjacent_vertices_to(x: int, adjacency_matrix: npt.ArrayLike) -> list:
         the index of which is x.
     """
 
+    if isinstance(adjacency_matrix, BitPackedGraph):
+        return list(adjacency_matrix.successors(x))
+
     return list(np.where(adjacency_matrix[x, :] != 0)[0])
 
 
+def find_unshielded_triples_array(adjacency_matrix: npt.ArrayLike
+                                  ) -> np.ndarray:
+    """
+    Finds unshielded triples in an undirected graph, as an array.
+
+    For each vertex b, the pairs (a, c) of neighbours of b with a < c that
+    are NOT adjacent are read off the complement of the adjacency matrix
+    restricted to the neighbours of b, so that the work is proportional to
+    the sum of the squared degrees rather than to the number of pairs of
+    vertices.
+
+    Parameters
+    ----------
+    adjacency_matrix : array_like or BitPackedGraph
+        The adjacency matrix of the graph.
+
+    Returns
+    -------
+    array_like
+        An integer array of shape (number of unshielded triples, 3), each row
+        of which is an unshielded triple (a, b, c) with a < c.
+    """
+
+    bit_packed = isinstance(adjacency_matrix, BitPackedGraph)
+    if not bit_packed:
+        adjacency_matrix = np.asarray(adjacency_matrix) != 0
+
+    n = adjacency_matrix.shape[0]
+    triples = []
+    for b in range(n):
+        if bit_packed:
+            neighbours = adjacency_matrix.successors(b)
+        else:
+            neighbours = np.flatnonzero(adjacency_matrix[b, :])
+        nb_neighbours = len(neighbours)
+        if nb_neighbours < 2:
+            continue
+
+        if bit_packed:
+            non_adjacent = ~adjacency_matrix.submatrix(neighbours)
+        else:
+            non_adjacent = ~adjacency_matrix[np.ix_(neighbours, neighbours)]
+        i, j = np.triu_indices(nb_neighbours, k=1)
+        is_unshielded = non_adjacent[i, j]
+        nb_triples = np.count_nonzero(is_unshielded)
+        if nb_triples == 0:
+            continue
+
+        triples.append(
+            np.column_stack((
+                neighbours[i[is_unshielded]],
+                np.full(nb_triples, b),
+                neighbours[j[is_unshielded]]
+            ))
+        )
+
+    if len(triples) == 0:
+        return np.zeros((0, 3), dtype=int)
+
+    return np.concatenate(triples)
+
+
 def find_unshielded_triples(adjacency_matrix: npt.ArrayLike) -> set[tuple]:
     """
     Finds unshielded colliders in an undirected graph.
@@ -62,7 +159,7 @@ def find_unshielded_triples(adjacency_matrix: npt.ArrayLike) -> set[tuple]:
 
     Parameters
     ----------
-    adjacency_matrix : array_like
+    adjacency_matrix : array_like or BitPackedGraph
         The adjacency matrix of the graph.
 
     Returns
@@ -70,25 +167,54 @@ def find_unshielded_triples(adjacency_matrix: npt.ArrayLike) -> set[tuple]:
     set
         The set of unshielded triples in the graph.
     """
-    n = adjacency_matrix.shape[0]
-    non_adjacent_vertices = set()
-    for i in range(n):
-        for j in range(i+1, n):
-            if adjacency_matrix[i, j] == 0:
-                non_adjacent_vertices.add((i, j))
-
-    unshielded_triples = set()
-    for (a, c) in non_adjacent_vertices:
-        adjacent_to_a = find_adjacent_vertices_to(
-            x=a,
-            adjacency_matrix=adjacency_matrix
-        )
-        adjacent_to_c = find_adjacent_vertices_to(
-            x=c,
-            adjacency_matrix=adjacency_matrix
+
+    triples = find_unshielded_triples_array(adjacency_matrix=adjacency_matrix)
+
+    return set(map(tuple, triples.tolist()))
+
+
+def find_unshielded_colliders(unshielded_triples: np.ndarray,
+                              separation_sets: Mapping) -> np.ndarray:
+    """
+    Finds which unshielded triples (a, b, c) are colliders a -> b <- c, i.e.
+    those for which b is in none of the separating sets of a and c.
+
+    The union of the separating sets of each pair (a, c) is computed once,
+    and the membership of the b's is then checked for all the triples at
+    once against this index.
+
+    Parameters
+    ----------
+    unshielded_triples : array_like
+        An integer array of shape (number of unshielded triples, 3), as
+        returned by find_unshielded_triples_array.
+    separation_sets : dict or SeparationSets
+        The separation sets, indexed by pairs of variables.
+
+    Returns
+    -------
+    array_like
+        A boolean array, True for the unshielded triples that are colliders.
+    """
+
+    unshielded_triples = np.asarray(unshielded_triples, dtype=int)
+    if unshielded_triples.shape[0] == 0:
+        return np.zeros(0, dtype=bool)
+
+    a = unshielded_triples[:, 0]
+    b = unshielded_triples[:, 1]
+    c = unshielded_triples[:, 2]
+    n = int(unshielded_triples.max()) + 1
+
+    # Index of the (pair, member of a separating set of the pair) keys
+    pairs = np.unique(a * n + c)
+    member_keys = []
+    for pair in pairs.tolist():
+        x, y = divmod(pair, n)
+        members = set().union(*separation_sets[(x, y)])
+        member_keys.extend(
+            pair * n + member for member in members if member < n
         )
-        adjacent_a_and_c = set(adjacent_to_a).intersection(set(adjacent_to_c))
-        for b in adjacent_a_and_c:
-            unshielded_triples.add((a, b, c))
+    member_keys = np.asarray(member_keys, dtype=int)
 
-    return unshielded_triples
+    return ~np.isin((a * n + c) * n + b, member_keys)
@@ -1,5 +1,19 @@
 import numpy as np
 
+from PyPCAlg.utilities.bit_packed_graph import BitPackedGraph
+
+
+def _pairs(mask: np.ndarray) -> set[tuple]:
+    """
+    Returns the set of index pairs (i, j), with i != j, for which a boolean
+    matrix is True.
+    """
+    mask = mask.copy()
+    np.fill_diagonal(mask, False)
+    rows, columns = np.nonzero(mask)
+
+    return set(zip(rows.tolist(), columns.tolist()))
+
 
 def find_children(pdag: np.ndarray, node: int) -> set[int]:
     """
@@ -7,7 +21,7 @@ def find_children(pdag: np.ndarray, node: int) -> set[int]:
 
     Parameters
     ----------
-    pdag : array_like
+    pdag : array_like or BitPackedGraph
         The PDAG.
     node : int
         The node.
@@ -18,15 +32,12 @@ def find_children(pdag: np.ndarray, node: int) -> set[int]:
         The children of the node in the PDAG.
     """
 
-    n = pdag.shape[0]
-
-    children = set()
-
-    for i in range(n):
-        if pdag[node, i] == 1 and pdag[i, node] == 0:
-            children.add(i)
+    if isinstance(pdag, BitPackedGraph):
+        children = pdag.children(node)
+    else:
+        children = np.flatnonzero((pdag[node, :] == 1) & (pdag[:, node] == 0))
 
-    return children
+    return set(children.tolist())
 
 
 def find_parents(pdag: np.ndarray, node: int) -> set[int]:
@@ -35,7 +46,7 @@ def find_parents(pdag: np.ndarray, node: int) -> set[int]:
 
     Parameters
     ----------
-    pdag : array_like
+    pdag : array_like or BitPackedGraph
         The PDAG.
     node : int
         The node.
@@ -46,15 +57,12 @@ def find_parents(pdag: np.ndarray, node: int) -> set[int]:
         The parents of the node in the PDAG.
     """
 
-    n = pdag.shape[0]
+    if isinstance(pdag, BitPackedGraph):
+        parents = pdag.parents(node)
+    else:
+        parents = np.flatnonzero((pdag[node, :] == 0) & (pdag[:, node] == 1))
 
-    parents = set()
-
-    for i in range(n):
-        if pdag[node, i] == 0 and pdag[i, node] == 1:
-            parents.add(i)
-
-    return parents
+    return set(parents.tolist())
 
 
 def find_undirected_neighbours(pdag: np.ndarray, node: int) -> set[int]:
@@ -64,7 +72,7 @@ def find_undirected_neighbours(pdag: np.ndarray, node: int) -> set[int]:
 
     Parameters
     ----------
-    pdag : array_like
+    pdag : array_like or BitPackedGraph
         The PDAG.
     node : int
         The node.
@@ -75,15 +83,78 @@ def find_undirected_neighbours(pdag: np.ndarray, node: int) -> set[int]:
         The neighbours of the node in the PDAG.
     """
 
-    n = pdag.shape[0]
+    if isinstance(pdag, BitPackedGraph):
+        undirected_neighbours = pdag.undirected_neighbours(node)
+    else:
+        undirected_neighbours = np.flatnonzero(
+            (pdag[:, node] == 1) & (pdag[node, :] == 1)
+        )
 
-    undirected_neighbours = set()
+    return set(undirected_neighbours.tolist())
 
-    for i in range(n):
-        if pdag[i, node] == 1 and pdag[node, i] == 1:
-            undirected_neighbours.add(i)
 
-    return undirected_neighbours
+def iter_undirected_adjacent_pairs(pdag: np.ndarray):
+    """
+    Iterates lazily, node by node, over the pairs of nodes (a, b) in the
+    Partially Directed Acyclic Graph (PDAG) such that a - b in the graph,
+    without materialising all of them (see find_undirected_adjacent_pairs).
+
+    Parameters
+    ----------
+    pdag : array_like or BitPackedGraph
+        The PDAG.
+
+    Yields
+    ------
+    tuple
+        The pairs (a, b) of nodes with a - b, by increasing a then b.
+    """
+
+    bit_packed = isinstance(pdag, BitPackedGraph)
+    if not bit_packed:
+        pdag = np.asarray(pdag)
+
+    for node in range(pdag.shape[0]):
+        if bit_packed:
+            neighbours = pdag.undirected_neighbours(node)
+        else:
+            neighbours = np.flatnonzero((pdag[node, :] == 1) &
+                                        (pdag[:, node] == 1))
+        for neighbour in neighbours.tolist():
+            if neighbour != node:
+                yield node, neighbour
+
+
+def iter_undirected_non_adjacent_pairs(pdag: np.ndarray):
+    """
+    Iterates lazily, node by node, over the pairs of nodes (a, b) in the
+    Partially Directed Acyclic Graph (PDAG) such that there is no edge
+    between a and b, without materialising all of them (see
+    find_undirected_non_adjacent_pairs).
+
+    Parameters
+    ----------
+    pdag : array_like or BitPackedGraph
+        The PDAG.
+
+    Yields
+    ------
+    tuple
+        The pairs (a, b) of non adjacent nodes, by increasing a then b.
+    """
+
+    bit_packed = isinstance(pdag, BitPackedGraph)
+    if not bit_packed:
+        pdag = np.asarray(pdag)
+
+    for node in range(pdag.shape[0]):
+        if bit_packed:
+            is_adjacent = pdag.row(node) | pdag.column(node)
+        else:
+            is_adjacent = (pdag[node, :] != 0) | (pdag[:, node] != 0)
+        for other in np.flatnonzero(~is_adjacent).tolist():
+            if other != node:
+                yield node, other
 
 
 def find_undirected_adjacent_pairs(pdag: np.ndarray) -> set[tuple]:
@@ -96,7 +167,7 @@ def find_undirected_adjacent_pairs(pdag: np.ndarray) -> set[tuple]:
 
     Parameters
     ----------
-    pdag : array_like
+    pdag : array_like or BitPackedGraph
         The PDAG.
 
     Returns
@@ -105,17 +176,12 @@ def find_undirected_adjacent_pairs(pdag: np.ndarray) -> set[tuple]:
         The nodes that are adjacent in the graph.
     """
 
-    n = pdag.shape[0]
-
-    adjacent_vertices = set()
+    if isinstance(pdag, BitPackedGraph):
+        return set(iter_undirected_adjacent_pairs(pdag))
 
-    for i in range(n):
-        for j in range(i + 1, n):
-            if pdag[i, j] == 1 and pdag[j, i] == 1:
-                adjacent_vertices.add((i, j))
-                adjacent_vertices.add((j, i))
+    is_edge = np.asarray(pdag) == 1
 
-    return adjacent_vertices
+    return _pairs(is_edge & is_edge.T)
 
 
 def find_undirected_non_adjacent_pairs(pdag: np.ndarray) -> set[tuple]:
@@ -128,7 +194,7 @@ def find_undirected_non_adjacent_pairs(pdag: np.ndarray) -> set[tuple]:
 
     Parameters
     ----------
-    pdag : array_like
+    pdag : array_like or BitPackedGraph
         The PDAG.
 
     Returns
@@ -136,14 +202,10 @@ def find_undirected_non_adjacent_pairs(pdag: np.ndarray) -> set[tuple]:
     set
         The nodes that are not adjacent in the graph.
     """
-    n = pdag.shape[0]
 
-    non_adjacent_vertices = set()
+    if isinstance(pdag, BitPackedGraph):
+        return set(iter_undirected_non_adjacent_pairs(pdag))
 
-    for i in range(n):
-        for j in range(i + 1, n):
-            if pdag[i, j] == 0 and pdag[j, i] == 0:
-                non_adjacent_vertices.add((i, j))
-                non_adjacent_vertices.add((j, i))
+    no_edge = np.asarray(pdag) == 0
 
-    return non_adjacent_vertices
+    return _pairs(no_edge & no_edge.T)
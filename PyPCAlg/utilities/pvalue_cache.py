@@ -0,0 +1,182 @@
+"""
+This module contains a cache of the p-values of the (conditional)
+independence tests. A p-value does not depend on the level of the test, so
+that the runs of the PC algorithm at several levels (or repeated runs on the
+same data) only compute each test once, the decision at a given level being
+read from the cached p-value.
+"""
+import threading
+
+import numpy as np
+
+
+def _key(x: int, y: int, z) -> tuple:
+    """
+    Returns the key of the test x _||_ y | z (the tests are symmetric in x
+    and y, and do not depend on the order of the variables in z).
+    """
+    x, y = int(x), int(y)
+    if x > y:
+        x, y = y, x
+
+    return x, y, tuple(sorted(int(v) for v in z))
+
+
+class PValueCache:
+    """
+    A cache of the p-values of the (conditional) independence tests, keyed by
+    the indices of the variables tested and of the conditioning set. The
+    cache can be shared by several threads : the p-values are computed
+    outside of its lock, so that the threads compute their tests in parallel.
+
+    Parameters
+    ----------
+    pvalues : dict, optional
+        The initial content of the cache.
+    """
+
+    def __init__(self, pvalues: dict = None):
+        self.pvalues = dict() if pvalues is None else dict(pvalues)
+        self.nb_computed = 0
+        self.nb_hits = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.pvalues)
+
+    def __contains__(self, test) -> bool:
+        x, y, z = test
+        return _key(x, y, z) in self.pvalues
+
+    def get(self, x: int, y: int, z=()) -> float:
+        """
+        Returns the cached p-value of x _||_ y | z, None if it is not cached.
+        """
+        return self.pvalues.get(_key(x, y, z))
+
+    def get_or_compute(self, pval_func: callable, data, x: int, y: int,
+                       z=()) -> float:
+        """
+        Returns the p-value of x _||_ y | z, computed with
+        pval_func(data, x, y, z) if it is not cached yet.
+        """
+        key = _key(x, y, z)
+        with self._lock:
+            pval = self.pvalues.get(key)
+            if pval is not None:
+                self.nb_hits += 1
+                return pval
+
+        # Computed without the lock : two threads may both compute a test
+        # missing from the cache, the first p-value stored being kept
+        pval = float(pval_func(data, x, y, z))
+        with self._lock:
+            if key in self.pvalues:
+                self.nb_hits += 1
+                return self.pvalues[key]
+            self.pvalues[key] = pval
+            self.nb_computed += 1
+
+        return pval
+
+    def add(self, x: int, y: int, z, pval: float) -> None:
+        """
+        Adds the p-value of x _||_ y | z computed elsewhere (for instance in
+        another process), counted as computed if it was not cached yet.
+        """
+        key = _key(x, y, z)
+        with self._lock:
+            if key not in self.pvalues:
+                self.pvalues[key] = float(pval)
+                self.nb_computed += 1
+
+    def missing(self, tests):
+        """
+        Yields the tests (x, y, z) of an iterable which are not cached yet,
+        once each.
+        """
+        seen = set()
+        for x, y, z in tests:
+            key = _key(x, y, z)
+            if key in seen or key in self.pvalues:
+                continue
+            seen.add(key)
+            yield key
+
+    def update(self, other: 'PValueCache') -> None:
+        """
+        Adds the p-values of another cache.
+        """
+        with other._lock:
+            pvalues = dict(other.pvalues)
+        with self._lock:
+            self.pvalues.update(pvalues)
+
+    def tests(self, pval_func: callable) -> tuple[callable, callable]:
+        """
+        Returns an unconditional and a conditional independence test with the
+        signatures expected by the PC algorithm, which compare the cached (or
+        computed) p-value to the level.
+
+        Parameters
+        ----------
+        pval_func : callable
+            The function computing the p-value of a test, with signature
+            pval_func(data, x, y, z) (z being empty for an unconditional
+            test).
+
+        Returns
+        -------
+        tuple
+            The unconditional and the conditional independence tests.
+        """
+
+        def indep_test(data, x, y, level):
+            return self.get_or_compute(pval_func, data, x, y) >= level
+
+        def cond_indep_test(data, x, y, z, level):
+            return self.get_or_compute(pval_func, data, x, y, z) >= level
+
+        return indep_test, cond_indep_test
+
+    def save(self, filename: str) -> None:
+        """
+        Saves the cache to a .npz file.
+        """
+        with self._lock:
+            pvalues = dict(self.pvalues)
+        keys = list(pvalues)
+        pairs = np.asarray([(x, y) for x, y, _ in keys],
+                           dtype=np.int64).reshape(-1, 2)
+        sizes = np.asarray([len(z) for _, _, z in keys], dtype=np.int64)
+        conditioning_sets = np.asarray([v for _, _, z in keys for v in z],
+                                       dtype=np.int64)
+        pvals = np.asarray([pvalues[key] for key in keys], dtype=float)
+
+        np.savez(filename, pairs=pairs, sizes=sizes,
+                 conditioning_sets=conditioning_sets, pvals=pvals)
+
+    @classmethod
+    def load(cls, filename: str) -> 'PValueCache':
+        """
+        Loads a cache saved with save.
+        """
+        with np.load(filename) as content:
+            pairs = content['pairs'].tolist()
+            offsets = np.concatenate(([0], np.cumsum(content['sizes'])))
+            conditioning_sets = content['conditioning_sets'].tolist()
+            pvals = content['pvals'].tolist()
+
+        return cls({
+            (x, y, tuple(conditioning_sets[offsets[i]:offsets[i + 1]])): pval
+            for i, ((x, y), pval) in enumerate(zip(pairs, pvals))
+        })
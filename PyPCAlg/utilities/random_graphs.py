@@ -0,0 +1,120 @@
+"""
+This module contains generators of random Directed Acyclic Graphs (DAGs),
+used to benchmark the PC algorithm on graphs of realistic sizes, and the
+Structural Hamming Distance used to measure the accuracy of its output.
+"""
+import numpy as np
+
+
+def _shuffle(dag: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Relabels the nodes of a DAG at random, so that the order of the
+    variables carries no information on the causal order.
+    """
+
+    permutation = rng.permutation(dag.shape[0])
+
+    return dag[np.ix_(permutation, permutation)]
+
+
+def erdos_renyi_dag(nb_var: int, expected_degree: float,
+                    rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Draws a random DAG in which each of the nb_var * (nb_var - 1) / 2
+    possible edges (oriented along a random causal order) is present
+    independently with the same probability.
+
+    Parameters
+    ----------
+    nb_var : int
+        The number of nodes.
+    expected_degree : float
+        The expected number of neighbours of a node (parents and children).
+    rng : numpy.random.Generator, optional
+        The random number generator.
+
+    Returns
+    -------
+    array_like
+        The adjacency matrix of the DAG.
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    probability = min(1.0, expected_degree / max(nb_var - 1, 1))
+    dag = np.triu(rng.random((nb_var, nb_var)) < probability, k=1)
+
+    return _shuffle(dag.astype(float), rng)
+
+
+def scale_free_dag(nb_var: int, expected_degree: float,
+                   rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Draws a random DAG with a power-law degree distribution, by preferential
+    attachment (A.-L. Barabási and R. Albert, 'Emergence of scaling in random
+    networks', Science, 1999) : each new node gets round(expected_degree / 2)
+    parents among the previous nodes, chosen with probabilities proportional
+    to their degrees, so that a few hubs have many children.
+
+    Parameters
+    ----------
+    nb_var : int
+        The number of nodes.
+    expected_degree : float
+        The expected number of neighbours of a node (parents and children).
+    rng : numpy.random.Generator, optional
+        The random number generator.
+
+    Returns
+    -------
+    array_like
+        The adjacency matrix of the DAG.
+    """
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    nb_parents = max(1, int(round(expected_degree / 2)))
+    dag = np.zeros((nb_var, nb_var))
+    # Each node appears in the list once per incident edge (plus once, so
+    # that the nodes without edges yet can be chosen)
+    endpoints = [0]
+    for j in range(1, nb_var):
+        chosen = set()
+        while len(chosen) < min(nb_parents, j):
+            chosen.add(endpoints[rng.integers(len(endpoints))])
+        parents = sorted(chosen)
+        dag[parents, j] = 1
+        endpoints.extend(parents)
+        endpoints.extend([j] * (len(parents) + 1))
+
+    return _shuffle(dag, rng)
+
+
+def structural_hamming_distance(estimated: np.ndarray,
+                                true: np.ndarray) -> int:
+    """
+    Computes the Structural Hamming Distance between two partially directed
+    graphs, i.e. the number of pairs of nodes between which the edges differ
+    (an edge missing in one of the graphs, or oriented differently in the
+    two graphs, directed and undirected edges being different).
+
+    Parameters
+    ----------
+    estimated : array_like
+        The adjacency matrix of the first graph (e.g. the estimated CPDAG).
+    true : array_like
+        The adjacency matrix of the second graph (e.g. the true CPDAG).
+
+    Returns
+    -------
+    int
+        The Structural Hamming Distance.
+    """
+
+    estimated = np.asarray(estimated) != 0
+    true = np.asarray(true) != 0
+    differs = (estimated != true) | (estimated.T != true.T)
+
+    return int(np.triu(differs, k=1).sum())
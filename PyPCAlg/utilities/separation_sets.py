@@ -0,0 +1,153 @@
+import struct
+
+from collections.abc import Mapping
+
+
+def _pack(z: list[int]) -> bytes:
+    """
+    Packs a conditioning set into bytes (sorted uint32 values).
+
+    Parameters
+    ----------
+    z : list
+        The indices of the variables in the conditioning set.
+
+    Returns
+    -------
+    bytes
+        The packed conditioning set.
+    """
+    return struct.pack(f'<{len(z)}I', *sorted(z))
+
+
+def _unpack(packed: bytes) -> tuple:
+    """
+    Unpacks a conditioning set packed by _pack.
+
+    Parameters
+    ----------
+    packed : bytes
+        The packed conditioning set.
+
+    Returns
+    -------
+    tuple
+        The indices of the variables in the conditioning set, sorted.
+    """
+    return struct.unpack(f'<{len(packed) // 4}I', packed)
+
+
+class SeparationSets(Mapping):
+    """
+    A compact store for the separation sets found by the PC algorithm.
+
+    Only the pairs of variables for which a separating set was found are
+    stored, each unordered pair once (under the integer key x * nb_var + y
+    with x < y), and the separating sets are packed into bytes. When a single
+    separating set was found for a pair (the most common case) it is stored
+    as is, otherwise the separating sets are stored in a frozenset.
+
+    The store can be read like the dictionary of sets of tuples previously
+    used : separation_sets[(x, y)] and separation_sets[(y, x)] both return
+    the set of the separating sets of x and y (as sorted tuples), which is
+    empty if none was found. Iterating over the store only yields the pairs
+    for which a separating set was found (in both orders), and the store
+    compares equal to any mapping with the same non-empty separation sets.
+
+    Parameters
+    ----------
+    nb_var : int
+        The number of variables.
+    """
+
+    def __init__(self, nb_var: int):
+        self.nb_var = nb_var
+        self._sets = dict()
+
+    def _key(self, x: int, y: int) -> int:
+        if x == y or not (0 <= x < self.nb_var and 0 <= y < self.nb_var):
+            raise KeyError((x, y))
+        if x < y:
+            return int(x) * self.nb_var + int(y)
+        else:
+            return int(y) * self.nb_var + int(x)
+
+    def add(self, x: int, y: int, z) -> None:
+        """
+        Records that z separates x and y.
+
+        Parameters
+        ----------
+        x : int
+            The index of variable x.
+        y : int
+            The index of variable y.
+        z : iterable
+            The indices of the variables in the separating set.
+        """
+        key = self._key(x, y)
+        packed = _pack(list(z))
+        current = self._sets.get(key)
+        if current is None:
+            self._sets[key] = packed
+        elif isinstance(current, bytes):
+            if current != packed:
+                self._sets[key] = frozenset((current, packed))
+        else:
+            self._sets[key] = current | {packed}
+
+    def __getitem__(self, pair: tuple) -> set[tuple]:
+        x, y = pair
+        current = self._sets.get(self._key(x, y))
+        if current is None:
+            return set()
+        elif isinstance(current, bytes):
+            return {_unpack(current)}
+        else:
+            return {_unpack(packed) for packed in current}
+
+    def __contains__(self, pair) -> bool:
+        try:
+            x, y = pair
+            return self._key(x, y) in self._sets
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def __iter__(self):
+        for key in self._sets:
+            x, y = divmod(key, self.nb_var)
+            yield x, y
+            yield y, x
+
+    def __len__(self) -> int:
+        return 2 * len(self._sets)
+
+    def to_dict(self) -> dict:
+        """
+        Converts the store into the dense dictionary of sets of tuples
+        previously returned by the PC algorithm, with an entry (possibly an
+        empty set) for every ordered pair of distinct variables.
+
+        Returns
+        -------
+        dict
+            The separation sets.
+        """
+        separation_sets = dict()
+        for x in range(self.nb_var):
+            for y in range(self.nb_var):
+                if x != y:
+                    separation_sets[(x, y)] = self[(x, y)]
+
+        return separation_sets
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        non_empty = {
+            pair: set(sets) for pair, sets in other.items() if len(sets) > 0
+        }
+        return dict(self.items()) == non_empty
+
+    def __repr__(self) -> str:
+        return f'SeparationSets({dict(self.items())})'
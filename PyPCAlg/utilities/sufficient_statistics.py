@@ -0,0 +1,276 @@
+"""
+This module contains the sufficient statistics of Gaussian observations for
+the linear (conditional) independence tests : the number of observations,
+the sums of the variables and the sums of their cross-products. Every partial
+correlation, and therefore every test, can be computed from the covariance
+matrix alone, in time depending on the size of the conditioning set only,
+instead of a pass over the observations.
+
+The statistics are updated in place when rows are added or removed, and
+sums of statistics computed on separate chunks of rows can be merged, so that
+they can be maintained over a stream of observations or a rolling window.
+"""
+import numpy as np
+
+from PyPCAlg.utilities.dataset import Dataset
+from PyPCAlg.utilities.independence_relationships import correlation_pval
+from PyPCAlg.utilities.pvalue_cache import PValueCache
+
+
+class GaussianSufficientStatistics:
+    """
+    The sufficient statistics of Gaussian observations.
+
+    The sums are taken over the observations shifted by a fixed vector (the
+    mean of the first rows added), which keeps the cross-products well
+    conditioned when the variables are far from 0.
+
+    Parameters
+    ----------
+    column_names : list
+        The names of the variables.
+    shift : array_like, optional
+        The vector subtracted from the observations (defaults to 0, or to the
+        mean of the first rows added).
+    """
+
+    def __init__(self, column_names: list, shift: np.ndarray = None):
+        self.columns = list(column_names)
+        self._index = {name: j for j, name in enumerate(self.columns)}
+        nb_var = len(self.columns)
+        self.shift = None if shift is None else \
+            np.asarray(shift, dtype=float).copy()
+        self.nb_obs = 0
+        self.sums = np.zeros(nb_var)
+        self.cross_products = np.zeros((nb_var, nb_var))
+        # Incremented at every update, so that the p-values cached for a
+        # previous version of the statistics can be discarded
+        self.version = 0
+        self._correlation = None
+
+    @classmethod
+    def from_data(cls, data, chunk_size: int = 100000
+                  ) -> 'GaussianSufficientStatistics':
+        """
+        Computes the sufficient statistics of observations.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame, Dataset, array_like or pyarrow.Table
+            The observations.
+        chunk_size : int, optional
+            The number of rows added at a time (which bounds the memory used
+            on top of the observations).
+
+        Returns
+        -------
+        GaussianSufficientStatistics
+            The sufficient statistics.
+        """
+        data = Dataset(data)
+        statistics = cls(column_names=data.columns)
+        for start in range(0, data.shape[0], chunk_size):
+            statistics.add_rows(data.values[start:start + chunk_size, :])
+
+        return statistics
+
+    @property
+    def nb_var(self) -> int:
+        return len(self.columns)
+
+    def column_index(self, key) -> int:
+        """
+        Returns the index of a variable given by its index or its name.
+        """
+        if isinstance(key, (int, np.integer)):
+            return int(key)
+
+        return self._index[key]
+
+    def _check(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=float)
+        if values.ndim != 2 or values.shape[1] != self.nb_var:
+            raise ValueError(f'Expected rows of {self.nb_var} values, got an '
+                             f'array of shape {values.shape} !')
+        if self.shift is None:
+            self.shift = values.mean(axis=0) if len(values) > 0 \
+                else np.zeros(self.nb_var)
+
+        return values - self.shift
+
+    def _updated(self) -> None:
+        self.version += 1
+        self._correlation = None
+
+    def add_rows(self, values: np.ndarray) -> None:
+        """
+        Adds observations to the statistics.
+
+        Parameters
+        ----------
+        values : array_like
+            The observations, one row per observation.
+        """
+        centred = self._check(values)
+        self.nb_obs += len(centred)
+        self.sums += centred.sum(axis=0)
+        self.cross_products += centred.T @ centred
+        self._updated()
+
+    def remove_rows(self, values: np.ndarray) -> None:
+        """
+        Removes observations previously added from the statistics.
+
+        Parameters
+        ----------
+        values : array_like
+            The observations, one row per observation.
+        """
+        centred = self._check(values)
+        if len(centred) > self.nb_obs:
+            raise ValueError(f'Cannot remove {len(centred)} observations out '
+                             f'of {self.nb_obs} !')
+        self.nb_obs -= len(centred)
+        self.sums -= centred.sum(axis=0)
+        self.cross_products -= centred.T @ centred
+        self._updated()
+
+    def merge(self, other: 'GaussianSufficientStatistics') -> None:
+        """
+        Adds the statistics of other observations of the same variables.
+        """
+        if other.columns != self.columns:
+            raise ValueError('Cannot merge the statistics of different '
+                             'variables !')
+        if other.nb_obs == 0:
+            return
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        # Move the sums of other to the shift of self
+        delta = other.shift - self.shift
+        sums = other.sums + other.nb_obs * delta
+        self.cross_products += other.cross_products + \
+            np.outer(other.sums, delta) + np.outer(delta, other.sums) + \
+            other.nb_obs * np.outer(delta, delta)
+        self.sums += sums
+        self.nb_obs += other.nb_obs
+        self._updated()
+
+    def mean(self) -> np.ndarray:
+        """
+        Returns the mean of the observations.
+        """
+        return self.shift + self.sums / self.nb_obs
+
+    def covariance(self) -> np.ndarray:
+        """
+        Returns the (unbiased) covariance matrix of the observations.
+        """
+        if self.nb_obs < 2:
+            raise ValueError(f'The covariance requires at least 2 '
+                             f'observations, got {self.nb_obs} !')
+        mean = self.sums / self.nb_obs
+
+        return (self.cross_products - self.nb_obs * np.outer(mean, mean)) / \
+            (self.nb_obs - 1)
+
+    def correlation(self) -> np.ndarray:
+        """
+        Returns the correlation matrix of the observations (computed once per
+        version of the statistics). The correlations of a constant variable
+        are NaN, as those computed from the observations.
+        """
+        if self._correlation is None:
+            covariance = self.covariance()
+            variance = np.diag(covariance)
+            constant = variance <= 0
+            std = np.sqrt(np.where(constant, 1.0, variance))
+            self._correlation = covariance / np.outer(std, std)
+            self._correlation[constant, :] = np.nan
+            self._correlation[:, constant] = np.nan
+
+        return self._correlation
+
+    def partial_correlation(self, x, y, z=()) -> float:
+        """
+        Returns the partial correlation of x and y given z (variables given
+        by their indices or their names).
+
+        As with the observations, the partial correlation is NaN if x or y is
+        constant, and the constant variables of z are left out (they carry
+        no information).
+        """
+        correlation = self.correlation()
+        x = self.column_index(x)
+        y = self.column_index(y)
+        z = [self.column_index(v) for v in z]
+        z = [v for v in z if not np.isnan(correlation[v, v])]
+        indices = [x, y, *z]
+        if np.isnan(correlation[x, x]) or np.isnan(correlation[y, y]):
+            return np.nan
+        if len(indices) == 2:
+            return correlation[x, y]
+        precision = np.linalg.pinv(correlation[np.ix_(indices, indices)])
+
+        return -precision[0, 1] / np.sqrt(precision[0, 0] * precision[1, 1])
+
+    def pvalue(self, x, y, z=()) -> float:
+        """
+        Returns the p-value of the linear test x _||_ y | z, equal to that of
+        do_test_linear_conditional_independence on the observations.
+        """
+        return correlation_pval(self.partial_correlation(x, y, z),
+                                self.nb_obs, len(z))
+
+    def tests(self, variables: list = None, cache: PValueCache = None,
+              counts: dict = None) -> tuple[callable, callable]:
+        """
+        Returns an unconditional and a conditional independence test with the
+        signatures expected by the PC algorithm, which ignore the data and
+        read the statistics instead.
+
+        Parameters
+        ----------
+        variables : list, optional
+            The variables (indices or names) on which the PC algorithm is
+            run, in order : the indices passed to the tests refer to this
+            list (defaults to all the variables).
+        cache : PValueCache, optional
+            A cache of the p-values, keyed by the indices of the variables in
+            the statistics (so that it can be shared between runs on
+            different subsets of variables).
+        counts : dict, optional
+            A dictionary in which to count the tests ('nb_tests') and the
+            tests computed rather than read from the cache ('nb_computed').
+
+        Returns
+        -------
+        tuple
+            The unconditional and the conditional independence tests.
+        """
+        if variables is None:
+            index = list(range(self.nb_var))
+        else:
+            index = [self.column_index(v) for v in variables]
+        if cache is None:
+            cache = PValueCache()
+        if counts is None:
+            counts = dict()
+        counts.setdefault('nb_tests', 0)
+        counts.setdefault('nb_computed', 0)
+
+        def pval_func(data, x, y, z):
+            counts['nb_computed'] += 1
+            return self.pvalue(x, y, z)
+
+        def indep_test(data, x, y, level):
+            counts['nb_tests'] += 1
+            return cache.get_or_compute(pval_func, None, index[x],
+                                        index[y]) >= level
+
+        def cond_indep_test(data, x, y, z, level):
+            counts['nb_tests'] += 1
+            return cache.get_or_compute(pval_func, None, index[x], index[y],
+                                        [index[v] for v in z]) >= level
+
+        return indep_test, cond_indep_test
@@ -0,0 +1,262 @@
+"""
+This module contains tools to record the (conditional) independence tests
+carried out by the PC algorithm into a compact binary trace file, and to
+replay a run of the PC algorithm from such a trace without the data or the
+tests.
+
+A trace file starts with a header made of the magic bytes b'PCALGTR2', the
+number of variables (uint32), the level of the tests (float64) and the
+options of the run recorded, as a JSON object (its length in bytes as uint32,
+then its UTF-8 encoding). It is followed by one record per test : x
+(uint32), y (uint32), the size of the conditioning set (uint16), the value
+returned by the test (float64 ; for tests returning booleans, 1.0 or 0.0),
+the decision (bool, True when (conditional) independence was concluded) and
+the variables in the conditioning set (uint32 each). All values are
+little-endian.
+"""
+import json
+import struct
+
+_magic = b'PCALGTR2'
+_header = struct.Struct('<Id')
+_options_size = struct.Struct('<I')
+_record = struct.Struct('<IIHd?')
+_variable = 'I'
+
+
+class DecisionTraceWriter:
+    """
+    Writes the (conditional) independence tests to a binary trace file.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the trace file.
+    nb_var : int
+        The number of variables in the dataset.
+    level : float
+        The level for the tests.
+    options : dict, optional
+        The options of the run (which must be serialisable to JSON).
+    """
+
+    def __init__(self, filename: str, nb_var: int, level: float,
+                 options: dict = None):
+        self.filename = filename
+        self.nb_var = nb_var
+        self.level = level
+        self.options = dict() if options is None else options
+        encoded_options = json.dumps(self.options).encode('utf-8')
+        self._file = open(filename, 'wb')
+        self._file.write(_magic)
+        self._file.write(_header.pack(nb_var, level))
+        self._file.write(_options_size.pack(len(encoded_options)))
+        self._file.write(encoded_options)
+
+    def record(self, x: int, y: int, z: list[int], value) -> None:
+        """
+        Records one (conditional) independence test.
+
+        Parameters
+        ----------
+        x : int
+            The index of variable x.
+        y : int
+            The index of variable y.
+        z : list
+            The indices of the variables in the conditioning set.
+        value
+            The value returned by the test.
+        """
+        self._file.write(
+            _record.pack(x, y, len(z), float(value), bool(value))
+        )
+        if len(z) > 0:
+            self._file.write(struct.pack(f'<{len(z)}{_variable}', *z))
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class DecisionTrace:
+    """
+    The (conditional) independence tests read from a binary trace file.
+
+    Attributes
+    ----------
+    nb_var : int
+        The number of variables in the dataset.
+    level : float
+        The level for the tests.
+    records : list
+        The tests in the order in which they were carried out, as tuples
+        (x, y, z, value, decision) with z a tuple of variable indices.
+    options : dict
+        The options of the run recorded.
+    """
+
+    def __init__(self, nb_var: int, level: float, records: list[tuple],
+                 options: dict = None):
+        self.nb_var = nb_var
+        self.level = level
+        self.records = records
+        self.options = dict() if options is None else options
+        self._decisions = {
+            (x, y, tuple(sorted(z))): decision
+            for (x, y, z, value, decision) in records
+        }
+
+    def decision(self, x: int, y: int, z: list[int]) -> bool:
+        """
+        Returns the decision recorded for test x _||_ y | z.
+
+        Parameters
+        ----------
+        x : int
+            The index of variable x.
+        y : int
+            The index of variable y.
+        z : list
+            The indices of the variables in the conditioning set.
+
+        Returns
+        -------
+        bool
+            Whether (conditional) independence was concluded.
+        """
+        key = (x, y, tuple(sorted(z)))
+        if key not in self._decisions:
+            raise KeyError(f'Test {x} _||_ {y} | {list(z)} is not in the '
+                           f'trace !')
+
+        return self._decisions[key]
+
+
+def record_decisions(indep_test_func: callable, cond_indep_test_func: callable,
+                     writer: DecisionTraceWriter) -> tuple[callable, callable]:
+    """
+    Wraps tests of independence and conditional independence so that every
+    test they carry out is recorded by a trace writer.
+
+    Parameters
+    ----------
+    indep_test_func : callable
+        A function to perform unconditional independence testing.
+    cond_indep_test_func : callable
+        A function to perform conditional independence testing.
+    writer : DecisionTraceWriter
+        The trace writer.
+
+    Returns
+    -------
+    tuple
+        The wrapped unconditional and conditional independence tests.
+    """
+
+    def recorded_indep_test(data, x, y, level):
+        value = indep_test_func(data=data, x=x, y=y, level=level)
+        writer.record(x=x, y=y, z=[], value=value)
+
+        return value
+
+    def recorded_cond_indep_test(data, x, y, z, level):
+        value = cond_indep_test_func(data=data, x=x, y=y, z=z, level=level)
+        writer.record(x=x, y=y, z=z, value=value)
+
+        return value
+
+    return recorded_indep_test, recorded_cond_indep_test
+
+
+def read_decision_trace(filename: str) -> DecisionTrace:
+    """
+    Reads a binary trace file.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the trace file.
+
+    Returns
+    -------
+    DecisionTrace
+        The tests recorded in the trace file.
+    """
+
+    with open(filename, 'rb') as f:
+        buffer = f.read()
+
+    if buffer[:len(_magic)] != _magic:
+        raise ValueError(f'{filename} is not a decision trace file !')
+
+    offset = len(_magic)
+    nb_var, level = _header.unpack_from(buffer, offset)
+    offset += _header.size
+
+    size, = _options_size.unpack_from(buffer, offset)
+    offset += _options_size.size
+    options = json.loads(buffer[offset:offset + size].decode('utf-8'))
+    offset += size
+
+    records = []
+    while offset < len(buffer):
+        x, y, size, value, decision = _record.unpack_from(buffer, offset)
+        offset += _record.size
+        z = struct.unpack_from(f'<{size}{_variable}', buffer, offset)
+        offset += size * struct.calcsize(_variable)
+        records.append((x, y, z, value, decision))
+
+    return DecisionTrace(nb_var=nb_var, level=level, records=records,
+                         options=options)
+
+
+def replay_indep_test(trace: DecisionTrace) -> callable:
+    """
+    Returns an unconditional independence test which replays the decisions
+    recorded in a trace.
+
+    Parameters
+    ----------
+    trace : DecisionTrace
+        The trace.
+
+    Returns
+    -------
+    callable
+        The unconditional independence test.
+    """
+
+    def res(data, x, y, level):
+
+        return trace.decision(x=x, y=y, z=[])
+
+    return res
+
+
+def replay_cond_indep_test(trace: DecisionTrace) -> callable:
+    """
+    Returns a conditional independence test which replays the decisions
+    recorded in a trace.
+
+    Parameters
+    ----------
+    trace : DecisionTrace
+        The trace.
+
+    Returns
+    -------
+    callable
+        The conditional independence test.
+    """
+
+    def res(data, x, y, z, level):
+
+        return trace.decision(x=x, y=y, z=z)
+
+    return res
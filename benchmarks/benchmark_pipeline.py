@@ -0,0 +1,250 @@
+"""
+Benchmarks the full PC pipeline on random DAGs.
+
+For each combination of graph family (Erdos-Renyi or scale-free), number of
+variables, expected degree, sample size, (conditional) independence test
+and execution mode, a random DAG is drawn, data is generated from a linear
+SEM on it (unless the d-separation oracle is used), run_pc_algorithm is run,
+and the wall time, the numbers of (conditional) independence tests, the peak
+memory (resident set size of the process and, with --trace-memory, the peak
+memory allocated during the run as measured by tracemalloc, which slows the
+run down) and the Structural Hamming Distance between the estimated and the
+true CPDAGs are recorded to a JSON report.
+
+Each configuration runs in a fresh worker process, so that the peak resident
+set size (a high-water mark over the lifetime of a process) is that of the
+configuration alone rather than of all the configurations run before it.
+
+The package must be importable : run the script as a module from the root
+of the repository, or install the package first (pip install -e .).
+
+Example :
+
+    python -m benchmarks.benchmark_pipeline --nb-var 50 100 200 \
+        --expected-degree 2 4 --tests oracle linear --sample-size 1000 \
+        --output report.json
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from PyPCAlg.markov_equivalence import dag_to_cpdag
+from PyPCAlg.pc_algorithm import run_pc_algorithm, field_pc_cpdag
+from PyPCAlg.utilities.d_separation import DSeparationOracle
+from PyPCAlg.utilities.dataset import Dataset
+from PyPCAlg.utilities.data_generation import generate_linear_sem_data, \
+    random_edge_weights
+from PyPCAlg.utilities.independence_relationships import \
+    linear_indep_test, linear_cond_indep_test
+from PyPCAlg.utilities.random_graphs import erdos_renyi_dag, \
+    scale_free_dag, structural_hamming_distance
+
+graph_families = {
+    'er': erdos_renyi_dag,
+    'sf': scale_free_dag,
+}
+
+execution_modes = {
+    'dense': dict(),
+    'bit_packed': dict(bit_packed=True),
+    'matrix_meeks': dict(matrix_form_meeks_rules=True),
+    'edge_list': dict(output_format='edge_list'),
+}
+
+
+def counting_tests(indep_test_func, cond_indep_test_func):
+    """
+    Wraps (conditional) independence tests so as to count the tests
+    performed, by size of the conditioning set.
+    """
+    counts = dict()
+
+    def counted_indep_test(data, x, y, level):
+        counts[0] = counts.get(0, 0) + 1
+        return indep_test_func(data=data, x=x, y=y, level=level)
+
+    def counted_cond_indep_test(data, x, y, z, level):
+        counts[len(z)] = counts.get(len(z), 0) + 1
+        return cond_indep_test_func(data=data, x=x, y=y, z=z, level=level)
+
+    return counted_indep_test, counted_cond_indep_test, counts
+
+
+def make_tests(tests: str, dag: np.ndarray, data):
+    """
+    Returns the (conditional) independence tests to benchmark.
+    """
+    if tests == 'oracle':
+        oracle = DSeparationOracle(dag)
+        return oracle.indep_test(), oracle.cond_indep_test()
+    elif tests == 'linear':
+        # On a Dataset, the linear tests take the indices passed by the PC
+        # algorithm and run on the columns of the buffer
+        return linear_indep_test, linear_cond_indep_test
+    else:
+        raise ValueError(f'Unknown tests {tests} !')
+
+
+def peak_rss_bytes() -> int:
+    """
+    Returns the peak resident set size of the process since its start, or
+    None where the resource module is not available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # In kilobytes on Linux, in bytes on macOS
+    return int(peak) if sys.platform == 'darwin' else int(peak) * 1024
+
+
+def run_benchmark(family: str, nb_var: int, expected_degree: float,
+                  sample_size: int, tests: str, mode: str, level: float,
+                  seed: int, data_dir: str = None,
+                  trace_memory: bool = False) -> dict:
+    """
+    Runs one configuration of the benchmark and returns its record.
+    """
+    rng = np.random.default_rng(seed)
+    dag = graph_families[family](nb_var, expected_degree, rng=rng)
+
+    if tests == 'oracle':
+        data = pd.DataFrame(np.empty((0, nb_var)),
+                            columns=[f'x{i}' for i in range(nb_var)])
+    else:
+        filename = None
+        if data_dir is not None:
+            filename = os.path.join(
+                data_dir, f'{family}_{nb_var}_{expected_degree}_'
+                          f'{sample_size}_{seed}.npy'
+            )
+        data = generate_linear_sem_data(
+            dag, random_edge_weights(dag, rng=rng), sample_size=sample_size,
+            rng=rng, filename=filename
+        )
+        data = Dataset(data, column_names=[f'x{i}' for i in range(nb_var)])
+
+    indep_test, cond_indep_test, counts = counting_tests(
+        *make_tests(tests, dag, data)
+    )
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    cpdag = run_pc_algorithm(
+        data=data,
+        indep_test_func=indep_test,
+        cond_indep_test_func=cond_indep_test,
+        level=level,
+        **execution_modes[mode]
+    )[field_pc_cpdag]
+    wall_time = time.perf_counter() - start
+    peak_memory = None
+    if trace_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    if hasattr(cpdag, 'to_dense'):
+        cpdag = cpdag.to_dense()
+    elif hasattr(cpdag, 'to_adjacency_matrix'):
+        cpdag = cpdag.to_adjacency_matrix()
+    true_cpdag = dag_to_cpdag(dag)
+
+    return dict(
+        family=family,
+        nb_var=nb_var,
+        expected_degree=expected_degree,
+        nb_edges=int((dag != 0).sum()),
+        sample_size=sample_size if tests != 'oracle' else None,
+        tests=tests,
+        mode=mode,
+        level=level,
+        seed=seed,
+        wall_time=wall_time,
+        nb_tests=int(sum(counts.values())),
+        nb_tests_by_conditioning_size={
+            str(size): count for size, count in sorted(counts.items())
+        },
+        peak_traced_memory_bytes=peak_memory,
+        peak_rss_bytes=peak_rss_bytes(),
+        structural_hamming_distance=structural_hamming_distance(cpdag,
+                                                                true_cpdag),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--families', nargs='+', default=['er'],
+                        choices=sorted(graph_families))
+    parser.add_argument('--nb-var', nargs='+', type=int, default=[20, 50])
+    parser.add_argument('--expected-degree', nargs='+', type=float,
+                        default=[2.0])
+    parser.add_argument('--sample-size', nargs='+', type=int, default=[1000])
+    parser.add_argument('--tests', nargs='+', default=['oracle'],
+                        choices=['oracle', 'linear'])
+    parser.add_argument('--modes', nargs='+', default=['dense'],
+                        choices=sorted(execution_modes))
+    parser.add_argument('--level', type=float, default=0.05)
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0])
+    parser.add_argument('--data-dir', default=None,
+                        help='directory in which to write the generated data '
+                             'as memory-mapped .npy files, for datasets '
+                             'larger than memory')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='measure the peak memory allocated during each '
+                             'run with tracemalloc')
+    parser.add_argument('--output', default='benchmark_pipeline.json')
+    args = parser.parse_args(argv)
+
+    records = []
+    for family, nb_var, expected_degree, tests, mode, seed in \
+            itertools.product(args.families, args.nb_var,
+                              args.expected_degree, args.tests, args.modes,
+                              args.seeds):
+        sample_sizes = args.sample_size if tests != 'oracle' else [None]
+        for sample_size in sample_sizes:
+            # A spawned process does not inherit the memory of this one
+            with ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context('spawn')
+            ) as executor:
+                record = executor.submit(
+                    run_benchmark, family=family, nb_var=nb_var,
+                    expected_degree=expected_degree,
+                    sample_size=sample_size, tests=tests, mode=mode,
+                    level=args.level, seed=seed, data_dir=args.data_dir,
+                    trace_memory=args.trace_memory
+                ).result()
+            records.append(record)
+            print(f"{family} p={nb_var} d={expected_degree} "
+                  f"n={sample_size} {tests} {mode} : "
+                  f"{record['wall_time']:.3f} s, "
+                  f"{record['nb_tests']} tests, "
+                  f"SHD {record['structural_hamming_distance']}",
+                  flush=True)
+
+    report = dict(
+        python=platform.python_version(),
+        numpy=np.__version__,
+        machine=platform.machine(),
+        records=records,
+    )
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
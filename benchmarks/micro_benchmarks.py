@@ -0,0 +1,285 @@
+"""
+Micro-benchmarks of the graph utilities and of Meek's rules.
+
+Each helper of utilities/pdag.py and utilities/pc_algorithm.py and each of
+Meek's rules, edge by edge (meeks_rules.apply_rule_R1 to apply_rule_R4, and
+the worklist propagation) and in matrix form
+(matrix_meeks_rules.apply_rule_R1 to apply_rule_R4, and the propagation),
+is timed on random patterns (skeletons of random DAGs with their
+v-structures oriented) of increasing sizes. The empirical scaling exponent k
+of the running time t ~ p^k is fitted by least squares on a log-log scale
+and compared with a stored baseline : the script exits with a non-zero
+status if an exponent exceeds its baseline by more than
+--exponent-tolerance.
+
+The exponents hardly depend on the machine, and the baseline shipped with
+the repository only holds them. The running times do : a baseline written
+with --update-baseline --store-timings also holds the times at the largest
+size, and the times are then compared as well (a time exceeding its
+baseline by more than a factor --time-tolerance is a regression), so such a
+baseline must be generated on the machine running the checks.
+
+The package must be importable : run the script as a module from the root
+of the repository, or install the package first (pip install -e .).
+
+Example :
+
+    python -m benchmarks.micro_benchmarks            # check the baseline
+    python -m benchmarks.micro_benchmarks --update-baseline
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from PyPCAlg import matrix_meeks_rules, meeks_rules
+from PyPCAlg.utilities import pdag as pdag_utilities
+from PyPCAlg.utilities import pc_algorithm as pc_utilities
+from PyPCAlg.utilities.random_graphs import erdos_renyi_dag
+from PyPCAlg.utilities.separation_sets import SeparationSets
+
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'micro_benchmarks_baseline.json')
+
+
+def random_pattern(nb_var: int, expected_degree: float,
+                   rng: np.random.Generator) -> np.ndarray:
+    """
+    Returns the pattern (skeleton with the v-structures oriented) of a random
+    DAG.
+    """
+    dag = erdos_renyi_dag(nb_var, expected_degree, rng=rng) != 0
+    skeleton = dag | dag.T
+    pattern = skeleton.astype(float)
+
+    triples = pc_utilities.find_unshielded_triples_array(skeleton)
+    a, b, c = triples.T
+    is_v_structure = dag[a, b] & dag[c, b]
+    pattern[b[is_v_structure], a[is_v_structure]] = 0
+    pattern[b[is_v_structure], c[is_v_structure]] = 0
+
+    return pattern
+
+
+def random_separation_sets(skeleton: np.ndarray,
+                           rng: np.random.Generator):
+    """
+    Returns the unshielded triples of a skeleton together with separation
+    sets containing the middle node of about half of them.
+    """
+    triples = pc_utilities.find_unshielded_triples_array(skeleton)
+    separation_sets = SeparationSets(skeleton.shape[0])
+    for a, b, c in triples.tolist():
+        if rng.random() < 0.5:
+            separation_sets.add(a, c, (b,))
+        else:
+            separation_sets.add(a, c, ())
+
+    return triples, separation_sets
+
+
+def per_node(func):
+    """
+    Turns a helper taking a node into one calling it for every node.
+    """
+    def res(pdag):
+        for node in range(pdag.shape[0]):
+            func(pdag, node)
+
+    return res
+
+
+# Each case maps a name to a function building the arguments from a random
+# pattern and to the function to time
+cases = {
+    'pdag.find_children (all nodes)': (
+        lambda pattern, rng: (pattern,),
+        per_node(pdag_utilities.find_children)),
+    'pdag.find_parents (all nodes)': (
+        lambda pattern, rng: (pattern,),
+        per_node(pdag_utilities.find_parents)),
+    'pdag.find_undirected_neighbours (all nodes)': (
+        lambda pattern, rng: (pattern,),
+        per_node(pdag_utilities.find_undirected_neighbours)),
+    'pdag.find_undirected_adjacent_pairs': (
+        lambda pattern, rng: (pattern,),
+        pdag_utilities.find_undirected_adjacent_pairs),
+    'pdag.find_undirected_non_adjacent_pairs': (
+        lambda pattern, rng: (pattern,),
+        pdag_utilities.find_undirected_non_adjacent_pairs),
+    'pc_algorithm.find_adjacent_vertices': (
+        lambda pattern, rng: (pattern,),
+        pc_utilities.find_adjacent_vertices),
+    'pc_algorithm.find_adjacent_vertices_to (all nodes)': (
+        lambda pattern, rng: (pattern,),
+        lambda adj: [pc_utilities.find_adjacent_vertices_to(x, adj)
+                     for x in range(adj.shape[0])]),
+    'pc_algorithm.find_unshielded_triples': (
+        lambda pattern, rng: ((pattern != 0) | (pattern.T != 0),),
+        pc_utilities.find_unshielded_triples),
+    'pc_algorithm.find_unshielded_colliders': (
+        lambda pattern, rng: random_separation_sets(
+            (pattern != 0) | (pattern.T != 0), rng),
+        pc_utilities.find_unshielded_colliders),
+    'meeks_rules.apply_rule_R1': (
+        lambda pattern, rng: (pattern,), meeks_rules.apply_rule_R1),
+    'meeks_rules.apply_rule_R2': (
+        lambda pattern, rng: (pattern,), meeks_rules.apply_rule_R2),
+    'meeks_rules.apply_rule_R3': (
+        lambda pattern, rng: (pattern,), meeks_rules.apply_rule_R3),
+    'meeks_rules.apply_rule_R4': (
+        lambda pattern, rng: (pattern,), meeks_rules.apply_rule_R4),
+    'meeks_rules.propagate_Meeks_rules': (
+        lambda pattern, rng: (pattern, True),
+        lambda pattern, apply_R4: meeks_rules.propagate_Meeks_rules(
+            pattern.copy(), apply_R4)),
+    'matrix_meeks_rules.apply_rule_R1': (
+        lambda pattern, rng: (pattern,), matrix_meeks_rules.apply_rule_R1),
+    'matrix_meeks_rules.apply_rule_R2': (
+        lambda pattern, rng: (pattern,), matrix_meeks_rules.apply_rule_R2),
+    'matrix_meeks_rules.apply_rule_R3': (
+        lambda pattern, rng: (pattern,), matrix_meeks_rules.apply_rule_R3),
+    'matrix_meeks_rules.apply_rule_R4': (
+        lambda pattern, rng: (pattern,), matrix_meeks_rules.apply_rule_R4),
+    'matrix_meeks_rules.propagate_Meeks_rules': (
+        lambda pattern, rng: (pattern, True),
+        lambda pattern, apply_R4: matrix_meeks_rules.propagate_Meeks_rules(
+            pattern.copy(), apply_R4)),
+}
+
+
+def time_call(func, args, repeat: int) -> float:
+    """
+    Returns the best of repeat timings of func(*args), in seconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def fit_exponent(sizes: list[int], timings: list[float]) -> float:
+    """
+    Fits the exponent k of timings ~ sizes^k by least squares on a log-log
+    scale.
+    """
+    slope, _ = np.polyfit(np.log(sizes), np.log(timings), deg=1)
+
+    return float(slope)
+
+
+def run_micro_benchmarks(sizes: list[int], expected_degree: float,
+                         repeat: int, seed: int) -> dict:
+    """
+    Times every case at every size and fits the scaling exponents.
+    """
+    results = dict()
+    for name, (setup, func) in cases.items():
+        timings = []
+        for nb_var in sizes:
+            rng = np.random.default_rng(seed)
+            pattern = random_pattern(nb_var, expected_degree, rng)
+            timings.append(time_call(func, setup(pattern, rng), repeat))
+        results[name] = dict(
+            sizes=list(sizes),
+            timings=timings,
+            exponent=fit_exponent(sizes, timings),
+        )
+
+    return results
+
+
+def compare_with_baseline(results: dict, baseline: dict,
+                          exponent_tolerance: float,
+                          time_tolerance: float) -> list[str]:
+    """
+    Returns the descriptions of the regressions with respect to the baseline.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        reference = baseline[name]
+        if result['exponent'] > reference['exponent'] + exponent_tolerance:
+            regressions.append(
+                f"{name} : exponent {result['exponent']:.2f} > baseline "
+                f"{reference['exponent']:.2f} + {exponent_tolerance}"
+            )
+        if 'timings' in reference and \
+                reference['sizes'][-1] == result['sizes'][-1] and \
+                result['timings'][-1] > time_tolerance * \
+                reference['timings'][-1]:
+            regressions.append(
+                f"{name} : {result['timings'][-1]:.2e} s at p = "
+                f"{result['sizes'][-1]} > {time_tolerance} x baseline "
+                f"{reference['timings'][-1]:.2e} s"
+            )
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[32, 64, 128, 256])
+    parser.add_argument('--expected-degree', type=float, default=4.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=default_baseline)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--store-timings', action='store_true',
+                        help='store the running times in the baseline as '
+                             'well as the exponents (the times are specific '
+                             'to the machine)')
+    parser.add_argument('--exponent-tolerance', type=float, default=0.5)
+    parser.add_argument('--time-tolerance', type=float, default=3.0)
+    parser.add_argument('--output', default=None,
+                        help='path of a JSON file in which to store the '
+                             'results')
+    args = parser.parse_args(argv)
+
+    results = run_micro_benchmarks(args.sizes, args.expected_degree,
+                                   args.repeat, args.seed)
+    for name, result in results.items():
+        print(f"{name:<52} p^{result['exponent']:.2f}  "
+              f"{result['timings'][-1]:.2e} s at p = {result['sizes'][-1]}")
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        if not args.store_timings:
+            results = {
+                name: dict(sizes=result['sizes'],
+                           exponent=result['exponent'])
+                for name, result in results.items()
+            }
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline found at {args.baseline}, run with '
+              f'--update-baseline to create one.')
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline,
+                                        args.exponent_tolerance,
+                                        args.time_tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
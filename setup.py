@@ -28,11 +28,16 @@ setup(
     install_requires=[
         'numpy>=1.22.0',
         'pandas',
+        'scipy',
         'matplotlib',
         'scikit-learn',
         'pingouin'
     ],
     python_requires=">=3.9",
+    entry_points={
+        'console_scripts': ['pypcalg=PyPCAlg.cli:main',
+                            'pypcalg-server=PyPCAlg.server:main'],
+    },
     include_package_data=True,
     package_data={'': ['examples/true_independence_relationships_graph_*.csv']}
 )